@@ -0,0 +1,111 @@
+import pathlib
+import tempfile
+import time
+
+import attr
+import click
+
+import epyqlib.utils.general
+
+import epcpm.benchmarks.synthetic
+import epcpm.dispatch
+import epcpm.project
+
+
+builders = epyqlib.utils.general.TypeMap()
+handlers = epcpm.dispatch.Dispatcher()
+
+
+# shaped like the per node builders the generators used, which took the
+# generation wide state along with each node
+@attr.s
+class Builder:
+    wrapped = attr.ib()
+    can_root = attr.ib()
+    sunspec_root = attr.ib()
+    include_uuid_in_item = attr.ib()
+    parameter_uuid_to_can_node = attr.ib()
+    parameter_uuid_to_sunspec_node = attr.ib()
+    parameter_uuid_finder = attr.ib()
+    index = attr.ib()
+
+    def gen(self):
+        return self.wrapped.uuid
+
+
+@attr.s
+class Context:
+    can_root = attr.ib()
+    sunspec_root = attr.ib()
+    include_uuid_in_item = attr.ib()
+    parameter_uuid_to_can_node = attr.ib()
+    parameter_uuid_to_sunspec_node = attr.ib()
+    parameter_uuid_finder = attr.ib()
+    index = attr.ib()
+
+
+def handler(context, node):
+    return node.uuid
+
+
+def collect_nodes(project):
+    nodes = []
+
+    for model in project.models.values():
+        nodes.extend(model.root.nodes_by_filter(filter=lambda node: True))
+
+    for node in nodes:
+        builders(type(node))(Builder)
+        handlers(type(node))(handler)
+
+    return nodes
+
+
+def wrapped(nodes, state):
+    for node in nodes:
+        builders.wrap(wrapped=node, **state).gen()
+
+
+def dispatched(nodes, state):
+    context = Context(**state)
+
+    for node in nodes:
+        handlers.gen(node=node, context=context)
+
+
+def measure(f, nodes, state, repeat):
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(nodes=nodes, state=state)
+        times.append(time.perf_counter() - start)
+
+    return len(nodes) / min(times)
+
+
+@click.command()
+@click.option("--parameters", type=click.IntRange(min=1), default=10000)
+@click.option("--repeat", type=click.IntRange(min=1), default=5)
+def cli(parameters, repeat):
+    """Compare the nodes per second of wrapping each node of a synthetic
+    project in a builder and of dispatching it to a function"""
+    with tempfile.TemporaryDirectory() as temporary:
+        project_path = epcpm.benchmarks.synthetic.create_project(
+            directory=pathlib.Path(temporary) / "project",
+            sizes=epcpm.benchmarks.synthetic.Sizes.for_parameters(
+                parameters=parameters,
+            ),
+        )
+        project = epcpm.project.loadp(project_path)
+
+    nodes = collect_nodes(project)
+    state = {name: None for name in attr.fields_dict(Context)}
+
+    for name, f in (("wrapped", wrapped), ("dispatched", dispatched)):
+        rate = measure(f=f, nodes=nodes, state=state, repeat=repeat)
+        click.echo(f"{name:<10} {rate:,.0f} nodes/s  ({len(nodes)} nodes)")
+
+
+if __name__ == "__main__":
+    cli()
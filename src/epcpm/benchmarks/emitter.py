@@ -0,0 +1,153 @@
+import os
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import attr
+import click
+import jinja2
+
+import epcpm.benchmarks.suite
+import epcpm.benchmarks.synthetic
+import epcpm.c
+import epcpm.output
+import epcpm.parameterstointerface
+import epcpm.parametervisitor
+import epcpm.project
+
+
+@attr.s
+class Collector:
+    """Collect the nested lists of lines the way the C generators did before
+    they emitted them."""
+
+    collected = attr.ib(factory=list)
+
+    def lines(self, it):
+        self.collected.extend(it)
+
+
+def render_joined(source, destination, context, encoding="utf-8", newline="\n"):
+    environment = jinja2.Environment(
+        undefined=jinja2.StrictUndefined,
+        loader=jinja2.FileSystemLoader(os.fspath(source.parent)),
+        newline_sequence=newline,
+        autoescape=False,
+        trim_blocks=True,
+    )
+    template = environment.get_template(name=source.name)
+
+    rendered = template.render(context)
+    rendered = rendered.rstrip() + newline
+
+    epcpm.output.write_bytes(path=destination, content=rendered.encode(encoding))
+
+
+def export_joined(c_path, h_path, project):
+    target = epcpm.parameterstointerface.Target.build(
+        parameters_root=project.models.parameters.root,
+        can_root=project.models.can.root,
+        sunspec_root=project.models.sunspec.root,
+        c=Collector(),
+        h=Collector(),
+    )
+    epcpm.parametervisitor.walk(root=project.models.parameters.root, targets=[target])
+
+    model_ids = target.sunspec_models
+    template_context = {
+        "sunspec_interface_gen_headers": (
+            f"sunspecInterfaceGen{id}.h" for id in model_ids
+        ),
+        "sunspec_interface_headers": (f"sunspecInterface{id:05}.h" for id in model_ids),
+        "interface_items": epcpm.c.format_nested_lists(target.c.collected).strip(),
+        "declarations": epcpm.c.format_nested_lists(target.h.collected).strip(),
+    }
+
+    for path in (c_path, h_path):
+        render_joined(
+            source=path.with_suffix(f"{path.suffix}_pm"),
+            destination=path,
+            context=template_context,
+        )
+
+
+def export_emitted(c_path, h_path, project):
+    epcpm.parameterstointerface.export(
+        c_path=c_path,
+        h_path=h_path,
+        parameters_model=project.models.parameters,
+        can_model=project.models.can,
+        sunspec_model=project.models.sunspec,
+    )
+
+
+def measure(export, c_path, project, repeat):
+    h_path = c_path.with_suffix(".h")
+    times = []
+
+    for _ in range(repeat):
+        for path in (c_path, h_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+        start = time.perf_counter()
+        export(c_path=c_path, h_path=h_path, project=project)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        export(c_path=c_path, h_path=h_path, project=project)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(times), peak, c_path.read_bytes() + h_path.read_bytes()
+
+
+@click.command()
+@click.option("--parameters", type=click.IntRange(min=1), default=10000)
+@click.option("--repeat", type=click.IntRange(min=1), default=3)
+def cli(parameters, repeat):
+    """Compare interface generation time and peak memory when joining the
+    generated lines into strings and when emitting them as they are built"""
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = pathlib.Path(temporary)
+
+        project_path = epcpm.benchmarks.synthetic.create_project(
+            directory=directory / "project",
+            sizes=epcpm.benchmarks.synthetic.Sizes.for_parameters(
+                parameters=parameters,
+            ),
+        )
+        project = epcpm.project.loadp(project_path)
+        paths = epcpm.benchmarks.suite.create_target(directory / "target")
+
+        results = {
+            name: measure(
+                export=export,
+                c_path=paths.interface_c,
+                project=project,
+                repeat=repeat,
+            )
+            for name, export in (
+                ("joined", export_joined),
+                ("emitted", export_emitted),
+            )
+        }
+
+    (_, _, joined_output), (_, _, emitted_output) = results.values()
+    if joined_output != emitted_output:
+        raise click.ClickException("Generated interface files differ")
+
+    for name, (seconds, peak, output) in results.items():
+        click.echo(
+            f"{name:<8} {seconds:.3f}s  peak {peak / 2**20:.1f} MiB"
+            f"  ({len(output) / 2**20:.1f} MiB generated)",
+        )
+
+
+if __name__ == "__main__":
+    cli()
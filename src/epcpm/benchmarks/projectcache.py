@@ -0,0 +1,122 @@
+import copy
+import json
+import pathlib
+import shutil
+import tempfile
+import time
+import uuid
+
+import click
+
+import epcpm.project
+import epcpm.projectcache
+
+
+example_project = pathlib.Path(epcpm.__file__).parent / "tests" / "project"
+namespace = uuid.UUID("0a6c0c0b-4d6e-4c5e-9a5d-3f1c9e0e8a41")
+
+
+def collect_uuids(node, uuids):
+    if isinstance(node, dict):
+        if "uuid" in node:
+            uuids.add(node["uuid"])
+
+        for value in node.values():
+            collect_uuids(value, uuids)
+    elif isinstance(node, list):
+        for value in node:
+            collect_uuids(value, uuids)
+
+
+def replace_uuids(node, mapping):
+    if isinstance(node, dict):
+        return {key: replace_uuids(value, mapping) for key, value in node.items()}
+    elif isinstance(node, list):
+        return [replace_uuids(value, mapping) for value in node]
+    elif isinstance(node, str):
+        return mapping.get(node, node)
+
+    return node
+
+
+def scale_parameters(parameters, copies):
+    scaled = copy.deepcopy(parameters)
+    groups = [
+        child for child in parameters["children"] if child["name"] != "Enumerations"
+    ]
+
+    for index in range(copies):
+        for group in groups:
+            uuids = set()
+            collect_uuids(group, uuids)
+            mapping = {u: str(uuid.uuid5(namespace, f"{index}:{u}")) for u in uuids}
+
+            duplicate = replace_uuids(group, mapping)
+            duplicate["name"] = f"{group['name']} {index}"
+            scaled["children"].append(duplicate)
+
+    return scaled
+
+
+def create_scaled_project(directory, copies, source=example_project):
+    shutil.copytree(source, directory)
+
+    parameters_path = directory / "parameters.json"
+    parameters = json.loads(parameters_path.read_text())
+    parameters_path.write_text(
+        json.dumps(scale_parameters(parameters=parameters, copies=copies), indent=4),
+    )
+
+    return directory / "project.pmp"
+
+
+def time_load(project_path, cache):
+    start = time.perf_counter()
+    epcpm.project.loadp(project_path, cache=cache)
+
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--copies", type=click.IntRange(min=0), default=20)
+@click.option("--repeat", type=click.IntRange(min=1), default=3)
+def cli(copies, repeat):
+    """Compare project load times without, cold and warm cache"""
+    with tempfile.TemporaryDirectory() as temporary:
+        project_path = create_scaled_project(
+            directory=pathlib.Path(temporary) / "project",
+            copies=copies,
+        )
+
+        uncached = min(time_load(project_path, cache=False) for _ in range(repeat))
+
+        cold = []
+        for _ in range(repeat):
+            shutil.rmtree(
+                epcpm.projectcache.cache_directory(project_path),
+                ignore_errors=True,
+            )
+            cold.append(time_load(project_path, cache=True))
+
+        warm = min(time_load(project_path, cache=True) for _ in range(repeat))
+
+        with epcpm.project.collect_load_times() as load_times:
+            time_load(project_path, cache=False)
+
+    click.echo(f"uncached: {uncached:.3f}s")
+    click.echo(f"cold:     {min(cold):.3f}s")
+    click.echo(f"warm:     {warm:.3f}s")
+
+    click.echo()
+    click.echo("uncached load phases:")
+    for path, times in load_times.items():
+        click.echo(
+            f"    {path.name:<16}"
+            f" deserialize {times.deserialize:.3f}s"
+            f"  collect {times.collect:.3f}s"
+            f"  resolve {times.resolve:.3f}s",
+        )
+
+
+if __name__ == "__main__":
+    cli()
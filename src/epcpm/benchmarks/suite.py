@@ -0,0 +1,191 @@
+import json
+import pathlib
+import platform
+import tempfile
+import time
+
+import attr
+import click
+
+import epcpm
+import epcpm.benchmarks.synthetic
+import epcpm.c
+import epcpm.canmodel
+import epcpm.importexport
+import epcpm.importexportdialog
+import epcpm.project
+import epcpm.sunspecmodel
+
+
+result_format_version = 1
+
+# minimal stand-ins for the templates an embedded project provides
+templates = {
+    "interface_c": "{{ interface_items }}\n",
+    "interface_h": (
+        "{% for header in sunspec_interface_gen_headers %}{{ header }}\n{% endfor %}"
+        "{% for header in sunspec_interface_headers %}{{ header }}\n{% endfor %}"
+        "{{ declarations }}\n"
+    ),
+    "sunspec_tables_c": "{{ definitions }}\n",
+    "sunspec_tables_h": "{{ declarations }}\n",
+    "sil_c": "{{ item_count }}\n{{ initializers }}\n",
+    "sil_h": "{{ declarations }}\n",
+}
+
+
+def create_target(directory):
+    paths = epcpm.importexportdialog.paths_from_directory(directory)
+
+    for name, template in templates.items():
+        base, extension = name.rsplit("_", 1)
+        path = getattr(paths, f"{base}_c").with_suffix(f".{extension}")
+        path = epcpm.importexport.template_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(template)
+
+    paths.sunspec_c.mkdir(parents=True, exist_ok=True)
+
+    return paths
+
+
+def timed(f, *args, **kwargs):
+    start = time.perf_counter()
+    f(*args, **kwargs)
+
+    return time.perf_counter() - start
+
+
+def nodes_of_type(model, type_):
+    return list(model.root.nodes_by_filter(filter=lambda node: isinstance(node, type_)))
+
+
+def run_one(directory, sizes):
+    timings = {}
+
+    timings["generate"] = timed(
+        epcpm.benchmarks.synthetic.create_project,
+        directory=directory / "project",
+        sizes=sizes,
+    )
+    project_path = directory / "project" / "project.pmp"
+
+    start = time.perf_counter()
+    project = epcpm.project.loadp(project_path)
+    timings["load"] = time.perf_counter() - start
+
+    project.filename = directory / "saved" / "project.pmp"
+    project.filename.parent.mkdir()
+    timings["save"] = timed(project.save)
+    timings["save_unchanged"] = timed(project.save)
+
+    paths = create_target(directory / "target")
+    options = epcpm.importexport.ExportOptions()
+    with epcpm.c.collect_render_times() as render_times:
+        for generator in epcpm.importexport.generators:
+            timings[f"export_{generator.name}"] = timed(
+                epcpm.importexport.run_generators,
+                generators=[generator],
+                project=project,
+                paths=paths,
+                options=options,
+            )
+
+    timings["can_table_update"] = sum(
+        timed(table.update)
+        for table in nodes_of_type(project.models.can, epcpm.canmodel.CanTable)
+    )
+    timings["sunspec_table_update"] = sum(
+        timed(table.update)
+        for table in nodes_of_type(project.models.sunspec, epcpm.sunspecmodel.Table)
+    )
+
+    timings["check"] = timed(project.models.check)
+
+    return {
+        "sizes": attr.asdict(sizes),
+        "nodes": {
+            name: len(model.uuid_to_node) for name, model in project.models.items()
+        },
+        "timings": timings,
+        "templates": {
+            source.name: attr.asdict(times) for source, times in render_times.items()
+        },
+    }
+
+
+def run(parameter_counts, repeat=1, **size_options):
+    results = []
+
+    for count in parameter_counts:
+        sizes = epcpm.benchmarks.synthetic.Sizes.for_parameters(
+            parameters=count,
+            **size_options,
+        )
+
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as temporary:
+                runs.append(run_one(directory=pathlib.Path(temporary), sizes=sizes))
+
+        result = runs[0]
+        result["timings"] = {
+            name: min(run["timings"][name] for run in runs)
+            for name in result["timings"]
+        }
+        results.append(result)
+
+    return {
+        "format": result_format_version,
+        "epcpm": epcpm.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+@click.command()
+@click.option(
+    "--parameters",
+    "parameter_counts",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=(1000, 10000, 50000),
+    show_default=True,
+)
+@click.option("--table-axis-length", type=click.IntRange(min=1), default=4)
+@click.option(
+    "--table-arrays",
+    type=click.IntRange(
+        min=1,
+        max=len(epcpm.benchmarks.synthetic.table_array_members),
+    ),
+    default=2,
+)
+@click.option("--table-array-length", type=click.IntRange(min=1), default=8)
+@click.option("--repeat", type=click.IntRange(min=1), default=1)
+@click.option("--output", type=click.File("w"), default="-")
+def cli(
+    parameter_counts,
+    table_axis_length,
+    table_arrays,
+    table_array_length,
+    repeat,
+    output,
+):
+    """Time loading, saving, exporting, table updates and checks of
+    synthetic projects and write the results as JSON"""
+    results = run(
+        parameter_counts=parameter_counts,
+        repeat=repeat,
+        table_axis_length=table_axis_length,
+        table_arrays=table_arrays,
+        table_array_length=table_array_length,
+    )
+
+    json.dump(results, output, indent=4)
+    output.write("\n")
+
+
+if __name__ == "__main__":
+    cli()
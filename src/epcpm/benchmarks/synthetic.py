@@ -0,0 +1,356 @@
+import attr
+import epyqlib.attrsmodel
+import epyqlib.pm.parametermodel
+
+import epcpm.canmodel
+import epcpm.project
+import epcpm.sunspecmodel
+
+
+parameters_per_group = 100
+signals_per_multiplexer = 3
+signal_bits = 16
+first_sunspec_model_id = 64000
+# interface generation expects table arrays to be the curve point coordinates
+table_array_members = "xyz"
+
+
+@attr.s(frozen=True)
+class Sizes:
+    parameters = attr.ib(default=1000)
+    messages = attr.ib(default=4)
+    sunspec_models = attr.ib(default=4)
+    tables = attr.ib(default=1)
+    # enumerators along each of a table's two axes
+    table_axis_length = attr.ib(default=4)
+    table_arrays = attr.ib(default=2)
+    table_array_length = attr.ib(default=8)
+
+    @classmethod
+    def for_parameters(cls, parameters, **kwargs):
+        return cls(
+            parameters=parameters,
+            messages=max(1, parameters // 250),
+            sunspec_models=max(1, parameters // 500),
+            tables=max(1, parameters // 5000),
+            **kwargs,
+        )
+
+
+def chunks(sequence, size):
+    return [sequence[i : i + size] for i in range(0, len(sequence), size)]
+
+
+def create_enumerations(sizes):
+    enumerations = epyqlib.pm.parametermodel.Enumerations(name="Enumerations")
+
+    access_levels = epyqlib.pm.parametermodel.AccessLevels(name="AccessLevel")
+    for value, name in enumerate(("user", "factory")):
+        access_levels.append_child(
+            epyqlib.pm.parametermodel.AccessLevel(name=name, value=value),
+        )
+    enumerations.append_child(access_levels)
+
+    variants = epyqlib.pm.parametermodel.Enumeration(name="CmmControlsVariant")
+    for value, name in enumerate(("Standard", "Alternate")):
+        variants.append_child(
+            epyqlib.pm.parametermodel.Enumerator(name=name, value=value),
+        )
+    enumerations.append_child(variants)
+
+    enumerations.append_child(epcpm.sunspecmodel.build_sunspec_types_enumeration())
+
+    # curve numbers are read back from the names by the exporters
+    curves = epyqlib.pm.parametermodel.Enumeration(name="Curves")
+    for value in range(sizes.table_axis_length):
+        curves.append_child(
+            epyqlib.pm.parametermodel.Enumerator(name=f"{value + 1}", value=value),
+        )
+    enumerations.append_child(curves)
+
+    axes = []
+    for table in range(sizes.tables):
+        zones = epyqlib.pm.parametermodel.Enumeration(name=f"Table{table}Zones")
+        for value in range(sizes.table_axis_length):
+            zones.append_child(
+                epyqlib.pm.parametermodel.Enumerator(
+                    name=f"Table{table}Zone{value}",
+                    value=value,
+                ),
+            )
+        enumerations.append_child(zones)
+        axes.append((zones, curves))
+
+    return enumerations, axes
+
+
+def create_parameters(count, access_level):
+    groups = []
+    parameters = []
+
+    for group_index, names in enumerate(
+        chunks([f"Parameter{index}" for index in range(count)], parameters_per_group)
+    ):
+        group = epyqlib.pm.parametermodel.Group(name=f"Group {group_index}")
+
+        for name in names:
+            parameter = epyqlib.pm.parametermodel.Parameter(
+                name=name,
+                abbreviation=name,
+                units="V",
+                default=0,
+                minimum=-1000,
+                maximum=1000,
+                decimal_places=1,
+                internal_variable=f"synthetic.{name}",
+                internal_type="int16_t",
+                access_level_uuid=access_level.uuid,
+            )
+            group.append_child(parameter)
+            parameters.append(parameter)
+
+        groups.append(group)
+
+    return groups, parameters
+
+
+def create_messages(parameters, count):
+    messages = []
+
+    for message_index, message_parameters in enumerate(
+        chunks(parameters, -(-len(parameters) // count)),
+    ):
+        name = "ParameterQuery" if message_index == 0 else f"Message{message_index}"
+        message = epcpm.canmodel.MultiplexedMessage(
+            name=name,
+            identifier=0x1F000000 + message_index,
+            extended=True,
+            length=8,
+        )
+        message.append_child(
+            epcpm.canmodel.Signal(name="MultiplexSignal", bits=8),
+        )
+
+        for multiplexer_index, multiplexer_parameters in enumerate(
+            chunks(message_parameters, signals_per_multiplexer),
+        ):
+            multiplexer = epcpm.canmodel.Multiplexer(
+                name=f"{name}Mux{multiplexer_index}",
+                identifier=multiplexer_index + 1,
+                length=8,
+            )
+
+            for signal_index, parameter in enumerate(multiplexer_parameters):
+                multiplexer.append_child(
+                    epcpm.canmodel.Signal(
+                        name=parameter.name,
+                        bits=signal_bits,
+                        signed=True,
+                        start_bit=16 + signal_index * signal_bits,
+                        parameter_uuid=parameter.uuid,
+                    ),
+                )
+
+            message.append_child(multiplexer)
+
+        messages.append(message)
+
+    return messages
+
+
+def create_sunspec_models(parameters, count, sunspec_types, access_level):
+    uint16 = sunspec_types.child_by_name("uint16").uuid
+    int16 = sunspec_types.child_by_name("int16").uuid
+    sunssf = sunspec_types.child_by_name("sunssf").uuid
+
+    groups = []
+    models = []
+
+    for model_index, model_parameters in enumerate(
+        chunks(parameters, -(-len(parameters) // count)),
+    ):
+        model_id = first_sunspec_model_id + model_index
+        group = epyqlib.pm.parametermodel.Group(name=f"SunSpec Model {model_id}")
+
+        model = epcpm.sunspecmodel.Model(id=model_id)
+        header_block, fixed_block = model.children
+
+        for parameter in header_block.add_data_points(
+            uint16_uuid=uint16,
+            model_id=f"Model{model_id}",
+        ):
+            parameter.access_level_uuid = access_level.uuid
+            group.append_child(parameter)
+
+        scale_factor_parameter = epyqlib.pm.parametermodel.Parameter(
+            name=f"Model{model_id}ScaleFactor",
+            abbreviation="V_SF",
+            access_level_uuid=access_level.uuid,
+        )
+        group.append_child(scale_factor_parameter)
+        scale_factor = epcpm.sunspecmodel.DataPoint(
+            block_offset=0,
+            size=1,
+            type_uuid=sunssf,
+            parameter_uuid=scale_factor_parameter.uuid,
+        )
+        fixed_block.append_child(scale_factor)
+
+        for offset, parameter in enumerate(model_parameters, start=1):
+            fixed_block.append_child(
+                epcpm.sunspecmodel.DataPoint(
+                    block_offset=offset,
+                    size=1,
+                    type_uuid=int16,
+                    factor_uuid=scale_factor.uuid,
+                    parameter_uuid=parameter.uuid,
+                ),
+            )
+
+        model.length = len(fixed_block.children)
+
+        groups.append(group)
+        models.append(model)
+
+    return groups, models
+
+
+# the table updates itself from the model as children are added
+def add_table(parent, index, axes, sizes, access_level):
+    table = epyqlib.pm.parametermodel.Table(name=f"Table{index}")
+    parent.append_child(table)
+
+    for axis in axes:
+        table.append_child(
+            epyqlib.pm.parametermodel.TableEnumerationReference(
+                name=axis.name,
+                enumeration_uuid=axis.uuid,
+            ),
+        )
+
+    for array_index in range(sizes.table_arrays):
+        name = f"Table{index}Array{array_index}"
+        array = epyqlib.pm.parametermodel.Array(name=name)
+        array.append_child(
+            epyqlib.pm.parametermodel.Parameter(
+                name=f"{name}_0",
+                abbreviation=name,
+                internal_variable=(
+                    f"synthetic.table{index}.curves[{{curve_index}}]"
+                    f".points[{{point_index}}].{table_array_members[array_index]}"
+                ),
+                internal_type="int16_t",
+                access_level_uuid=access_level.uuid,
+            ),
+        )
+        table.append_child(array)
+        array.length = sizes.table_array_length
+
+    return table
+
+
+def create_project(directory, sizes):
+    """Build a project of the given sizes using the real model node types,
+    save it in `directory` and return the project file path."""
+    parameters_root = epyqlib.pm.parametermodel.Root()
+    can_root = epcpm.canmodel.Root()
+    sunspec_root = epcpm.sunspecmodel.Root()
+
+    enumerations, axes = create_enumerations(sizes=sizes)
+    parameters_root.append_child(enumerations)
+
+    parameters_group = epyqlib.pm.parametermodel.Group(name="Parameters")
+    parameters_root.append_child(parameters_group)
+
+    access_level = enumerations.child_by_name("AccessLevel").children[0]
+    groups, parameters = create_parameters(
+        count=sizes.parameters,
+        access_level=access_level,
+    )
+    for group in groups:
+        parameters_group.append_child(group)
+
+    for message in create_messages(parameters=parameters, count=sizes.messages):
+        can_root.append_child(message)
+
+    int16 = enumerations.child_by_name("SunSpecTypes").child_by_name("int16").uuid
+    groups, models = create_sunspec_models(
+        parameters=parameters[: len(parameters) // 2],
+        count=sizes.sunspec_models,
+        sunspec_types=enumerations.child_by_name("SunSpecTypes"),
+        access_level=access_level,
+    )
+    for group in groups:
+        parameters_root.append_child(group)
+    for model in models:
+        sunspec_root.append_child(model)
+
+    project = epcpm.project.Project()
+    roots = {"parameters": parameters_root, "can": can_root, "sunspec": sunspec_root}
+
+    for name, (_, columns, drop_source_names) in epcpm.project.model_types().items():
+        project.models[name] = epyqlib.attrsmodel.Model(
+            root=roots[name],
+            columns=columns,
+            drop_sources=[project.models[source] for source in drop_source_names],
+        )
+
+    epcpm.project._post_load(project)
+
+    # tables fill in their elements from the parameter model
+    tables_group = epyqlib.pm.parametermodel.Group(name="Tables")
+    parameters_root.append_child(tables_group)
+
+    for index, table_axes in enumerate(axes):
+        table = add_table(
+            parent=tables_group,
+            index=index,
+            axes=table_axes,
+            sizes=sizes,
+            access_level=access_level,
+        )
+
+        message = epcpm.canmodel.MultiplexedMessage(
+            name=f"Table{index}",
+            identifier=0x1E000000 + index,
+            extended=True,
+        )
+        message.append_child(
+            epcpm.canmodel.Signal(name="MultiplexSignal", bits=8),
+        )
+        can_root.append_child(message)
+
+        can_table = epcpm.canmodel.CanTable(name=table.name, table_uuid=table.uuid)
+        # sized array signals are kept by the update
+        for array in table.arrays:
+            can_table.append_child(
+                epcpm.canmodel.Signal(
+                    name=array.name,
+                    bits=signal_bits,
+                    signed=True,
+                    parameter_uuid=array.uuid,
+                ),
+            )
+        message.append_child(can_table)
+        can_table.update()
+
+        sunspec_table = epcpm.sunspecmodel.Table(
+            name=table.name,
+            parameter_table_uuid=table.uuid,
+        )
+        sunspec_root.append_child(sunspec_table)
+        sunspec_table.update()
+
+        for point in sunspec_table.nodes_by_filter(
+            filter=lambda node: isinstance(node, epcpm.sunspecmodel.DataPoint),
+        ):
+            point.type_uuid = int16
+
+    directory.mkdir(parents=True, exist_ok=True)
+    project.filename = directory / "project.pmp"
+    for name in project.paths:
+        project.paths[name] = f"{name}.json"
+
+    project.save()
+
+    return project.filename
@@ -0,0 +1,109 @@
+import concurrent.futures
+import multiprocessing
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import click
+import openpyxl
+
+import epcpm.benchmarks.synthetic
+import epcpm.output
+import epcpm.project
+import epcpm.sunspectoxlsx
+
+
+def export(project, path, write_only):
+    builder = epcpm.sunspectoxlsx.builders.wrap(
+        wrapped=project.models.sunspec.root,
+        parameter_uuid_finder=project.models.sunspec.node_from_uuid,
+        parameter_model=project.models.parameters,
+        column_filter=epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True),
+        write_only=write_only,
+    )
+
+    epcpm.output.write_workbook(path=path, workbook=builder.gen())
+
+
+def measure(project_path, path, write_only):
+    """Export the spreadsheet in a fresh process so that one export does not
+    run with what the other left behind.  The peak memory is measured on a
+    second export since tracing slows it down."""
+    project = epcpm.project.loadp(project_path)
+
+    start = time.perf_counter()
+    export(project=project, path=path, write_only=write_only)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        export(project=project, path=path, write_only=write_only)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak
+
+
+def workbook_rows(path):
+    # not read only since those rows are only as long as the worksheet's
+    # recorded dimensions, which streamed worksheets don't have
+    workbook = openpyxl.load_workbook(path)
+
+    return [
+        [cell.value for cell in row]
+        for worksheet in workbook.worksheets
+        for row in worksheet.iter_rows()
+    ]
+
+
+@click.command()
+@click.option("--parameters", type=click.IntRange(min=1), default=10000)
+def cli(parameters):
+    """Compare the rows per second and peak memory of building the SunSpec
+    spreadsheet in memory and of streaming it to write-only worksheets"""
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = pathlib.Path(temporary)
+
+        project_path = epcpm.benchmarks.synthetic.create_project(
+            directory=directory / "project",
+            sizes=epcpm.benchmarks.synthetic.Sizes.for_parameters(
+                parameters=parameters,
+            ),
+        )
+
+        results = {}
+        rows = {}
+
+        for name, write_only in (("in memory", False), ("streamed", True)):
+            path = directory / f"{name}.xlsx"
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+            ) as executor:
+                results[name] = executor.submit(
+                    measure,
+                    project_path=project_path,
+                    path=path,
+                    write_only=write_only,
+                ).result()
+
+            rows[name] = workbook_rows(path)
+
+    in_memory_rows, streamed_rows = rows.values()
+    if in_memory_rows != streamed_rows:
+        raise click.ClickException("Generated spreadsheets differ")
+
+    for name, (seconds, peak) in results.items():
+        click.echo(
+            f"{name:<10} {len(rows[name]) / seconds:,.0f} rows/s"
+            f"  peak {peak / 2**20:.1f} MiB",
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,7 +1,14 @@
+import contextlib
+import io
 import os
+import pathlib
+import time
 
+import attr
 import jinja2
 
+import epcpm.output
+
 
 # TODO: CAMPid 073407143081341008467657184603164130
 def format_nested_lists(it, indent=""):
@@ -22,17 +29,167 @@ def format_nested_lists(it, indent=""):
         return result
 
 
-def render(source, destination, context={}, encoding="utf-8", newline="\n"):
-    environment = jinja2.Environment(
+@attr.s
+class Emitter:
+    """Write lines to a stream as they are generated.  Nested lists of lines
+    are indented a level per list as format_nested_lists() would.  When
+    stripping, leading and trailing blank lines are left out along with the
+    newline after the last line until end() is called."""
+
+    stream = attr.ib(factory=io.StringIO)
+    strip = attr.ib(default=False)
+    indentation = attr.ib(default="    ")
+    indent = attr.ib(default="")
+    _started = attr.ib(default=False, init=False)
+    _blank_lines = attr.ib(default=0, init=False)
+
+    def line(self, text):
+        if text.strip() == "":
+            if not self.strip:
+                self.stream.write("\n")
+            elif self._started:
+                self._blank_lines += 1
+
+            return
+
+        if self.strip:
+            if self._started:
+                self.stream.write("\n" * (self._blank_lines + 1))
+
+            self._started = True
+            self._blank_lines = 0
+            self.stream.write(self.indent + text)
+        else:
+            self.stream.write(self.indent + text + "\n")
+
+    def lines(self, it):
+        for item in it:
+            if isinstance(item, list):
+                with self.indented():
+                    self.lines(item)
+            else:
+                self.line(item)
+
+    @contextlib.contextmanager
+    def indented(self):
+        indent = self.indent
+        self.indent += self.indentation
+
+        try:
+            yield
+        finally:
+            self.indent = indent
+
+    def end(self):
+        if self.strip:
+            self.stream.write("\n")
+
+    def getvalue(self):
+        return self.stream.getvalue()
+
+
+@contextlib.contextmanager
+def emit_file(path, encoding="utf-8"):
+    """Stream stripped lines into the file at `path`, leaving it untouched if
+    the content is unchanged."""
+    with epcpm.output.open_text(path=path, encoding=encoding) as f:
+        emitter = Emitter(stream=f, strip=True)
+        yield emitter
+        emitter.end()
+
+
+def write_rstripped(stream, chunks):
+    trailing = ""
+
+    for chunk in chunks:
+        chunk = trailing + chunk
+        stripped = chunk.rstrip()
+        stream.write(stripped)
+        trailing = chunk[len(stripped) :]
+
+
+@attr.s
+class RenderTimes:
+    load = attr.ib(default=0)
+    render = attr.ib(default=0)
+
+
+_render_time_collectors = []
+
+
+@contextlib.contextmanager
+def collect_render_times():
+    render_times = {}
+    _render_time_collectors.append(render_times)
+
+    try:
+        yield render_times
+    finally:
+        _render_time_collectors.remove(render_times)
+
+
+_environments = {}
+_bytecode_cache_directory = None
+
+
+# Compiled templates are kept as bytecode in the given directory while
+# rendering inside the block.
+@contextlib.contextmanager
+def bytecode_cache(directory):
+    global _bytecode_cache_directory
+
+    previous = _bytecode_cache_directory
+    _bytecode_cache_directory = pathlib.Path(directory)
+
+    try:
+        yield
+    finally:
+        _bytecode_cache_directory = previous
+
+
+# Environments keep their loaded templates and only recompile them when the
+# template file changes.
+def environment(directory, newline="\n"):
+    key = (os.fspath(directory), newline, _bytecode_cache_directory)
+
+    cached = _environments.get(key)
+    if cached is not None:
+        return cached
+
+    if _bytecode_cache_directory is None:
+        bytecode_cache = None
+    else:
+        _bytecode_cache_directory.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(
+            directory=os.fspath(_bytecode_cache_directory),
+        )
+
+    created = jinja2.Environment(
         undefined=jinja2.StrictUndefined,
-        loader=jinja2.FileSystemLoader(os.fspath(source.parent)),
+        loader=jinja2.FileSystemLoader(os.fspath(directory)),
         newline_sequence=newline,
         autoescape=False,
         trim_blocks=True,
+        bytecode_cache=bytecode_cache,
     )
-    template = environment.get_template(name=source.name)
+    _environments[key] = created
+
+    return created
+
+
+def render(source, destination, context={}, encoding="utf-8", newline="\n"):
+    start = time.perf_counter()
+    templates = environment(directory=source.parent, newline=newline)
+    template = templates.get_template(name=source.name)
+    loaded = time.perf_counter()
+
+    with epcpm.output.open_text(path=destination, encoding=encoding) as f:
+        write_rstripped(stream=f, chunks=template.generate(context))
+        f.write(newline)
 
-    rendered = template.render(context)
-    rendered = rendered.rstrip() + newline
+    end = time.perf_counter()
 
-    destination.write_bytes(rendered.encode(encoding))
+    for render_times in _render_time_collectors:
+        times = render_times.setdefault(source, RenderTimes())
+        times.load += loaded - start
+        times.render += end - loaded
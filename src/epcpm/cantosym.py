@@ -10,9 +10,13 @@ import epyqlib.pm.parametermodel
 import epyqlib.utils.general
 
 import epcpm.canmodel
+import epcpm.dispatch
+import epcpm.output
+import epcpm.projectindex
 import epcpm.symtoproject
 
 builders = epyqlib.utils.general.TypeMap()
+handlers = epcpm.dispatch.Dispatcher()
 
 
 def dehumanize_name(name):
@@ -23,7 +27,7 @@ def dehumanize_name(name):
 #     return epyqlib.utils.general.spaced_to_upper_camel(name)
 
 
-def export(path, can_model, parameters_model):
+def export(path, can_model, parameters_model, index=None):
     finder = can_model.node_from_uuid
     access_levels = parameters_model.list_selection_roots["access level"]
     builder = epcpm.cantosym.builders.wrap(
@@ -31,11 +35,17 @@ def export(path, can_model, parameters_model):
         access_levels=access_levels,
         parameter_uuid_finder=finder,
         parameter_model=parameters_model,
+        index=index,
     )
 
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        f.write(builder.gen())
+    epcpm.output.write_text(path=path, text=builder.gen())
+
+
+@attr.s
+class Context:
+    access_levels = attr.ib()
+    parameter_uuid_finder = attr.ib(default=None)
 
 
 class SignalOutsideMessageError(Exception):
@@ -73,6 +83,7 @@ class Root:
     access_levels = attr.ib()
     parameter_uuid_finder = attr.ib(default=None)
     parameter_model = attr.ib(default=None)
+    index = attr.ib(default=None)
 
     def gen(self):
         matrix = canmatrix.canmatrix.CanMatrix()
@@ -86,15 +97,21 @@ class Root:
         matrix.add_signal_defines("DisplayDecimalPlaces", "INT 0 65535")
         matrix.add_signal_defines("LongName", "STR")
 
+        context = Context(
+            access_levels=self.access_levels,
+            parameter_uuid_finder=self.parameter_uuid_finder,
+        )
+
         for child in self.wrapped.children:
-            frame = builders.wrap(
-                wrapped=child,
-                access_levels=self.access_levels,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            ).gen()
+            frame = handlers.gen(node=child, context=context)
             matrix.add_frame(frame)
 
-        enumerations = self.collect_enumerations()
+        index = self.index
+        if index is None:
+            index = epcpm.projectindex.ProjectIndex.build(
+                parameters_root=getattr(self.parameter_model, "root", None),
+            )
+
         used_enumerations = {
             signal.enumeration
             for frame in matrix.frames
@@ -102,7 +119,7 @@ class Root:
             if signal.enumeration is not None
         }
 
-        for enumeration in enumerations:
+        for enumeration in index.enumerations:
             if enumeration.name not in used_enumerations:
                 continue
 
@@ -123,415 +140,365 @@ class Root:
 
         return f.read().decode(codec)
 
-    def collect_enumerations(self):
-        collected = []
 
-        if self.parameter_model is None:
-            return collected
+@handlers(epcpm.canmodel.Message)
+def message(context, message):
+    frame = canmatrix.canmatrix.Frame(
+        name=dehumanize_name(message.name),
+        arbitration_id=canmatrix.canmatrix.ArbitrationId(
+            id=message.identifier,
+            extended=message.extended,
+        ),
+        size=message.length,
+        comment=message.comment,
+        cycle_time=(message.cycle_time if message.cycle_time is not None else 0),
+    )
 
-        def collect(node, collected):
-            is_enumeration = isinstance(
-                node,
-                (
-                    epyqlib.pm.parametermodel.Enumeration,
-                    epyqlib.pm.parametermodel.AccessLevels,
-                ),
-            )
-            if is_enumeration:
-                collected.append(node)
+    frame.attributes["Receivable"] = str(message.receivable)
+    frame.attributes["Sendable"] = str(message.sendable)
 
-        self.parameter_model.root.traverse(
-            call_this=collect,
-            payload=collected,
-            internal_nodes=True,
+    for child in message.children:
+        signal = handlers.gen(
+            node=child,
+            context=context,
+            message_length=message.length,
         )
-
-        return collected
-
-
-@builders(epcpm.canmodel.Message)
-@attr.s
-class Message:
-    wrapped = attr.ib()
-    access_levels = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
-
-    def gen(self):
-        frame = canmatrix.canmatrix.Frame(
-            name=dehumanize_name(self.wrapped.name),
-            arbitration_id=canmatrix.canmatrix.ArbitrationId(
-                id=self.wrapped.identifier,
-                extended=self.wrapped.extended,
-            ),
-            size=self.wrapped.length,
-            comment=self.wrapped.comment,
-            cycle_time=(
-                self.wrapped.cycle_time if self.wrapped.cycle_time is not None else 0
-            ),
+        frame.signals.append(signal)
+
+    return frame
+
+
+@handlers(epcpm.canmodel.Signal)
+def signal(
+    context,
+    can_signal,
+    message_length,
+    multiplex_id=None,
+    multiplex_on_write=None,
+    skip_access_level=False,
+    skip_configuration=False,
+):
+    if message_length is not None and (
+        can_signal.start_bit < 0
+        or (message_length * 8 < can_signal.start_bit + can_signal.bits)
+    ):
+        raise SignalOutsideMessageError.build(
+            signal=can_signal,
+            message_length=message_length,
         )
 
-        frame.attributes["Receivable"] = str(self.wrapped.receivable)
-        frame.attributes["Sendable"] = str(self.wrapped.sendable)
-
-        for child in self.wrapped.children:
-            signal = builders.wrap(
-                wrapped=child,
-                message_length=self.wrapped.length,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            ).gen()
-            frame.signals.append(signal)
-
-        return frame
-
-
-@builders(epcpm.canmodel.Signal)
-@attr.s
-class Signal:
-    wrapped = attr.ib()
-    message_length = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
-
-    def gen(
-        self,
-        multiplex_id=None,
-        multiplex_on_write=None,
-        skip_access_level=False,
-        skip_configuration=False,
-    ):
-        if self.message_length is not None and (
-            self.wrapped.start_bit < 0
-            or (self.message_length * 8 < self.wrapped.start_bit + self.wrapped.bits)
+    extras = {}
+    can_find_parameter = (
+        can_signal.parameter_uuid is not None
+        and context.parameter_uuid_finder is not None
+    )
+    parameter = None
+    initial_value = None
+    if can_find_parameter:
+        parameter = context.parameter_uuid_finder(can_signal.parameter_uuid)
+
+        original_parameter = parameter
+        if isinstance(
+            parameter,
+            epyqlib.pm.parametermodel.TableArrayElement,
         ):
-            raise SignalOutsideMessageError.build(
-                signal=self.wrapped,
-                message_length=self.message_length,
-            )
-
-        extras = {}
-        can_find_parameter = (
-            self.wrapped.parameter_uuid is not None
-            and self.parameter_uuid_finder is not None
-        )
-        parameter = None
-        initial_value = None
-        if can_find_parameter:
-            parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
+            array_element = parameter.original
 
-            original_parameter = parameter
             if isinstance(
-                parameter,
-                epyqlib.pm.parametermodel.TableArrayElement,
+                array_element,
+                epyqlib.pm.parametermodel.Parameter,
             ):
-                array_element = parameter.original
+                original_parameter = array_element
+            else:
+                original_parameter = array_element.tree_parent.children[0]
 
-                if isinstance(
-                    array_element,
-                    epyqlib.pm.parametermodel.Parameter,
-                ):
-                    original_parameter = array_element
-                else:
-                    original_parameter = array_element.tree_parent.children[0]
+        if parameter.minimum is not None:
+            extras["min"] = parameter.minimum
 
-            if parameter.minimum is not None:
-                extras["min"] = parameter.minimum
+        if parameter.maximum is not None:
+            extras["max"] = parameter.maximum
 
-            if parameter.maximum is not None:
-                extras["max"] = parameter.maximum
+        if parameter.comment is not None:
+            comment = parameter.comment.strip()
+            if len(comment) > 0:
+                extras["comment"] = comment
 
-            if parameter.comment is not None:
-                comment = parameter.comment.strip()
-                if len(comment) > 0:
-                    extras["comment"] = comment
+        extras["comment"] = "{comment} <rw:{r}:{w}>".format(
+            comment=extras.get("comment", ""),
+            r=1,
+            w=0 if parameter.read_only else 1,
+        ).strip()
 
-            extras["comment"] = "{comment} <rw:{r}:{w}>".format(
-                comment=extras.get("comment", ""),
-                r=1,
-                w=0 if parameter.read_only else 1,
-            ).strip()
+        handle_access_level = (
+            not skip_access_level and parameter.access_level_uuid is not None
+        )
+        if handle_access_level:
+            access_level = context.parameter_uuid_finder(parameter.access_level_uuid)
+            if access_level != access_level.tree_parent.default():
+                extras["comment"] = "{} <{}>".format(
+                    extras.get("comment", ""),
+                    access_level.name.casefold(),
+                ).strip()
 
-            handle_access_level = (
-                not skip_access_level and parameter.access_level_uuid is not None
-            )
-            if handle_access_level:
-                access_level = self.parameter_uuid_finder(parameter.access_level_uuid)
-                if access_level != access_level.tree_parent.default():
-                    extras["comment"] = "{} <{}>".format(
-                        extras.get("comment", ""),
-                        access_level.name.casefold(),
-                    ).strip()
-
-            handle_configuration = (
-                not skip_configuration and parameter.visibility is not None
+        handle_configuration = (
+            not skip_configuration and parameter.visibility is not None
+        )
+        if handle_configuration:
+            configurations = [
+                context.parameter_uuid_finder(u) for u in parameter.visibility
+            ]
+            imported_variants = epcpm.symtoproject.imported_variants
+            if all(v in configurations for v in imported_variants):
+                configurations = None  # don't spam sym with variants
+            if configurations is not None:
+                for cfg in configurations:
+                    if cfg is not None:
+                        extras["comment"] = "{} <{}>".format(
+                            extras.get("comment", ""),
+                            cfg.name,
+                        ).strip()
+
+        if parameter.nv_format is not None:
+            segments = ["nv"]
+
+            nv_flags = ""
+            if parameter.nv_cast:
+                nv_flags += "c"
+
+            segments.append(nv_flags)
+
+            if parameter.nv_factor is not None:
+                segments.append("f{}".format(parameter.nv_factor))
+
+            segments.append(parameter.nv_format)
+
+            extras["comment"] = "{}  <{}>".format(
+                extras.get("comment", ""),
+                ":".join(segments),
+            ).strip()
+        elif (
+            isinstance(
+                original_parameter,
+                epyqlib.pm.parametermodel.Parameter,
             )
-            if handle_configuration:
-                configurations = [
-                    self.parameter_uuid_finder(u) for u in parameter.visibility
+            and original_parameter.uses_interface_item()
+        ):
+            is_table = False
+            ancestor = original_parameter.tree_parent
+            while ancestor is not None:
+                if isinstance(ancestor, epyqlib.pm.parametermodel.Table):
+                    is_table = True
+                    break
+                ancestor = ancestor.tree_parent
+
+            if is_table:
+                getter = "table_items_getMeta"
+                setter = "table_items_setMeta"
+            else:
+                getter = "items_getMeta"
+                setter = "items_setMeta"
+
+            if multiplex_on_write is None:
+                multiplex_on_write = ""
+
+            comment_format_interface_item_segments = ":".join(
+                [
+                    "InterfaceItem",
+                    "{item}",
+                    "{getter}",
+                    "{setter}",
+                    "{multiplex_on_write}",
                 ]
-                imported_variants = epcpm.symtoproject.imported_variants
-                if all(v in configurations for v in imported_variants):
-                    configurations = None  # don't spam sym with variants
-                if configurations is not None:
-                    for cfg in configurations:
-                        if cfg is not None:
-                            extras["comment"] = "{} <{}>".format(
-                                extras.get("comment", ""),
-                                cfg.name,
-                            ).strip()
-
-            if parameter.nv_format is not None:
-                segments = ["nv"]
-
-                nv_flags = ""
-                if parameter.nv_cast:
-                    nv_flags += "c"
-
-                segments.append(nv_flags)
+            )
+            comment_format = f"{{comment}}  <{comment_format_interface_item_segments}>"
+            extras["comment"] = comment_format.format(
+                comment=extras.get("comment", ""),
+                item="interfaceItem_{}".format(
+                    str(can_signal.parameter_uuid).replace("-", "_"),
+                ),
+                getter=getter,
+                setter=setter,
+                multiplex_on_write=multiplex_on_write,
+            ).strip()
 
-                if parameter.nv_factor is not None:
-                    segments.append("f{}".format(parameter.nv_factor))
+        comment = extras.get("comment", "")
+        extras["comment"] = f"{comment}  <uuid:{parameter.uuid}>".strip()
 
-                segments.append(parameter.nv_format)
+        if parameter.units is not None:
+            extras["unit"] = parameter.units
 
-                extras["comment"] = "{}  <{}>".format(
-                    extras.get("comment", ""),
-                    ":".join(segments),
-                ).strip()
-            elif (
-                isinstance(
-                    original_parameter,
-                    epyqlib.pm.parametermodel.Parameter,
-                )
-                and original_parameter.uses_interface_item()
-            ):
-                is_table = False
-                ancestor = original_parameter.tree_parent
-                while ancestor is not None:
-                    if isinstance(ancestor, epyqlib.pm.parametermodel.Table):
-                        is_table = True
-                        break
-                    ancestor = ancestor.tree_parent
-
-                if is_table:
-                    getter = "table_items_getMeta"
-                    setter = "table_items_setMeta"
-                else:
-                    getter = "items_getMeta"
-                    setter = "items_setMeta"
-
-                if multiplex_on_write is None:
-                    multiplex_on_write = ""
-
-                comment_format_interface_item_segments = ":".join(
-                    [
-                        "InterfaceItem",
-                        "{item}",
-                        "{getter}",
-                        "{setter}",
-                        "{multiplex_on_write}",
-                    ]
-                )
-                comment_format = (
-                    f"{{comment}}  <{comment_format_interface_item_segments}>"
-                )
-                extras["comment"] = comment_format.format(
-                    comment=extras.get("comment", ""),
-                    item="interfaceItem_{}".format(
-                        str(self.wrapped.parameter_uuid).replace("-", "_"),
-                    ),
-                    getter=getter,
-                    setter=setter,
-                    multiplex_on_write=multiplex_on_write,
-                ).strip()
+        if can_signal.enumeration_uuid is not None:
+            enumeration = context.parameter_uuid_finder(
+                can_signal.enumeration_uuid,
+            )
 
-            comment = extras.get("comment", "")
-            extras["comment"] = f"{comment}  <uuid:{parameter.uuid}>".strip()
+            extras["enumeration"] = dehumanize_name(enumeration.name)
+            extras["values"] = {v: k for k, v in enumeration.items()}
+
+        if parameter.default is not None:
+            initial_value = parameter.default
+
+    if initial_value is not None:
+        extras["initial_value"] = initial_value
+
+    signal = canmatrix.canmatrix.Signal(
+        name=dehumanize_name(can_signal.name),
+        multiplex=multiplex_id,
+        size=can_signal.bits,
+        is_signed=can_signal.signed,
+        factor=can_signal.factor,
+        start_bit=can_signal.start_bit,
+        calc_min_for_none=False,
+        calc_max_for_none=False,
+        **extras,
+    )
 
-            if parameter.units is not None:
-                extras["unit"] = parameter.units
+    if parameter is not None:
+        attributes = signal.attributes
+
+        attributes["LongName"] = parameter.name
+        attributes["HexadecimalOutput"] = parameter.display_hexadecimal
+
+        if parameter.decimal_places is not None:
+            attributes["DisplayDecimalPlaces"] = parameter.decimal_places
+
+    return signal
+
+
+@handlers(epcpm.canmodel.MultiplexedMessage)
+def multiplexed_message(context, message):
+    common_signals = []
+    not_signals = []
+    table_multiplexers = set()
+    for child in message.children[1:]:
+        if isinstance(child, epcpm.canmodel.Signal):
+            common_signals.append(child)
+        elif isinstance(child, epcpm.canmodel.CanTable):
+            for subchild in child.children:
+                if isinstance(subchild, epcpm.canmodel.Multiplexer):
+                    not_signals.append(subchild)
+                    table_multiplexers.add(subchild)
+        else:
+            not_signals.append(child)
+
+    frame = canmatrix.canmatrix.Frame(
+        name=dehumanize_name(message.name),
+        arbitration_id=canmatrix.canmatrix.ArbitrationId(
+            id=message.identifier,
+            extended=message.extended,
+        ),
+        size=not_signals[0].length,
+        comment=message.comment,
+        cycle_time=(
+            not_signals[0].cycle_time if not_signals[0].cycle_time is not None else 0
+        ),
+        attributes={
+            "Receivable": str(message.receivable),
+            "Sendable": str(message.sendable),
+        },
+    )
 
-            if self.wrapped.enumeration_uuid is not None:
-                enumeration = self.parameter_uuid_finder(
-                    self.wrapped.enumeration_uuid,
-                )
+    if len(message.children) == 0:
+        return frame
 
-                extras["enumeration"] = dehumanize_name(enumeration.name)
-                extras["values"] = {v: k for k, v in enumeration.items()}
+    mux_signal = handlers.gen(
+        node=message.children[0],
+        context=context,
+        message_length=None,
+        multiplex_id="Multiplexor",
+    )
+    frame.signals.append(mux_signal)
 
-            if parameter.default is not None:
-                initial_value = parameter.default
+    for multiplexer in not_signals:
+        if multiplexer.comment is not None:
+            mux_signal.comments[multiplexer.identifier] = multiplexer.comment
 
-        if initial_value is not None:
-            extras["initial_value"] = initial_value
+        # TODO: backmatching
+        if multiplexer in table_multiplexers:
+            mux_signal.comments[multiplexer.identifier] = "{} <{}>".format(
+                mux_signal.comments.get(multiplexer.identifier, ""),
+                "table",
+            ).strip()
 
-        signal = canmatrix.canmatrix.Signal(
-            name=dehumanize_name(self.wrapped.name),
-            multiplex=multiplex_id,
-            size=self.wrapped.bits,
-            is_signed=self.wrapped.signed,
-            factor=self.wrapped.factor,
-            start_bit=self.wrapped.start_bit,
-            calc_min_for_none=False,
-            calc_max_for_none=False,
-            **extras,
-        )
+        name = multiplexer.name
+        if isinstance(multiplexer.tree_parent, epcpm.canmodel.CanTable):
+            name = multiplexer.tree_parent.name + name
+        frame.mux_names[multiplexer.identifier] = dehumanize_name(name)
 
-        if parameter is not None:
-            attributes = signal.attributes
+        def param_special(signal):
+            folded = signal.name.casefold()
 
-            attributes["LongName"] = parameter.name
-            attributes["HexadecimalOutput"] = parameter.display_hexadecimal
+            return folded.startswith("read param - ") or folded == "meta"
 
-            if parameter.decimal_places is not None:
-                attributes["DisplayDecimalPlaces"] = parameter.decimal_places
+        signal_access_levels = set()
 
-        return signal
+        multiplexer_is_read_only = all(
+            context.parameter_uuid_finder(signal.parameter_uuid).read_only
+            for signal in multiplexer.children
+        )
 
+        for signal in multiplexer.children:
+            if param_special(signal):
+                continue
 
-@builders(epcpm.canmodel.MultiplexedMessage)
-@attr.s
-class MultiplexedMessage:
-    wrapped = attr.ib()
-    access_levels = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+            parameter = context.parameter_uuid_finder(signal.parameter_uuid)
+            uuid = parameter.access_level_uuid
 
-    def gen(self):
-        common_signals = []
-        not_signals = []
-        table_multiplexers = set()
-        for child in self.wrapped.children[1:]:
-            if isinstance(child, epcpm.canmodel.Signal):
-                common_signals.append(child)
-            elif isinstance(child, epcpm.canmodel.CanTable):
-                for subchild in child.children:
-                    if isinstance(subchild, epcpm.canmodel.Multiplexer):
-                        not_signals.append(subchild)
-                        table_multiplexers.add(subchild)
+            if uuid is None:
+                access_level = context.access_levels.default()
             else:
-                not_signals.append(child)
-
-        frame = canmatrix.canmatrix.Frame(
-            name=dehumanize_name(self.wrapped.name),
-            arbitration_id=canmatrix.canmatrix.ArbitrationId(
-                id=self.wrapped.identifier,
-                extended=self.wrapped.extended,
-            ),
-            size=not_signals[0].length,
-            comment=self.wrapped.comment,
-            cycle_time=(
-                not_signals[0].cycle_time
-                if not_signals[0].cycle_time is not None
-                else 0
-            ),
-            attributes={
-                "Receivable": str(self.wrapped.receivable),
-                "Sendable": str(self.wrapped.sendable),
-            },
-        )
+                access_level = context.parameter_uuid_finder(uuid)
 
-        if len(self.wrapped.children) == 0:
-            return frame
+            signal_access_levels.add(access_level)
 
-        mux_signal = builders.wrap(
-            wrapped=self.wrapped.children[0],
-            message_length=None,
-            parameter_uuid_finder=self.parameter_uuid_finder,
-        ).gen(
-            multiplex_id="Multiplexor",
-        )
-        frame.signals.append(mux_signal)
+        all_access_levels_match = len(signal_access_levels) == 1
 
-        for multiplexer in not_signals:
-            if multiplexer.comment is not None:
-                mux_signal.comments[multiplexer.identifier] = multiplexer.comment
-
-            # TODO: backmatching
-            if multiplexer in table_multiplexers:
+        if all_access_levels_match:
+            access_level = signal_access_levels.pop()
+            if access_level != access_level.tree_parent.default():
                 mux_signal.comments[multiplexer.identifier] = "{} <{}>".format(
                     mux_signal.comments.get(multiplexer.identifier, ""),
-                    "table",
+                    access_level.name.casefold(),
                 ).strip()
 
-            name = multiplexer.name
-            if isinstance(multiplexer.tree_parent, epcpm.canmodel.CanTable):
-                name = multiplexer.tree_parent.name + name
-            frame.mux_names[multiplexer.identifier] = dehumanize_name(name)
-
-            def param_special(signal):
-                folded = signal.name.casefold()
+        first_new_signal_index = len(frame.signals)
 
-                return folded.startswith("read param - ") or folded == "meta"
-
-            signal_access_levels = set()
-
-            multiplexer_is_read_only = all(
-                self.parameter_uuid_finder(signal.parameter_uuid).read_only
-                for signal in multiplexer.children
+        for signal in multiplexer.children:
+            signal = handlers.gen(
+                node=signal,
+                context=context,
+                message_length=multiplexer.length,
+                multiplex_id=multiplexer.identifier,
+                multiplex_on_write=multiplexer.on_write,
+                skip_access_level=all_access_levels_match,
             )
 
-            for signal in multiplexer.children:
-                if param_special(signal):
-                    continue
-
-                parameter = self.parameter_uuid_finder(signal.parameter_uuid)
-                uuid = parameter.access_level_uuid
-
-                if uuid is None:
-                    access_level = self.access_levels.default()
-                else:
-                    access_level = self.parameter_uuid_finder(uuid)
-
-                signal_access_levels.add(access_level)
-
-            all_access_levels_match = len(signal_access_levels) == 1
-
-            if all_access_levels_match:
-                access_level = signal_access_levels.pop()
-                if access_level != access_level.tree_parent.default():
-                    mux_signal.comments[multiplexer.identifier] = "{} <{}>".format(
-                        mux_signal.comments.get(multiplexer.identifier, ""),
-                        access_level.name.casefold(),
-                    ).strip()
-
-            first_new_signal_index = len(frame.signals)
-
-            for signal in multiplexer.children:
-                signal = builders.wrap(
-                    wrapped=signal,
-                    message_length=multiplexer.length,
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                ).gen(
-                    multiplex_id=multiplexer.identifier,
-                    multiplex_on_write=multiplexer.on_write,
-                    skip_access_level=all_access_levels_match,
-                )
-
-                frame.signals.append(signal)
-
-            frame_signal_names = [
-                signal.name
-                for signal in frame.signals
-                if signal.multiplex == multiplexer.identifier
-            ]
+            frame.signals.append(signal)
+
+        frame_signal_names = [
+            signal.name
+            for signal in frame.signals
+            if signal.multiplex == multiplexer.identifier
+        ]
 
-            for signal in reversed(common_signals):
-                if signal.name in frame_signal_names:
-                    continue
+        for signal in reversed(common_signals):
+            if signal.name in frame_signal_names:
+                continue
 
-                matrix_signal = builders.wrap(
-                    wrapped=signal,
-                    message_length=multiplexer.length,
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                ).gen(
-                    multiplex_id=multiplexer.identifier,
-                )
+            matrix_signal = handlers.gen(
+                node=signal,
+                context=context,
+                message_length=multiplexer.length,
+                multiplex_id=multiplexer.identifier,
+            )
 
-                if signal.name.startswith("ReadParam_") and multiplexer_is_read_only:
-                    matrix_signal.min = 1
-                    matrix_signal.max = None
+            if signal.name.startswith("ReadParam_") and multiplexer_is_read_only:
+                matrix_signal.min = 1
+                matrix_signal.max = None
 
-                frame.signals.insert(first_new_signal_index, matrix_signal)
+            frame.signals.insert(first_new_signal_index, matrix_signal)
 
-        return frame
+    return frame
 
 
 def tweak_reply_signal(sig):
@@ -541,33 +508,23 @@ def tweak_reply_signal(sig):
     return sig
 
 
-@builders(epcpm.canmodel.MultiplexedMessageClone)
-@attr.s
-class MultiplexedMessageClone:
-    wrapped = attr.ib()
-    access_levels = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
-
-    def gen(self):
-        frame = builders.wrap(
-            wrapped=self.wrapped.original,
-            access_levels=self.access_levels,
-            parameter_uuid_finder=self.parameter_uuid_finder,
-        ).gen()
-
-        frame.name = self.wrapped.name
-        frame.arbitration_id = canmatrix.canmatrix.ArbitrationId(
-            id=self.wrapped.identifier,
-            # TODO: should technically have it's own extended attribute
-            #       rather than grabbing from the original
-            extended=self.wrapped.original.extended,
-        )
-        frame.comment = self.wrapped.comment
-        frame.attributes = {
-            "Receivable": str(self.wrapped.receivable),
-            "Sendable": str(self.wrapped.sendable),
-        }
-        for sig in frame.signals[:]:
-            sig = tweak_reply_signal(sig)
+@handlers(epcpm.canmodel.MultiplexedMessageClone)
+def multiplexed_message_clone(context, clone):
+    frame = handlers.gen(node=clone.original, context=context)
 
-        return frame
+    frame.name = clone.name
+    frame.arbitration_id = canmatrix.canmatrix.ArbitrationId(
+        id=clone.identifier,
+        # TODO: should technically have it's own extended attribute
+        #       rather than grabbing from the original
+        extended=clone.original.extended,
+    )
+    frame.comment = clone.comment
+    frame.attributes = {
+        "Receivable": str(clone.receivable),
+        "Sendable": str(clone.sendable),
+    }
+    for sig in frame.signals[:]:
+        sig = tweak_reply_signal(sig)
+
+    return frame
@@ -1,6 +1,7 @@
 import click
 
 import epyqlib.pm.parametermodel
+import epcpm.cli.utils
 import epcpm.parameterstodocx
 import epcpm.project
 
@@ -10,8 +11,13 @@ import epcpm.project
 @click.option("--docx", "docx_file", type=click.File("wb"), required=True)
 @click.option("--template", type=click.File("rb"))
 @click.option("--access-level", default="user")
-def cli(project_file, docx_file, template, access_level):
-    project = epcpm.project.load(project_file)
+@epcpm.cli.utils.cache_option()
+def cli(project_file, docx_file, template, access_level, cache):
+    project = epcpm.project.load(
+        project_file,
+        cache=cache,
+        models=("parameters", "can"),
+    )
 
     (access_levels,) = project.models.parameters.root.nodes_by_filter(
         filter=(lambda node: isinstance(node, epyqlib.pm.parametermodel.AccessLevels)),
@@ -4,6 +4,7 @@ import click
 
 import epyqlib.pm.parametermodel
 
+import epcpm.cli.utils
 import epcpm.parameterstohierarchy
 import epcpm.project
 import epcpm.cantosym
@@ -26,8 +27,13 @@ def relative_path(target, reference):
     type=click.File("w"),
     required=True,
 )
-def cli(project_file, sym_file, hierarchy_file):
-    project = epcpm.project.load(project_file)
+@epcpm.cli.utils.cache_option()
+def cli(project_file, sym_file, hierarchy_file, cache):
+    project = epcpm.project.load(
+        project_file,
+        cache=cache,
+        models=("parameters", "can"),
+    )
 
     (access_levels,) = project.models.parameters.root.nodes_by_filter(
         filter=(lambda node: isinstance(node, epyqlib.pm.parametermodel.AccessLevels)),
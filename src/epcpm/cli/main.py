@@ -15,6 +15,7 @@ import epcpm.importexport
 import epcpm.importexportdialog
 import epcpm.project
 import epcpm.smdx
+import epcpm.uuidlookup
 
 
 @click.group()
@@ -34,7 +35,13 @@ def _import():
 @_import.command()
 @epcpm.cli.utils.project_option(required=True)
 @epcpm.cli.utils.target_path_option(required=True)
-def full(project, target_path):
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of spreadsheet sheets to read concurrently in separate processes",
+)
+def full(project, target_path, jobs):
     """Import PM data from embedded project directory"""
     project = pathlib.Path(project)
 
@@ -42,6 +49,7 @@ def full(project, target_path):
 
     imported_project = epcpm.importexport.full_import(
         paths=paths,
+        jobs=jobs,
     )
 
     project.parent.mkdir(exist_ok=True)
@@ -68,12 +76,76 @@ export.add_command(epcpm.cli.exportdocx.cli, name="docx")
     "include_uuid_in_item",
     default=False,
 )
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of generators to run concurrently in separate processes",
+)
+@click.option(
+    "--interface-shard-items",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Split the interface items into .c files of at most this many",
+)
+@click.option(
+    "--interface-shard-groups/--interface-single-file",
+    default=False,
+    help="Split the interface items into a .c file per top level group",
+)
+@click.option(
+    "--interface-uuid-lookup",
+    type=click.Choice(epcpm.uuidlookup.kinds),
+    default=None,
+    help="Generate a table of the interface items by UUID, binary searched or"
+    " indexed by a perfect hash",
+)
+@click.option(
+    "--interface-mux-dispatch/--no-interface-mux-dispatch",
+    default=False,
+    help="Generate tables of the interface items of each CAN multiplexer",
+)
+@click.option(
+    "--compact-item-ids/--full-item-uuids",
+    default=False,
+    help="Identify SIL items, and interface items when including UUIDs, by a"
+    " 32 bit hash of their UUID listed in a .ids.json file",
+)
+@click.option(
+    "--sunspec-refresh/--no-sunspec-refresh",
+    default=False,
+    help="Generate functions refreshing each SunSpec model and block with its"
+    " scale factors updated once",
+)
+@click.option(
+    "--sunspec-power-of-ten-scaling/--sunspec-runtime-scaling",
+    default=False,
+    help="Scale SunSpec points by a table of powers of ten, or a fixed"
+    " multiplier for scale factors limited to one value",
+)
+@click.option(
+    "--sunspec-spreadsheet-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes building the SunSpec spreadsheet's models",
+)
+@epcpm.cli.utils.cache_option()
 def build(
     project,
     target_path,
     only_if_stale,
     skip_sunspec,
     include_uuid_in_item,
+    jobs,
+    interface_shard_items,
+    interface_shard_groups,
+    interface_uuid_lookup,
+    interface_mux_dispatch,
+    compact_item_ids,
+    sunspec_refresh,
+    sunspec_power_of_ten_scaling,
+    sunspec_spreadsheet_jobs,
+    cache,
 ):
     """Export PM data to embedded project directory"""
     project = pathlib.Path(project)
@@ -81,32 +153,74 @@ def build(
 
     paths = epcpm.importexportdialog.paths_from_directory(target_path)
 
+    generators = epcpm.importexport.generators
+    options = epcpm.importexport.ExportOptions(
+        skip_sunspec=skip_sunspec,
+        include_uuid_in_item=include_uuid_in_item,
+        interface_shard_items=interface_shard_items,
+        interface_shard_groups=interface_shard_groups,
+        interface_uuid_lookup=interface_uuid_lookup,
+        interface_mux_dispatch=interface_mux_dispatch,
+        compact_item_ids=compact_item_ids,
+        sunspec_refresh=sunspec_refresh,
+        sunspec_power_of_ten_scaling=sunspec_power_of_ten_scaling,
+        sunspec_spreadsheet_jobs=sunspec_spreadsheet_jobs,
+    )
+
     if only_if_stale:
-        if not epcpm.importexport.is_stale(
-            project=project,
+        generators = epcpm.importexport.stale_generators(
+            project_path=project,
             paths=paths,
-            skip_sunspec=skip_sunspec,
-        ):
+            target_directory=target_path,
+            options=options,
+        )
+
+        if len(generators) == 0:
             click.echo(
                 "Generated files appear to be up to date, skipping export",
             )
 
             return
 
-        click.echo("Generated files appear to be out of date, starting export")
+        names = ", ".join(generator.name for generator in generators)
+        click.echo(f"Generated files appear to be out of date, regenerating: {names}")
 
-    loaded_project = epcpm.project.loadp(project)
+    loaded_project = epcpm.project.loadp(
+        project,
+        cache=cache,
+        models=epcpm.importexport.required_models(
+            generators=generators,
+            options=options,
+        ),
+    )
 
-    epcpm.importexport.full_export(
+    statistics = epcpm.importexport.full_export(
         project=loaded_project,
         target_directory=target_path,
         paths=paths,
         first_time=False,
         skip_sunspec=skip_sunspec,
         include_uuid_in_item=include_uuid_in_item,
+        jobs=jobs,
+        generators=generators,
+        record_manifest=True,
+        interface_shard_items=interface_shard_items,
+        interface_shard_groups=interface_shard_groups,
+        interface_uuid_lookup=interface_uuid_lookup,
+        interface_mux_dispatch=interface_mux_dispatch,
+        compact_item_ids=compact_item_ids,
+        sunspec_refresh=sunspec_refresh,
+        sunspec_power_of_ten_scaling=sunspec_power_of_ten_scaling,
+        sunspec_spreadsheet_jobs=sunspec_spreadsheet_jobs,
     )
 
     click.echo()
+    click.echo(
+        f"{statistics.written} generated files written,"
+        f" {statistics.skipped} unchanged",
+    )
+    if statistics.flash_saved > 0:
+        click.echo(f"{statistics.flash_saved} bytes of flash saved by item ids")
     click.echo("done")
 
 
@@ -351,10 +465,11 @@ def pmvs():
 @epcpm.cli.utils.project_option(required=True)
 @click.option("--input", type=click.File())
 @click.option("--output", type=click.Path(dir_okay=False))
-def filter(project, input, output):
+@epcpm.cli.utils.cache_option()
+def filter(project, input, output, cache):
     """Export PM data to embedded project directory"""
     project = pathlib.Path(project)
-    project = epcpm.project.loadp(project)
+    project = epcpm.project.loadp(project, cache=cache, models=("parameters",))
 
     value_set = epyqlib.pm.valuesetmodel.load(input)
     items = epcpm.parameterstosil.collect_items(project.models.parameters.root)
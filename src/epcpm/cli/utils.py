@@ -17,3 +17,11 @@ def target_path_option(required):
         required=required,
         help="Path to the embedded project to operate on",
     )
+
+
+def cache_option():
+    return click.option(
+        "--cache/--no-cache",
+        default=False,
+        help="Reuse deserialized models stored in .pm-cache next to the project",
+    )
@@ -0,0 +1,44 @@
+import attr
+
+
+@attr.s
+class Dispatcher:
+    """Call the function registered for a node's type with a context shared
+    by the whole generation, rather than wrapping each node in a builder.
+
+    Types without a function of their own use the one registered for their
+    nearest base type.  Lookups are cached per type."""
+
+    handlers = attr.ib(factory=dict, init=False)
+    resolved = attr.ib(factory=dict, init=False, repr=False)
+
+    def __call__(self, *types):
+        def inner(f):
+            for type_ in types:
+                self.handlers[type_] = f
+
+            self.resolved.clear()
+
+            return f
+
+        return inner
+
+    def __getitem__(self, type_):
+        try:
+            return self.resolved[type_]
+        except KeyError:
+            pass
+
+        for base in type_.__mro__:
+            handler = self.handlers.get(base)
+            if handler is not None:
+                break
+        else:
+            raise KeyError(type_)
+
+        self.resolved[type_] = handler
+
+        return handler
+
+    def gen(self, node, context, **kwargs):
+        return self[type(node)](context, node, **kwargs)
@@ -1,17 +1,23 @@
-import itertools
-import math
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
 import os
 import pathlib
 import subprocess
 
 import attr
-import graham
 
+import epcpm.c
 import epcpm.cantosym
+import epcpm.itemids
+import epcpm.output
 import epcpm.parameterstohierarchy
 import epcpm.parameterstointerface
 import epcpm.parameterstosil
+import epcpm.parametervisitor
 import epcpm.project
+import epcpm.projectindex
 import epcpm.smdxtosunspec
 import epcpm.sunspecmodel
 import epcpm.sunspecmodel
@@ -24,7 +30,7 @@ import epcpm.symtoproject
 import epyqlib.attrsmodel
 
 
-def full_import(paths):
+def full_import(paths, jobs=1):
     with open(paths.can, "rb") as sym, open(paths.hierarchy) as hierarchy:
         parameters_root, can_root, sunspec_root = epcpm.symtoproject.load_can_file(
             can_file=sym,
@@ -82,7 +88,7 @@ def full_import(paths):
         for point in block.children
     )
 
-    get_set = epcpm.smdxtosunspec.import_get_set(paths.spreadsheet)
+    get_set = epcpm.smdxtosunspec.import_get_set(paths.spreadsheet, jobs=jobs)
 
     for model, block, point in points:
         parameter = project.models.sunspec.node_from_uuid(
@@ -105,89 +111,569 @@ def full_import(paths):
     return project
 
 
-def full_export(
-    project,
-    paths,
-    target_directory,
-    first_time=False,
-    skip_sunspec=False,
-    include_uuid_in_item=False,
-):
+class GeneratorError(Exception):
+    @classmethod
+    def build(cls, failures):
+        details = "\n".join(
+            f"    {name}: {type(error).__name__}: {error}" for name, error in failures
+        )
+        names = ", ".join(name for name, error in failures)
+        message = f"Export generator(s) failed: {names}\n{details}"
+
+        return cls(message)
+
+
+@attr.s(frozen=True)
+class ExportOptions:
+    skip_sunspec = attr.ib(default=False)
+    include_uuid_in_item = attr.ib(default=False)
+    # split interfaceGen.c after this many parameters and tables
+    interface_shard_items = attr.ib(default=None)
+    # split interfaceGen.c at each top level parameter group
+    interface_shard_groups = attr.ib(default=False)
+    # generate a lookup of the interface items by UUID, see epcpm.uuidlookup
+    interface_uuid_lookup = attr.ib(default=None)
+    # generate the interface items of each CAN multiplexer
+    interface_mux_dispatch = attr.ib(default=False)
+    # identify items by a 32 bit hash of their UUID, see epcpm.itemids
+    compact_item_ids = attr.ib(default=False)
+    # generate refresh functions per SunSpec model, see epcpm.sunspecrefresh
+    sunspec_refresh = attr.ib(default=False)
+    # scale SunSpec points by a table of powers of ten, see epcpm.sunspecscale
+    sunspec_power_of_ten_scaling = attr.ib(default=False)
+    # build the SunSpec spreadsheet's models in this many processes, the
+    # output is the same for any count so no generator declares it
+    sunspec_spreadsheet_jobs = attr.ib(default=1)
+
+
+@attr.s(frozen=True)
+class Generator:
+    name = attr.ib()
+    export = attr.ib()
+    # names of the project models the generator reads
+    models = attr.ib()
+    # callable taking the import/export paths and the export options and
+    # returning the paths the generator writes
+    outputs = attr.ib()
+    # the SunSpec model is not read when SunSpec generation is skipped
+    sunspec_skippable = attr.ib(default=False)
+    # callable taking the export arguments and returning a parameter visitor
+    # target which writes the outputs when finished, letting generators share
+    # one walk of the parameter tree
+    target = attr.ib(default=None)
+    # names of the export options the generator's output depends on, only
+    # these are recorded in its manifest entry
+    options = attr.ib(default=())
+
+
+def required_models(generators, options):
+    names = set()
+
+    for generator in generators:
+        for name in generator.models:
+            skipped = (
+                name == "sunspec"
+                and options.skip_sunspec
+                and generator.sunspec_skippable
+            )
+            if not skipped:
+                names.add(name)
+
+    return names
+
+
+def sym_outputs(paths, options):
+    return (paths.can,)
+
+
+def hierarchy_outputs(paths, options):
+    return (paths.hierarchy,)
+
+
+def interface_outputs(paths, options):
+    sharded = (
+        options.interface_shard_items is not None or options.interface_shard_groups
+    )
+
+    return (
+        paths.interface_c,
+        paths.interface_c.with_suffix(".h"),
+        *epcpm.parameterstointerface.shard_outputs(
+            c_path=paths.interface_c,
+            sharded=sharded,
+        ),
+        *epcpm.itemids.sidecar_outputs(
+            c_path=paths.interface_c,
+            compact_item_ids=(
+                options.include_uuid_in_item and options.compact_item_ids
+            ),
+        ),
+    )
+
+
+def spreadsheet_outputs(paths, options):
+    return (
+        paths.spreadsheet,
+        paths.spreadsheet_user,
+        epcpm.sunspectoxlsx.register_map_path(paths.spreadsheet),
+    )
+
+
+def sunspec_tables_outputs(paths, options):
+    return (paths.sunspec_tables_c, paths.sunspec_tables_c.with_suffix(".h"))
+
+
+def sil_outputs(paths, options):
+    return (
+        paths.sil_c,
+        paths.sil_c.with_suffix(".h"),
+        *epcpm.itemids.sidecar_outputs(
+            c_path=paths.sil_c,
+            compact_item_ids=options.compact_item_ids,
+        ),
+    )
+
+
+def sunspec_bitfields_outputs(paths, options):
+    return (
+        paths.sunspec_bitfields_c,
+        paths.sunspec_bitfields_c.with_suffix(".h"),
+    )
+
+
+def export_sym(project, index, paths, options):
     epcpm.cantosym.export(
         path=paths.can,
         can_model=project.models.can,
         parameters_model=project.models.parameters,
+        index=index,
     )
 
+
+def export_hierarchy(project, index, paths, options):
     epcpm.parameterstohierarchy.export(
         path=paths.hierarchy,
         can_model=project.models.can,
         parameters_model=project.models.parameters,
+        index=index,
+    )
+
+
+def hierarchy_target(project, index, paths, options):
+    return epcpm.parameterstohierarchy.Target.build(
+        parameters_root=project.models.parameters.root,
+        can_root=project.models.can.root,
+        index=index,
+        path=paths.hierarchy,
     )
 
+
+def export_interface(project, index, paths, options):
     epcpm.parameterstointerface.export(
         c_path=paths.interface_c,
         h_path=paths.interface_c.with_suffix(".h"),
         can_model=project.models.can,
         sunspec_model=project.models.sunspec,
         parameters_model=project.models.parameters,
-        skip_sunspec=skip_sunspec,
-        include_uuid_in_item=include_uuid_in_item,
+        skip_sunspec=options.skip_sunspec,
+        include_uuid_in_item=options.include_uuid_in_item,
+        index=index,
+        shard_items=options.interface_shard_items,
+        shard_groups=options.interface_shard_groups,
+        uuid_lookup=options.interface_uuid_lookup,
+        mux_dispatch=options.interface_mux_dispatch,
+        compact_item_ids=options.compact_item_ids,
     )
 
-    epcpm.sunspectoxlsx.export(
-        path=paths.spreadsheet,
-        sunspec_model=project.models.sunspec,
-        parameters_model=project.models.parameters,
-        skip_sunspec=skip_sunspec,
+
+def interface_target(project, index, paths, options):
+    if options.skip_sunspec:
+        sunspec_root = None
+    else:
+        sunspec_root = project.models.sunspec.root
+
+    return epcpm.parameterstointerface.Target.build(
+        parameters_root=project.models.parameters.root,
+        can_root=project.models.can.root,
+        sunspec_root=sunspec_root,
+        include_uuid_in_item=options.include_uuid_in_item,
+        index=index,
+        c_path=paths.interface_c,
+        h_path=paths.interface_c.with_suffix(".h"),
+        shard_items=options.interface_shard_items,
+        shard_groups=options.interface_shard_groups,
+        uuid_lookup=options.interface_uuid_lookup,
+        mux_dispatch=options.interface_mux_dispatch,
+        compact_item_ids=options.compact_item_ids,
     )
 
-    epcpm.sunspectoxlsx.export(
-        path=paths.spreadsheet_user,
+
+def export_spreadsheet(project, index, paths, options):
+    all_columns = epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True)
+
+    # both are written from one build of the rows, the user spreadsheet just
+    # leaves out the C code columns
+    epcpm.sunspectoxlsx.export_many(
+        destinations=[
+            (paths.spreadsheet, all_columns),
+            (
+                paths.spreadsheet_user,
+                attr.evolve(all_columns, get=False, set=False, item=False),
+            ),
+        ],
         sunspec_model=project.models.sunspec,
         parameters_model=project.models.parameters,
-        skip_sunspec=skip_sunspec,
-        column_filter=attr.evolve(
-            epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True),
-            get=False,
-            set=False,
-            item=False,
-        ),
+        skip_sunspec=options.skip_sunspec,
+        index=index,
+        power_of_ten_scaling=options.sunspec_power_of_ten_scaling,
+        register_map=epcpm.sunspectoxlsx.register_map_path(paths.spreadsheet),
+        jobs=options.sunspec_spreadsheet_jobs,
     )
 
+
+def export_sunspec_tables(project, index, paths, options):
     epcpm.sunspectotablesc.export(
         c_path=paths.sunspec_tables_c,
         h_path=paths.sunspec_tables_c.with_suffix(".h"),
         sunspec_model=project.models.sunspec,
-        skip_sunspec=skip_sunspec,
+        skip_sunspec=options.skip_sunspec,
+        index=index,
+        refresh=options.sunspec_refresh,
+        power_of_ten_scaling=options.sunspec_power_of_ten_scaling,
     )
 
+
+def export_sil(project, index, paths, options):
     epcpm.parameterstosil.export(
         c_path=paths.sil_c,
         h_path=paths.sil_c.with_suffix(".h"),
         parameters_model=project.models.parameters,
+        compact_item_ids=options.compact_item_ids,
+    )
+
+
+def sil_target(project, index, paths, options):
+    return epcpm.parameterstosil.Target.build(
+        c_path=paths.sil_c,
+        h_path=paths.sil_c.with_suffix(".h"),
+        compact_item_ids=options.compact_item_ids,
     )
 
+
+def export_sunspec_bitfields(project, index, paths, options):
     epcpm.sunspectobitfieldsc.export(
         c_path=paths.sunspec_bitfields_c,
         h_path=paths.sunspec_bitfields_c.with_suffix(".h"),
         sunspec_model=project.models.sunspec,
+        include_uuid_in_item=options.include_uuid_in_item,
+        skip_sunspec=options.skip_sunspec,
+    )
+
+
+generators = (
+    Generator(
+        name="sym",
+        export=export_sym,
+        models=("parameters", "can"),
+        outputs=sym_outputs,
+    ),
+    Generator(
+        name="hierarchy",
+        export=export_hierarchy,
+        models=("parameters", "can"),
+        outputs=hierarchy_outputs,
+        target=hierarchy_target,
+    ),
+    Generator(
+        name="interface",
+        export=export_interface,
+        models=("parameters", "can", "sunspec"),
+        outputs=interface_outputs,
+        options=(
+            "skip_sunspec",
+            "include_uuid_in_item",
+            "interface_shard_items",
+            "interface_shard_groups",
+            "interface_uuid_lookup",
+            "interface_mux_dispatch",
+            "compact_item_ids",
+        ),
+        sunspec_skippable=True,
+        target=interface_target,
+    ),
+    Generator(
+        name="spreadsheet",
+        export=export_spreadsheet,
+        models=("parameters", "sunspec"),
+        outputs=spreadsheet_outputs,
+        options=("skip_sunspec", "sunspec_power_of_ten_scaling"),
+        sunspec_skippable=True,
+    ),
+    Generator(
+        name="sunspec_tables",
+        export=export_sunspec_tables,
+        models=("parameters", "sunspec"),
+        outputs=sunspec_tables_outputs,
+        options=(
+            "skip_sunspec",
+            "sunspec_refresh",
+            "sunspec_power_of_ten_scaling",
+        ),
+        sunspec_skippable=True,
+    ),
+    Generator(
+        name="sil",
+        export=export_sil,
+        models=("parameters",),
+        outputs=sil_outputs,
+        options=("compact_item_ids",),
+        target=sil_target,
+    ),
+    Generator(
+        name="sunspec_bitfields",
+        export=export_sunspec_bitfields,
+        models=("parameters", "sunspec"),
+        outputs=sunspec_bitfields_outputs,
+        options=("skip_sunspec", "include_uuid_in_item"),
+        sunspec_skippable=True,
+    ),
+)
+
+# Set in the parent before the worker pool is created so that forked workers
+# inherit the already loaded project rather than having it pickled to them.
+_worker_project = None
+_worker_index = None
+
+
+def _initialize_worker(project_path, models):
+    global _worker_project
+    global _worker_index
+
+    if project_path is not None:
+        _worker_project = epcpm.project.loadp(project_path, models=models)
+        _worker_index = epcpm.projectindex.ProjectIndex.from_models(
+            models=_worker_project.models,
+        )
+
+
+def walk_targets(generators, project, index, paths, options):
+    """Create the targets of the generators that have them and walk the
+    parameter tree once for all of them.  Errors are kept with each target
+    and raised when it is finished."""
+    targets = {}
+
+    for generator in generators:
+        if generator.target is None:
+            continue
+
+        try:
+            target = generator.target(
+                project=project,
+                index=index,
+                paths=paths,
+                options=options,
+            )
+        except Exception as e:
+            targets[generator.name] = epcpm.parametervisitor.Isolated(
+                target=None,
+                error=e,
+            )
+        else:
+            targets[generator.name] = epcpm.parametervisitor.Isolated(
+                target=target,
+            )
+
+    if len(targets) > 0:
+        epcpm.parametervisitor.walk(
+            root=project.models.parameters.root,
+            targets=targets.values(),
+        )
+
+    return targets
+
+
+def _run_generator(generator, project, index, paths, options, target=None):
+    with epcpm.output.collect() as statistics:
+        if target is None:
+            generator.export(
+                project=project,
+                index=index,
+                paths=paths,
+                options=options,
+            )
+        else:
+            target.finish()
+
+    return statistics
+
+
+def _run_generator_in_worker(generator, paths, options):
+    return _run_generator(
+        generator=generator,
+        project=_worker_project,
+        index=_worker_index,
+        paths=paths,
+        options=options,
+    )
+
+
+def run_generators(generators, project, paths, options, jobs=1, index=None):
+    if index is None and len(generators) > 0:
+        index = epcpm.projectindex.ProjectIndex.from_models(models=project.models)
+
+    failures = []
+    statistics = epcpm.output.Statistics()
+
+    if jobs == 1:
+        targets = walk_targets(
+            generators=generators,
+            project=project,
+            index=index,
+            paths=paths,
+            options=options,
+        )
+
+        for generator in generators:
+            try:
+                statistics += _run_generator(
+                    generator=generator,
+                    project=project,
+                    index=index,
+                    paths=paths,
+                    options=options,
+                    target=targets.get(generator.name),
+                )
+            except Exception as e:
+                failures.append((generator.name, e))
+    else:
+        global _worker_project
+        global _worker_index
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            project_path = None
+        elif project.filename is not None:
+            # without fork each worker has to load its own copy
+            context = multiprocessing.get_context("spawn")
+            project_path = project.filename
+        else:
+            return run_generators(
+                generators=generators,
+                project=project,
+                paths=paths,
+                options=options,
+                index=index,
+            )
+
+        _worker_project = project
+        _worker_index = index
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=context,
+                initializer=_initialize_worker,
+                initargs=(
+                    project_path,
+                    required_models(generators=generators, options=options),
+                ),
+            ) as executor:
+                futures = [
+                    (
+                        generator,
+                        executor.submit(
+                            _run_generator_in_worker,
+                            generator=generator,
+                            paths=paths,
+                            options=options,
+                        ),
+                    )
+                    for generator in generators
+                ]
+
+                for generator, future in futures:
+                    try:
+                        statistics += future.result()
+                    except Exception as e:
+                        failures.append((generator.name, e))
+        finally:
+            _worker_project = None
+            _worker_index = None
+
+    if len(failures) > 0:
+        raise GeneratorError.build(failures=failures) from failures[0][1]
+
+    return statistics
+
+
+def full_export(
+    project,
+    paths,
+    target_directory,
+    first_time=False,
+    skip_sunspec=False,
+    include_uuid_in_item=False,
+    jobs=1,
+    generators=generators,
+    record_manifest=False,
+    interface_shard_items=None,
+    interface_shard_groups=False,
+    interface_uuid_lookup=None,
+    interface_mux_dispatch=False,
+    compact_item_ids=False,
+    sunspec_refresh=False,
+    sunspec_power_of_ten_scaling=False,
+    sunspec_spreadsheet_jobs=1,
+):
+    options = ExportOptions(
+        skip_sunspec=skip_sunspec,
         include_uuid_in_item=include_uuid_in_item,
+        interface_shard_items=interface_shard_items,
+        interface_shard_groups=interface_shard_groups,
+        interface_uuid_lookup=interface_uuid_lookup,
+        interface_mux_dispatch=interface_mux_dispatch,
+        compact_item_ids=compact_item_ids,
+        sunspec_refresh=sunspec_refresh,
+        sunspec_power_of_ten_scaling=sunspec_power_of_ten_scaling,
+        sunspec_spreadsheet_jobs=sunspec_spreadsheet_jobs,
     )
 
-    if first_time and not skip_sunspec:
-        epcpm.sunspectomanualc.export(
-            path=paths.sunspec_c,
-            sunspec_model=project.models.sunspec,
+    with epcpm.c.bytecode_cache(template_cache_directory(target_directory)):
+        statistics = run_generators(
+            generators=generators,
+            project=project,
+            paths=paths,
+            options=options,
+            jobs=jobs,
         )
 
-        epcpm.sunspectomanualh.export(
-            path=paths.sunspec_c,
-            sunspec_model=project.models.sunspec,
+    if record_manifest:
+        # only valid when the in-memory project matches the files on disk
+        update_manifest(
+            project_path=project.filename,
+            paths=paths,
+            target_directory=target_directory,
+            options=options,
+            generators=generators,
         )
 
+    if first_time and not skip_sunspec:
+        with epcpm.output.collect() as manual_statistics:
+            epcpm.sunspectomanualc.export(
+                path=paths.sunspec_c,
+                sunspec_model=project.models.sunspec,
+            )
+
+            epcpm.sunspectomanualh.export(
+                path=paths.sunspec_c,
+                sunspec_model=project.models.sunspec,
+            )
+
+        statistics += manual_statistics
+
     run_generation_scripts(target_directory, skip_sunspec=skip_sunspec)
 
+    return statistics
+
 
 def run_generation_scripts(base_path, skip_sunspec=False):
     scripts = base_path / "venv" / "Scripts"
@@ -221,68 +707,161 @@ def run_generation_scripts(base_path, skip_sunspec=False):
     )
 
 
-def modification_time_or(path, alternative):
-    try:
-        return path.stat().st_mtime
-    except FileNotFoundError:
-        return alternative
+manifest_format_version = 1
 
 
-def get_sunspec_models(path):
-    root_schema = graham.schema(epcpm.sunspecmodel.Root)
-    raw = path.read_bytes()
-    root = root_schema.loads(raw).data
+def build_directory(target_directory):
+    return pathlib.Path(target_directory) / ".pm-build"
 
-    return tuple(
-        child.id
-        for child in root.children
-        if isinstance(child, epcpm.sunspecmodel.Model)
-    )
 
+def manifest_path(target_directory):
+    return build_directory(target_directory) / "manifest.json"
 
-def is_stale(project, paths, skip_sunspec=False):
-    loaded_project = epcpm.project.loadp(project, post_load=False)
 
-    source_paths = (
-        project,
-        *(project.parent / path for path in attr.astuple(loaded_project.paths)),
-    )
+def template_cache_directory(target_directory):
+    return build_directory(target_directory) / "templates"
 
-    source_modification_time = max(path.stat().st_mtime for path in source_paths)
 
-    if skip_sunspec:
-        sunspec_models = []
-    else:
-        sunspec_models = get_sunspec_models(
-            project.parent / loaded_project.paths.sunspec,
-        )
+def file_digest(path):
+    return hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
 
-    smdx = tuple(paths.sunspec_c / f"smdx_{model:05}.xml" for model in sunspec_models)
 
-    sunspec_c_h = tuple(
-        paths.sunspec_c / f"sunspecInterfaceGen{model}.{extension}"
-        for model, extension in itertools.product(sunspec_models, ("c", "h"))
-    )
+def model_paths(project_path):
+    project_path = pathlib.Path(project_path)
+    loaded_project = epcpm.project.loadp(project_path, post_load=False)
 
-    sil_c_h = (paths.sil_c, paths.sil_c.with_suffix(".h"))
+    return {
+        name: project_path.parent / path
+        for name, path in loaded_project.paths.items()
+        if path is not None
+    }
 
-    destination_paths = [
-        paths.can,
-        paths.hierarchy,
-        *paths.smdx,
-        paths.spreadsheet,
-        paths.spreadsheet_user,
-        *smdx,
-        *sunspec_c_h,
-        paths.tables_c,
-        *sil_c_h,
-    ]
-
-    destination_modification_time = min(
-        modification_time_or(path=path, alternative=-math.inf)
-        for path in destination_paths
-    )
 
-    destination_newer_by = destination_modification_time - source_modification_time
+def template_path(path):
+    return path.with_suffix(f"{path.suffix}_pm")
+
+
+def input_digest(generator, model_paths, paths, options):
+    hash = hashlib.sha256()
+
+    def update(*values):
+        for value in values:
+            hash.update(str(value).encode("utf-8"))
+            hash.update(b"\0")
+
+    update(manifest_format_version, epcpm.__version__, generator.name)
+    update(*(f"{name}={getattr(options, name)}" for name in sorted(generator.options)))
+
+    for name in generator.models:
+        path = model_paths.get(name)
+        update(name, None if path is None else file_digest(path))
+
+    for output in generator.outputs(paths=paths, options=options):
+        template = template_path(output)
+        if template.is_file():
+            update(template.name, file_digest(template))
+
+    return hash.hexdigest()
+
+
+def output_digests(generator, paths, target_directory, options):
+    target_directory = pathlib.Path(target_directory)
+
+    return {
+        os.fspath(output.relative_to(target_directory)): file_digest(output)
+        for output in generator.outputs(paths=paths, options=options)
+    }
 
-    return destination_newer_by < 1
+
+def load_manifest(target_directory):
+    try:
+        raw = manifest_path(target_directory).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return {}
+
+    manifest = json.loads(raw)
+
+    if manifest.get("version") != manifest_format_version:
+        return {}
+
+    return manifest.get("generators", {})
+
+
+def stale_generators(
+    project_path,
+    paths,
+    target_directory,
+    options,
+    generators=generators,
+):
+    manifest = load_manifest(target_directory)
+    models = model_paths(project_path)
+
+    stale = []
+
+    for generator in generators:
+        recorded = manifest.get(generator.name)
+
+        if recorded is None:
+            stale.append(generator)
+            continue
+
+        inputs = input_digest(
+            generator=generator,
+            model_paths=models,
+            paths=paths,
+            options=options,
+        )
+
+        if inputs != recorded["inputs"]:
+            stale.append(generator)
+            continue
+
+        try:
+            outputs = output_digests(
+                generator=generator,
+                paths=paths,
+                target_directory=target_directory,
+                options=options,
+            )
+        except FileNotFoundError:
+            stale.append(generator)
+            continue
+
+        if outputs != recorded["outputs"]:
+            stale.append(generator)
+
+    return stale
+
+
+def update_manifest(project_path, paths, target_directory, options, generators):
+    if project_path is None:
+        return
+
+    manifest = load_manifest(target_directory)
+    models = model_paths(project_path)
+
+    for generator in generators:
+        manifest[generator.name] = {
+            "inputs": input_digest(
+                generator=generator,
+                model_paths=models,
+                paths=paths,
+                options=options,
+            ),
+            "outputs": output_digests(
+                generator=generator,
+                paths=paths,
+                target_directory=target_directory,
+                options=options,
+            ),
+        }
+
+    path = manifest_path(target_directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    s = json.dumps(
+        {"version": manifest_format_version, "generators": manifest},
+        indent=4,
+        sort_keys=True,
+    )
+    path.write_text(s + "\n", encoding="utf-8")
@@ -0,0 +1,90 @@
+import hashlib
+import itertools
+import json
+
+import attr
+
+import epcpm.output
+
+
+sidecar_format_version = 1
+uuid_bytes = 16
+id_bytes = 4
+
+
+def item_id(uuid_, salt=0):
+    data = uuid_.bytes
+
+    if salt != 0:
+        data += salt.to_bytes(4, "little")
+
+    digest = hashlib.sha256(data).digest()
+
+    return int.from_bytes(digest[:id_bytes], "little")
+
+
+def literal(id_):
+    return f"0x{id_:08x}u"
+
+
+@attr.s
+class ItemIds:
+    """Assign each UUID a 32 bit id hashed from it.  An id already given to
+    another UUID is skipped by hashing again with a salt, so a collision
+    only changes the id of whichever UUID is generated later."""
+
+    ids = attr.ib(factory=dict)
+    used = attr.ib(factory=set)
+    collisions = attr.ib(default=0)
+
+    def get(self, uuid_):
+        id_ = self.ids.get(uuid_)
+
+        if id_ is None:
+            for salt in itertools.count():
+                id_ = item_id(uuid_=uuid_, salt=salt)
+
+                if id_ not in self.used:
+                    break
+
+                self.collisions += 1
+
+            self.ids[uuid_] = id_
+            self.used.add(id_)
+
+        return id_
+
+
+def sidecar_path(c_path):
+    return c_path.with_suffix(".ids.json")
+
+
+def sidecar_outputs(c_path, compact_item_ids):
+    return [sidecar_path(c_path)] if compact_item_ids else []
+
+
+def update_sidecar(c_path, item_ids, flash_saved):
+    """Write the UUID to id mapping next to the generated source for host
+    tools, or remove it when `item_ids` is None."""
+    path = sidecar_path(c_path)
+
+    if item_ids is None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+        return
+
+    s = json.dumps(
+        {
+            "version": sidecar_format_version,
+            "flash_saved": flash_saved,
+            "collisions": item_ids.collisions,
+            "ids": {str(uuid_): literal(id_) for uuid_, id_ in item_ids.ids.items()},
+        },
+        indent=4,
+        sort_keys=True,
+    )
+    epcpm.output.write_text(path=path, text=s + "\n")
+    epcpm.output.record_flash_saved(flash_saved)
@@ -523,18 +523,7 @@ class Window:
         self.value_set = value_set
 
     def check(self):
-        root = epyqlib.checkresultmodel.Root()
-
-        for name, model in self.project.models.items():
-            node = epyqlib.checkresultmodel.Node.build(
-                name=name,
-                node=model.root,
-            )
-            model.root.check_and_append(
-                parent=node,
-                models=self.project.models,
-            )
-            root.append_child(node)
+        root = self.project.models.check()
 
         # self.check_view = QtWidgets.QTreeView()
         # self.check_model = epyqlib.attrsmodel.Model(
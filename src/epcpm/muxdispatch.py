@@ -0,0 +1,207 @@
+import epcpm.canmodel
+
+
+class DuplicateMultiplexerError(Exception):
+    @classmethod
+    def build(cls, message, identifier):
+        return cls(
+            f"Multiplexer identifier {identifier} is used more than once in"
+            f" {message.name} (0x{message.identifier:08X})",
+        )
+
+
+def message_multiplexers(message):
+    """The message's multiplexers, both its own and those of its tables."""
+    for child in message.children:
+        if isinstance(child, epcpm.canmodel.Multiplexer):
+            yield child
+        elif isinstance(child, epcpm.canmodel.CanTable):
+            for subchild in child.children:
+                if isinstance(subchild, epcpm.canmodel.Multiplexer):
+                    yield subchild
+
+
+def multiplexer_items(message, parameter_uuid_to_can_node, item_uuids):
+    """Map each of the message's multiplexer identifiers to the UUIDs of the
+    interface items of its signals, leaving out multiplexers without any."""
+    multiplexers = {}
+
+    for multiplexer in message_multiplexers(message):
+        if multiplexer.identifier is None:
+            continue
+
+        if multiplexer.identifier in multiplexers:
+            raise DuplicateMultiplexerError.build(
+                message=message,
+                identifier=multiplexer.identifier,
+            )
+
+        multiplexers[multiplexer.identifier] = [
+            signal.parameter_uuid
+            for signal in multiplexer.children
+            if signal.parameter_uuid in item_uuids
+            and parameter_uuid_to_can_node.get(signal.parameter_uuid) is signal
+        ]
+
+    return {
+        identifier: uuids
+        for identifier, uuids in multiplexers.items()
+        if len(uuids) > 0
+    }
+
+
+def dispatch_code(can_root, parameter_uuid_to_can_node, item_uuids, item_name):
+    """C definitions and declarations of, for each multiplexed message with
+    interface items, the items of each multiplexer in a table indexed by the
+    multiplexer identifier.  interfaceMuxMessages lists the tables sorted by
+    message identifier, clones sharing their original's table."""
+    item_uuids = set(item_uuids)
+
+    messages = can_root.nodes_by_filter(
+        filter=lambda node: isinstance(
+            node,
+            (epcpm.canmodel.MultiplexedMessage, epcpm.canmodel.MultiplexedMessageClone),
+        ),
+    )
+
+    tables = {}
+    entries = []
+    c = []
+
+    for message in messages:
+        if isinstance(message, epcpm.canmodel.MultiplexedMessageClone):
+            entries.append((message, message.original))
+            continue
+
+        multiplexers = multiplexer_items(
+            message=message,
+            parameter_uuid_to_can_node=parameter_uuid_to_can_node,
+            item_uuids=item_uuids,
+        )
+
+        if len(multiplexers) == 0:
+            continue
+
+        name = f"interfaceMux_{message.identifier:08X}"
+        tables[message.uuid] = (name, max(multiplexers) + 1)
+        entries.append((message, message))
+
+        for identifier, uuids in sorted(multiplexers.items()):
+            c.extend(
+                [
+                    "",
+                    f"static void const * const {name}_{identifier}[] = {{",
+                    [f"&{item_name(uuid_)}," for uuid_ in uuids],
+                    "};",
+                ]
+            )
+
+        c.extend(
+            [
+                "",
+                f"static InterfaceMuxItems const {name}[] = {{",
+                [
+                    f"{{{name}_{identifier}, {len(multiplexers[identifier])}}},"
+                    if identifier in multiplexers
+                    else "{NULL, 0},"
+                    for identifier in range(max(multiplexers) + 1)
+                ],
+                "};",
+            ]
+        )
+
+    entries = sorted(
+        (
+            (message.identifier, *tables[original.uuid])
+            for message, original in entries
+            if original is not None and original.uuid in tables
+        ),
+    )
+
+    if len(entries) == 0:
+        return [], []
+
+    h = [
+        "",
+        "typedef struct",
+        "{",
+        [
+            "void const * const * items;",
+            "uint16_t count;",
+        ],
+        "} InterfaceMuxItems;",
+        "",
+        "typedef struct",
+        "{",
+        [
+            "uint32_t identifier;",
+            "InterfaceMuxItems const * multiplexers;",
+            "uint16_t multiplexer_count;",
+        ],
+        "} InterfaceMuxMessage;",
+        "",
+        f"#define INTERFACE_MUX_MESSAGE_COUNT ({len(entries)})",
+        "extern InterfaceMuxMessage const"
+        " interfaceMuxMessages[INTERFACE_MUX_MESSAGE_COUNT];",
+        "",
+        "InterfaceMuxItems const * interfaceMuxItems(",
+        ["uint32_t identifier,", "uint16_t multiplexer"],
+        ");",
+    ]
+
+    c.extend(
+        [
+            "",
+            "InterfaceMuxMessage const"
+            " interfaceMuxMessages[INTERFACE_MUX_MESSAGE_COUNT] = {",
+            [
+                f"{{0x{identifier:08X}, {name}, {count}}},"
+                for identifier, name, count in entries
+            ],
+            "};",
+            "",
+            "InterfaceMuxItems const * interfaceMuxItems(",
+            ["uint32_t identifier,", "uint16_t multiplexer"],
+            ")",
+            "{",
+            [
+                "size_t low = 0;",
+                "size_t high = INTERFACE_MUX_MESSAGE_COUNT;",
+                "",
+                "while (low < high)",
+                "{",
+                [
+                    "size_t const middle = low + (high - low) / 2;",
+                    "InterfaceMuxMessage const * const message"
+                    " = &interfaceMuxMessages[middle];",
+                    "",
+                    "if (message->identifier == identifier)",
+                    "{",
+                    [
+                        "if (multiplexer >= message->multiplexer_count)",
+                        "{",
+                        ["return NULL;"],
+                        "}",
+                        "",
+                        "return &message->multiplexers[multiplexer];",
+                    ],
+                    "}",
+                    "",
+                    "if (message->identifier < identifier)",
+                    "{",
+                    ["low = middle + 1;"],
+                    "}",
+                    "else",
+                    "{",
+                    ["high = middle;"],
+                    "}",
+                ],
+                "}",
+                "",
+                "return NULL;",
+            ],
+            "}",
+        ]
+    )
+
+    return c, h
@@ -0,0 +1,140 @@
+import contextlib
+import io
+import os
+import zipfile
+
+import attr
+
+
+@attr.s
+class Statistics:
+    written = attr.ib(default=0)
+    skipped = attr.ib(default=0)
+    # bytes the generated code no longer places in the target's flash
+    flash_saved = attr.ib(default=0)
+
+    def __add__(self, other):
+        return Statistics(
+            written=self.written + other.written,
+            skipped=self.skipped + other.skipped,
+            flash_saved=self.flash_saved + other.flash_saved,
+        )
+
+
+_collectors = []
+
+
+@contextlib.contextmanager
+def collect():
+    statistics = Statistics()
+    _collectors.append(statistics)
+
+    try:
+        yield statistics
+    finally:
+        _collectors.remove(statistics)
+
+
+def _record(written):
+    for statistics in _collectors:
+        if written:
+            statistics.written += 1
+        else:
+            statistics.skipped += 1
+
+
+def record_flash_saved(size):
+    for statistics in _collectors:
+        statistics.flash_saved += size
+
+
+def bytes_equal(old, new):
+    return old == new
+
+
+# Unchanged files are left alone so their modification times don't trigger
+# recompilation downstream.
+def write_bytes(path, content, equal=bytes_equal):
+    try:
+        existing = path.read_bytes()
+    except FileNotFoundError:
+        pass
+    else:
+        if equal(existing, content):
+            _record(written=False)
+            return False
+
+    path.write_bytes(content)
+    _record(written=True)
+
+    return True
+
+
+def files_equal(first, second, size=1024 * 1024):
+    if os.stat(first).st_size != os.stat(second).st_size:
+        return False
+
+    with open(first, "rb") as first_file, open(second, "rb") as second_file:
+        while True:
+            chunk = first_file.read(size)
+            if chunk != second_file.read(size):
+                return False
+
+            if len(chunk) == 0:
+                return True
+
+
+# The text is streamed to a temporary file next to the destination which
+# replaces it only if the content differs.
+@contextlib.contextmanager
+def open_text(path, encoding="utf-8"):
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(temporary_path, "w", encoding=encoding, newline="") as f:
+            yield f
+
+        try:
+            equal = files_equal(temporary_path, path)
+        except FileNotFoundError:
+            equal = False
+
+        if not equal:
+            os.replace(temporary_path, path)
+
+        _record(written=not equal)
+    finally:
+        if temporary_path.exists():
+            temporary_path.unlink()
+
+
+def write_text(path, text, encoding="utf-8"):
+    return write_bytes(path=path, content=text.encode(encoding))
+
+
+# openpyxl stamps the save time into the document properties so they are
+# excluded when deciding if a workbook changed.
+workbook_volatile_members = {"docProps/core.xml"}
+
+
+def workbook_members(content):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        return {
+            name: archive.read(name)
+            for name in archive.namelist()
+            if name not in workbook_volatile_members
+        }
+
+
+def workbooks_equal(old, new):
+    try:
+        return workbook_members(old) == workbook_members(new)
+    except zipfile.BadZipFile:
+        return False
+
+
+def write_workbook(path, workbook):
+    f = io.BytesIO()
+    workbook.save(f)
+
+    return write_bytes(path=path, content=f.getvalue(), equal=workbooks_equal)
@@ -10,6 +10,8 @@ import epyqlib.pm.parametermodel
 import epyqlib.treenode
 import epyqlib.utils.general
 
+import epcpm.parametervisitor
+
 builders = epyqlib.utils.general.TypeMap()
 
 
@@ -90,21 +92,13 @@ class Root:
 
         start = time.monotonic()
 
-        for child in self.wrapped.children:
-            if child.name.endswith("Other"):
-                continue
-
-            try:
-                builder = builders.wrap(
-                    wrapped=child,
-                    parameter_root=self.wrapped,
-                    can_root=self.can_root,
-                    access_level=self.access_level,
-                )
-            except KeyError:
-                continue
-
-            table.rows.extend(builder.gen(indent=0))
+        target = Target(
+            parameter_root=self.wrapped,
+            can_root=self.can_root,
+            access_level=self.access_level,
+        )
+        epcpm.parametervisitor.walk(root=self.wrapped, targets=[target])
+        table.rows.extend(target.rows)
 
         now = time.monotonic()
         delta = now - start
@@ -157,106 +151,106 @@ class Root:
         return doc
 
 
-@builders(epyqlib.pm.parametermodel.Group)
 @attr.s
-class Group:
-    wrapped = attr.ib()
+class Target(epcpm.parametervisitor.Target):
     parameter_root = attr.ib()
     can_root = attr.ib()
     access_level = attr.ib()
-
-    def gen(self, indent):
-        rows = [
-            Row(
-                name=self.wrapped.name,
-                indent=indent,
-            ),
-        ]
-
-        for child in self.wrapped.children:
-            builder = builders.wrap(
-                wrapped=child,
-                parameter_root=self.parameter_root,
-                can_root=self.can_root,
-                access_level=self.access_level,
+    rows = attr.ib(factory=list)
+    groups = attr.ib(factory=list)
+
+    def enter(self, node):
+        if isinstance(node, epyqlib.pm.parametermodel.Root):
+            return
+
+        if node.tree_parent is self.parameter_root and node.name.endswith("Other"):
+            return epcpm.parametervisitor.skip
+
+        if isinstance(node, epyqlib.pm.parametermodel.Group):
+            self.rows.append(Row(name=node.name, indent=len(self.groups)))
+            self.groups.append(node)
+        elif isinstance(node, epyqlib.pm.parametermodel.Parameter):
+            self.rows.extend(
+                parameter_rows(
+                    parameter=node,
+                    parameter_root=self.parameter_root,
+                    can_root=self.can_root,
+                    access_level_limit=self.access_level,
+                    indent=len(self.groups),
+                ),
             )
-            rows.extend(builder.gen(indent=indent + 1))
-
-        return rows
-
-
-@builders(epyqlib.pm.parametermodel.Parameter)
-@attr.s
-class Parameter:
-    wrapped = attr.ib()
-    parameter_root = attr.ib()
-    can_root = attr.ib()
-    access_level = attr.ib()
-
-    def gen(self, indent):
-        try:
-            access_level = self.parameter_root.nodes_by_attribute(
-                attribute_value=self.wrapped.access_level_uuid,
-                attribute_name="uuid",
-            ).pop()
-        except epyqlib.treenode.NotFoundError:
-            pass
         else:
-            if access_level.value > self.access_level.value:
-                print("skipping", self.wrapped.name)
-                return []
+            return epcpm.parametervisitor.skip
 
-        signal = self.can_root.nodes_by_attribute(
-            attribute_value=self.wrapped.uuid,
-            attribute_name="parameter_uuid",
-        ).pop()
-
-        factor = signal.factor
-        if factor is None or factor == 1:
-            factor = ""
+    def leave(self, node):
+        if len(self.groups) > 0 and self.groups[-1] is node:
+            self.groups.pop()
 
-        units = self.wrapped.units
-        if units is None:
-            units = ""
 
-        try:
-            enumeration = (
-                self.parameter_root.nodes_by_attribute(
-                    attribute_value=self.wrapped.enumeration_uuid,
-                    attribute_name="uuid",
-                )
-                .pop()
-                .name
+def parameter_rows(parameter, parameter_root, can_root, access_level_limit, indent):
+    try:
+        access_level = parameter_root.nodes_by_attribute(
+            attribute_value=parameter.access_level_uuid,
+            attribute_name="uuid",
+        ).pop()
+    except epyqlib.treenode.NotFoundError:
+        pass
+    else:
+        if access_level.value > access_level_limit.value:
+            print("skipping", parameter.name)
+            return []
+
+    signal = can_root.nodes_by_attribute(
+        attribute_value=parameter.uuid,
+        attribute_name="parameter_uuid",
+    ).pop()
+
+    factor = signal.factor
+    if factor is None or factor == 1:
+        factor = ""
+
+    units = parameter.units
+    if units is None:
+        units = ""
+
+    try:
+        enumeration = (
+            parameter_root.nodes_by_attribute(
+                attribute_value=parameter.enumeration_uuid,
+                attribute_name="uuid",
             )
-        except epyqlib.treenode.NotFoundError:
-            enumeration = ""
-
-        default = self.wrapped.default
-        if default is None:
-            default = ""
-
-        minimum = self.wrapped.minimum
-        if minimum is None:
-            minimum = ""
-
-        maximum = self.wrapped.maximum
-        if maximum is None:
-            maximum = ""
-
-        comment = self.wrapped.comment
-        if comment is None:
-            comment = ""
-
-        return [
-            Row(
-                name=self.wrapped.name,
-                indent=indent,
-                factor=factor,
-                units=units,
-                default=default,
-                minimum=minimum,
-                maximum=maximum,
-                enumeration=enumeration,
-                comment=comment,
-            ),
-        ]
+            .pop()
+            .name
+        )
+    except epyqlib.treenode.NotFoundError:
+        enumeration = ""
+
+    default = parameter.default
+    if default is None:
+        default = ""
+
+    minimum = parameter.minimum
+    if minimum is None:
+        minimum = ""
+
+    maximum = parameter.maximum
+    if maximum is None:
+        maximum = ""
+
+    comment = parameter.comment
+    if comment is None:
+        comment = ""
+
+    return [
+        Row(
+            name=parameter.name,
+            indent=indent,
+            factor=factor,
+            units=units,
+            default=default,
+            minimum=minimum,
+            maximum=maximum,
+            enumeration=enumeration,
+            comment=comment,
+        ),
+    ]
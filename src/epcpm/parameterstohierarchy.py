@@ -6,6 +6,9 @@ import epyqlib.pm.parametermodel
 import epyqlib.utils.general
 
 import epcpm.cantosym
+import epcpm.output
+import epcpm.parametervisitor
+import epcpm.projectindex
 
 builders = epyqlib.utils.general.TypeMap()
 
@@ -13,198 +16,127 @@ builders = epyqlib.utils.general.TypeMap()
 dehumanize_name = epcpm.cantosym.dehumanize_name
 
 
-def export(path, can_model, parameters_model):
-    builder = epcpm.parameterstohierarchy.builders.wrap(
-        wrapped=parameters_model.root,
+def export(path, can_model, parameters_model, index=None):
+    target = Target.build(
+        parameters_root=parameters_model.root,
         can_root=can_model.root,
+        index=index,
+        path=path,
     )
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="\n") as f:
-        f.write(builder.gen(indent=4))
+    epcpm.parametervisitor.walk(root=parameters_model.root, targets=[target])
+    target.finish()
 
 
-@builders(epyqlib.pm.parametermodel.Root)
-@attr.s
-class Root:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-
-    def gen(self, json_output=True, **kwargs):
-        parameters = next(
-            node for node in self.wrapped.children if node.name == "Parameters"
-        )
+def signal_names(signal, prefix=""):
+    message = signal.tree_parent
 
-        def can_node_wanted(node):
-            if getattr(node, "parameter_uuid", None) is None:
-                return False
+    return [
+        dehumanize_name(prefix + message.name),
+        dehumanize_name(signal.name),
+    ]
 
-            parameter_query_parent = node.tree_parent.tree_parent
 
-            is_a_can_table = isinstance(
-                node.tree_parent.tree_parent,
-                epcpm.canmodel.CanTable,
+@attr.s
+class Target(epcpm.parametervisitor.Target):
+    parameter_uuid_to_can_node = attr.ib()
+    path = attr.ib(default=None)
+    result = attr.ib(default=None)
+    root = attr.ib(default=None)
+    parameters = attr.ib(default=None)
+    # (node, children) for each node with a name and children in the output
+    stack = attr.ib(factory=list)
+
+    @classmethod
+    def build(cls, parameters_root, can_root, index=None, path=None):
+        if index is None:
+            index = epcpm.projectindex.ProjectIndex.build(
+                parameters_root=parameters_root,
+                can_root=can_root,
             )
-            if is_a_can_table:
-                parameter_query_parent = parameter_query_parent.tree_parent
-
-            is_a_query = getattr(parameter_query_parent, "name", "") == "ParameterQuery"
-            if not is_a_query:
-                return False
-
-            return True
 
-        can_nodes_with_parameter_uuid = self.can_root.nodes_by_filter(
-            filter=can_node_wanted,
+        return cls(
+            parameter_uuid_to_can_node=index.parameter_to_query_signal,
+            path=path,
         )
 
-        parameter_uuid_to_can_node = {
-            node.parameter_uuid: node for node in can_nodes_with_parameter_uuid
-        }
-
-        lengths_equal = len(can_nodes_with_parameter_uuid) == len(
-            parameter_uuid_to_can_node
-        )
-        if not lengths_equal:
-            raise Exception()
-
-        d = {
-            "children": [
-                builders.wrap(
-                    wrapped=child,
-                    can_root=self.can_root,
-                    parameter_uuid_to_can_node=parameter_uuid_to_can_node,
-                ).gen()
-                for child in parameters.children
-                if isinstance(
-                    child,
-                    (
-                        epyqlib.pm.parametermodel.Group,
-                        epyqlib.pm.parametermodel.Parameter,
-                        # epcpm.parametermodel.EnumeratedParameter,
-                    ),
-                )
-            ],
-        }
+    def enter(self, node):
+        parent = node.tree_parent
 
-        if not json_output:
-            return d
-
-        return json.dumps(d, **kwargs)
-
-
-@builders(epyqlib.pm.parametermodel.Group)
-@attr.s
-class Group:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-
-    def gen(self):
-        return {
-            "name": self.wrapped.name,
-            "children": [
-                result
-                for result in (
-                    builders.wrap(
-                        wrapped=child,
-                        can_root=self.can_root,
-                        parameter_uuid_to_can_node=(self.parameter_uuid_to_can_node),
-                    ).gen()
-                    for child in self.wrapped.children
+        if isinstance(node, epyqlib.pm.parametermodel.Root):
+            self.root = node
+            self.parameters = next(
+                child for child in node.children if child.name == "Parameters"
+            )
+            self.stack.append((node, []))
+        elif parent is self.root:
+            if node is not self.parameters:
+                return epcpm.parametervisitor.skip
+        elif parent is self.parameters and isinstance(
+            node,
+            epyqlib.pm.parametermodel.Table,
+        ):
+            return epcpm.parametervisitor.skip
+        elif isinstance(node, epyqlib.pm.parametermodel.Parameter):
+            signal = self.parameter_uuid_to_can_node.get(node.uuid)
+            if signal is not None:
+                self.stack[-1][1].append(signal_names(signal=signal))
+        elif isinstance(node, epyqlib.pm.parametermodel.TableArrayElement):
+            signal = self.parameter_uuid_to_can_node.get(node.uuid)
+            if signal is not None:
+                can_table = signal.tree_parent.tree_parent
+                self.stack[-1][1].append(
+                    signal_names(signal=signal, prefix=can_table.name),
                 )
-                if result is not None
-            ],
-        }
-
-
-@builders(epyqlib.pm.parametermodel.Parameter)
-@attr.s
-class Parameter:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-
-    def gen(self):
-        signal = self.parameter_uuid_to_can_node.get(self.wrapped.uuid)
-
-        if signal is None:
-            return None
-
-        message = signal.tree_parent
-
-        return [
-            dehumanize_name(message.name),
-            dehumanize_name(signal.name),
-        ]
+        elif isinstance(node, epyqlib.pm.parametermodel.Group):
+            if isinstance(parent, epyqlib.pm.parametermodel.Table):
+                return epcpm.parametervisitor.skip
+
+            self.stack.append((node, []))
+        elif isinstance(node, epyqlib.pm.parametermodel.Table):
+            self.stack.append((node, []))
+        elif isinstance(node, epyqlib.pm.parametermodel.TableGroupElement):
+            # the table's top group element is merged into the table
+            if not isinstance(parent, epyqlib.pm.parametermodel.Table):
+                self.stack.append((node, []))
+
+    def leave(self, node):
+        if self.stack[-1][0] is not node:
+            return
+
+        node, children = self.stack.pop()
+
+        if len(self.stack) == 0:
+            self.result = {"children": children}
+        else:
+            self.stack[-1][1].append({"name": node.name, "children": children})
+
+    def finish(self):
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            epcpm.output.write_text(
+                path=self.path,
+                text=json.dumps(self.result, indent=4),
+            )
 
 
-@builders(epyqlib.pm.parametermodel.Table)
+@builders(epyqlib.pm.parametermodel.Root)
 @attr.s
-class Table:
+class Root:
     wrapped = attr.ib()
     can_root = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
+    index = attr.ib(default=None)
 
-    def gen(self):
-        (group,) = (
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.TableGroupElement)
+    def gen(self, json_output=True, **kwargs):
+        target = Target.build(
+            parameters_root=self.wrapped,
+            can_root=self.can_root,
+            index=self.index,
         )
-        return {
-            "name": self.wrapped.name,
-            "children": builders.wrap(
-                wrapped=group,
-                can_root=self.can_root,
-                parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
-            ).gen()["children"],
-        }
 
+        epcpm.parametervisitor.walk(root=self.wrapped, targets=[target])
 
-@builders(epyqlib.pm.parametermodel.TableGroupElement)
-@attr.s
-class TableGroupElement:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-
-    def gen(self):
-        children = []
-        for child in self.wrapped.children:
-            result = builders.wrap(
-                wrapped=child,
-                can_root=self.can_root,
-                parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
-            ).gen()
-
-            if result is not None:
-                children.append(result)
-
-        return {
-            "name": self.wrapped.name,
-            "children": children,
-        }
-
-
-@builders(epyqlib.pm.parametermodel.TableArrayElement)
-@attr.s
-class TableArrayElement:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-
-    def gen(self):
-        signal = self.parameter_uuid_to_can_node.get(self.wrapped.uuid)
-
-        if signal is None:
-            return None
-
-        message = signal.tree_parent
-
-        can_table = message.tree_parent
+        if not json_output:
+            return target.result
 
-        return [
-            dehumanize_name(can_table.name + message.name),
-            dehumanize_name(signal.name),
-        ]
+        return json.dumps(target.result, **kwargs)
@@ -3,20 +3,27 @@ import itertools
 import os
 import string
 import re
-import uuid
 
 import attr
 import jinja2
 import toolz
 
 import epyqlib.pm.parametermodel
-import epyqlib.utils.general
 
+import epcpm.c
 import epcpm.cantosym
+import epcpm.dispatch
+import epcpm.itemids
+import epcpm.muxdispatch
+import epcpm.output
+import epcpm.parametervisitor
+import epcpm.projectindex
 import epcpm.sunspecmodel
 import epcpm.sunspectoxlsx
+import epcpm.uuidlookup
 
-builders = epyqlib.utils.general.TypeMap()
+handlers = epcpm.dispatch.Dispatcher()
+variable_names = epcpm.dispatch.Dispatcher()
 
 
 # TODO: move this somewhere common in python code...
@@ -58,456 +65,497 @@ def export(
     sunspec_model,
     skip_sunspec=False,
     include_uuid_in_item=False,
+    index=None,
+    shard_items=None,
+    shard_groups=False,
+    uuid_lookup=None,
+    mux_dispatch=False,
+    compact_item_ids=False,
 ):
-    if skip_sunspec:
-        sunspec_root = None
-    else:
-        sunspec_root = sunspec_model.root
-
-    builder = builders.wrap(
-        wrapped=parameters_model.root,
+    target = Target.build(
+        parameters_root=parameters_model.root,
         can_root=can_model.root,
-        sunspec_root=sunspec_root,
+        sunspec_root=None if skip_sunspec else sunspec_model.root,
         include_uuid_in_item=include_uuid_in_item,
+        index=index,
+        c_path=c_path,
+        h_path=h_path,
+        shard_items=shard_items,
+        shard_groups=shard_groups,
+        uuid_lookup=uuid_lookup,
+        mux_dispatch=mux_dispatch,
+        compact_item_ids=compact_item_ids,
     )
 
-    c_path.parent.mkdir(parents=True, exist_ok=True)
+    epcpm.parametervisitor.walk(root=parameters_model.root, targets=[target])
 
-    built_c, built_h, model_ids = builder.gen()
+    target.finish()
 
-    template_context = {
-        "sunspec_interface_gen_headers": (
-            f"sunspecInterfaceGen{id}.h" for id in model_ids
-        ),
-        "sunspec_interface_headers": (f"sunspecInterface{id:05}.h" for id in model_ids),
-        "interface_items": epcpm.c.format_nested_lists(
-            built_c,
-        ).strip(),
-        "declarations": epcpm.c.format_nested_lists(built_h).strip(),
-    }
 
-    epcpm.c.render(
-        source=c_path.with_suffix(f"{c_path.suffix}_pm"),
-        destination=c_path,
-        context=template_context,
-    )
+def shard_path(c_path, index):
+    if index == 0:
+        return c_path
 
-    epcpm.c.render(
-        source=h_path.with_suffix(f"{h_path.suffix}_pm"),
-        destination=h_path,
-        context=template_context,
-    )
+    return c_path.with_name(f"{c_path.stem}_{index:03}{c_path.suffix}")
 
 
-@builders(epyqlib.pm.parametermodel.Root)
-@attr.s
-class Root:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    sunspec_root = attr.ib()
-    include_uuid_in_item = attr.ib()
+def shard_manifest_path(c_path):
+    return c_path.with_suffix(".shards")
 
-    def gen(self):
-        def can_node_wanted(node):
-            if getattr(node, "parameter_uuid", None) is None:
-                return False
 
-            uuids = [
-                # CCP Response
-                uuid.UUID("39315d58-1ddb-48b9-960c-96e724c89da1"),
-                # CCP
-                uuid.UUID("983bdc5d-8d4e-4107-a0a0-983f0ab101ce"),
-            ]
-            return not any(ancestor.uuid in uuids for ancestor in node.ancestors())
+def read_shard_manifest(c_path):
+    try:
+        text = shard_manifest_path(c_path).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
 
-        can_nodes_with_parameter_uuid = self.can_root.nodes_by_filter(
-            filter=can_node_wanted,
-        )
+    return [c_path.with_name(name) for name in text.splitlines() if name != ""]
 
-        parameter_uuid_to_can_node = {
-            node.parameter_uuid: node for node in can_nodes_with_parameter_uuid
-        }
 
-        def sunspec_node_wanted(node):
-            if getattr(node, "parameter_uuid", None) is None:
-                return False
+def shard_outputs(c_path, sharded):
+    """The shard manifest and the shards it lists other than `c_path` when
+    the export is `sharded`.  How many shards there are depends on the
+    parameters so they are taken from the manifest, a missing manifest is
+    still expected."""
+    if not sharded:
+        return []
 
-            wanted_types = (
-                epcpm.sunspecmodel.DataPoint,
-                epcpm.sunspecmodel.DataPointBitfieldMember,
-            )
-            if not isinstance(node, wanted_types):
-                return False
+    paths = read_shard_manifest(c_path)
 
-            return True
+    return [shard_manifest_path(c_path), *(path for path in paths if path != c_path)]
 
-        if self.sunspec_root is None:
-            parameter_uuid_to_sunspec_node = {}
-        else:
-            sunspec_nodes_with_parameter_uuid = self.sunspec_root.nodes_by_filter(
-                filter=sunspec_node_wanted,
-            )
 
-            parameter_uuid_to_sunspec_node = {
-                node.parameter_uuid: node for node in sunspec_nodes_with_parameter_uuid
-            }
+def update_shard_manifest(c_path, paths):
+    """List the shard sources one name per line for the embedded build and
+    remove the shards of a previous export which are no longer generated.
+    The manifest itself is removed when `paths` is None."""
+    removed = set(read_shard_manifest(c_path)) - {c_path, *(paths or [])}
 
-        lengths_equal = len(can_nodes_with_parameter_uuid) == len(
-            parameter_uuid_to_can_node
+    manifest_path = shard_manifest_path(c_path)
+
+    if paths is None:
+        removed.add(manifest_path)
+    else:
+        epcpm.output.write_text(
+            path=manifest_path,
+            text="".join(f"{path.name}\n" for path in paths),
         )
-        if not lengths_equal:
-            uuids = [u.parameter_uuid for u in can_nodes_with_parameter_uuid]
-            print("\n".join(set(str(u) for u in uuids if uuids.count(u) > 1)))
-            raise Exception()
-
-        c = []
-        h = []
-        sunspec_models = set()
-
-        for child in self.wrapped.children:
-            if not isinstance(
-                child,
-                (
-                    epyqlib.pm.parametermodel.Group,
-                    epyqlib.pm.parametermodel.Parameter,
-                    epyqlib.pm.parametermodel.Table,
-                    # epcpm.parametermodel.EnumeratedParameter,
-                ),
-            ):
-                continue
-
-            c_built, h_built, sunspec_models_built = builders.wrap(
-                wrapped=child,
-                can_root=self.can_root,
-                sunspec_root=self.sunspec_root,
-                include_uuid_in_item=self.include_uuid_in_item,
-                parameter_uuid_to_can_node=parameter_uuid_to_can_node,
-                parameter_uuid_to_sunspec_node=(parameter_uuid_to_sunspec_node),
-                parameter_uuid_finder=self.wrapped.model.node_from_uuid,
-            ).gen()
-
-            c.extend(c_built)
-            h.extend(h_built)
-            sunspec_models |= sunspec_models_built
-
-        return c, h, sunspec_models
-
-        # return itertools.chain.from_iterable(
-        #     builders.wrap(
-        #         wrapped=child,
-        #         can_root=self.can_root,
-        #         sunspec_root=self.sunspec_root,
-        #         parameter_uuid_to_can_node=parameter_uuid_to_can_node,
-        #         parameter_uuid_to_sunspec_node=(
-        #             parameter_uuid_to_sunspec_node
-        #         ),
-        #         parameter_uuid_finder=self.wrapped.model.node_from_uuid,
-        #     ).gen()
-        #     for child in parameters.children
-        #     if isinstance(
-        #         child,
-        #         (
-        #             epyqlib.pm.parametermodel.Group,
-        #             epyqlib.pm.parametermodel.Parameter,
-        #             # epcpm.parametermodel.EnumeratedParameter,
-        #         ),
-        #     )
-        # )
-
-
-@builders(epyqlib.pm.parametermodel.Group)
+
+    for path in removed:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
 @attr.s
-class Group:
-    wrapped = attr.ib()
+class Target(epcpm.parametervisitor.Target):
     can_root = attr.ib()
     sunspec_root = attr.ib()
     include_uuid_in_item = attr.ib()
     parameter_uuid_to_can_node = attr.ib()
     parameter_uuid_to_sunspec_node = attr.ib()
     parameter_uuid_finder = attr.ib()
+    index = attr.ib()
+    c_path = attr.ib(default=None)
+    h_path = attr.ib(default=None)
+    # start another .c file after this many parameters and tables
+    shard_items = attr.ib(default=None)
+    # start another .c file for each top level group
+    shard_groups = attr.ib(default=False)
+    # also generate a table of the items by UUID, see epcpm.uuidlookup.kinds
+    uuid_lookup = attr.ib(default=None)
+    # also generate the items of each CAN multiplexer, see epcpm.muxdispatch
+    mux_dispatch = attr.ib(default=False)
+    # identifies the items by epcpm.itemids ids rather than UUIDs if set
+    item_ids = attr.ib(default=None)
+    item_uuids = attr.ib(factory=list)
+    c = attr.ib(factory=lambda: epcpm.c.Emitter(strip=True))
+    h = attr.ib(factory=lambda: epcpm.c.Emitter(strip=True))
+    # the filled .c emitters preceding c when sharding
+    shards = attr.ib(factory=list)
+    items = attr.ib(default=0)
+    group_sunspec_models = attr.ib(factory=lambda: [set()])
 
-    def gen(self):
-        c = []
-        h = []
-        sunspec_models = set()
-
-        for child in self.wrapped.children:
-            if not isinstance(
-                child,
-                (
-                    epyqlib.pm.parametermodel.Group,
-                    epyqlib.pm.parametermodel.Parameter,
-                    epyqlib.pm.parametermodel.Table,
-                    # epcpm.parametermodel.EnumeratedParameter,
-                ),
+    @classmethod
+    def build(
+        cls,
+        parameters_root,
+        can_root,
+        sunspec_root,
+        include_uuid_in_item=False,
+        index=None,
+        compact_item_ids=False,
+        **kwargs,
+    ):
+        if include_uuid_in_item and compact_item_ids:
+            kwargs["item_ids"] = epcpm.itemids.ItemIds()
+
+        if index is None:
+            index = epcpm.projectindex.ProjectIndex.build(
+                parameters_root=parameters_root,
+                can_root=can_root,
+                sunspec_root=sunspec_root,
+            )
+
+        if sunspec_root is None:
+            parameter_uuid_to_sunspec_node = {}
+        else:
+            parameter_uuid_to_sunspec_node = index.parameter_to_sunspec_point
+
+        return cls(
+            can_root=can_root,
+            sunspec_root=sunspec_root,
+            include_uuid_in_item=include_uuid_in_item,
+            parameter_uuid_to_can_node=index.parameter_to_can_signal,
+            parameter_uuid_to_sunspec_node=parameter_uuid_to_sunspec_node,
+            parameter_uuid_finder=parameters_root.model.node_from_uuid,
+            index=index,
+            **kwargs,
+        )
+
+    @property
+    def sharded(self):
+        return self.shard_items is not None or self.shard_groups
+
+    def start_shard(self):
+        if self.items > 0:
+            self.shards.append(self.c)
+            self.c = epcpm.c.Emitter(strip=True)
+            self.items = 0
+
+    def enter(self, node):
+        if isinstance(node, epyqlib.pm.parametermodel.Group):
+            if self.shard_groups and isinstance(
+                node.tree_parent,
+                epyqlib.pm.parametermodel.Root,
             ):
-                continue
-
-            c_built, h_built, sunspec_models_built = builders.wrap(
-                wrapped=child,
-                can_root=self.can_root,
-                sunspec_root=self.sunspec_root,
-                include_uuid_in_item=self.include_uuid_in_item,
-                parameter_uuid_to_can_node=(self.parameter_uuid_to_can_node),
-                parameter_uuid_to_sunspec_node=(self.parameter_uuid_to_sunspec_node),
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            ).gen()
-
-            c.extend(c_built)
-            h.extend(h_built)
-            sunspec_models |= sunspec_models_built
-
-        return c, h, sunspec_models
-        # return itertools.chain.from_iterable(
-        #     result
-        #     for result in (
-        #         builders.wrap(
-        #             wrapped=child,
-        #             can_root=self.can_root,
-        #             sunspec_root=self.sunspec_root,
-        #             parameter_uuid_to_can_node=(
-        #                 self.parameter_uuid_to_can_node
-        #             ),
-        #             parameter_uuid_to_sunspec_node=(
-        #                 self.parameter_uuid_to_sunspec_node
-        #             ),
-        #             parameter_uuid_finder=self.parameter_uuid_finder,
-        #         ).gen()
-        #         for child in self.wrapped.children
-        #         if isinstance(
-        #             child,
-        #             (
-        #                 epyqlib.pm.parametermodel.Group,
-        #                 epyqlib.pm.parametermodel.Parameter,
-        #                 # epcpm.parametermodel.EnumeratedParameter,
-        #             ),
-        #         )
-        #     )
-        # )
-
-
-@builders(epcpm.sunspecmodel.DataPoint)
-@attr.s
-class DataPoint:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib()
+                self.start_shard()
 
-    def interface_variable_name(self):
-        parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
+            self.group_sunspec_models.append(set())
 
-        maybe_model = self.wrapped.tree_parent
+            return
 
-        while not isinstance(maybe_model, epcpm.sunspecmodel.Model):
-            maybe_model = maybe_model.tree_parent
+        if not isinstance(
+            node,
+            (
+                epyqlib.pm.parametermodel.Parameter,
+                epyqlib.pm.parametermodel.Table,
+            ),
+        ):
+            return
 
-        model = maybe_model
-        model_variable = f"sunspecInterface.model{model.id}"
+        # the lines for each parameter and table are emitted as it is built
+        c_built, h_built, sunspec_models_built = handlers.gen(node=node, context=self)
 
-        return f"&{model_variable}.{parameter.abbreviation}"
+        if len(c_built) > 0:
+            if self.shard_items is not None and self.items >= self.shard_items:
+                self.start_shard()
 
+            self.items += 1
 
-@builders(epcpm.sunspecmodel.DataPointBitfieldMember)
-@attr.s
-class DataPointBitfieldMember:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib()
+        self.c.lines(c_built)
+        self.h.lines(h_built)
+        self.group_sunspec_models[-1] |= sunspec_models_built
 
-    def interface_variable_name(self):
-        parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
+        return epcpm.parametervisitor.skip
 
-        uuid_ = str(parameter.uuid).replace("-", "_")
-        return f"&interfaceItem_variable_{uuid_}"
+    def leave(self, node):
+        # the models are collected per group and merged into the parent's
+        # the way they always have been, keeping the header order the same
+        if isinstance(node, epyqlib.pm.parametermodel.Group):
+            sunspec_models = self.group_sunspec_models.pop()
+            self.group_sunspec_models[-1] |= sunspec_models
 
+    @property
+    def sunspec_models(self):
+        (sunspec_models,) = self.group_sunspec_models
 
-@builders(epyqlib.pm.parametermodel.Parameter)
-@attr.s
-class Parameter:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    sunspec_root = attr.ib()
-    include_uuid_in_item = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-    parameter_uuid_to_sunspec_node = attr.ib()
-    parameter_uuid_finder = attr.ib()
+        return sunspec_models
 
-    def gen(self):
-        parameter = self.wrapped
-        can_signal = self.parameter_uuid_to_can_node.get(parameter.uuid)
-        sunspec_point = self.parameter_uuid_to_sunspec_node.get(parameter.uuid)
+    def finish(self):
+        if self.c_path is None:
+            return
 
-        interface_data = [
-            can_signal,
-            sunspec_point,
-        ]
+        self.c_path.parent.mkdir(parents=True, exist_ok=True)
 
-        uses_interface_item = (
-            isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
-            and parameter.uses_interface_item()
-        )
+        tables = []
 
-        sunspec_models = set()
+        if self.uuid_lookup is not None:
+            tables.append(
+                epcpm.uuidlookup.lookup_code(
+                    uuids=self.item_uuids,
+                    item_name=interface_item_name,
+                    kind=self.uuid_lookup,
+                )
+            )
 
-        if not uses_interface_item or all(x is None for x in interface_data):
-            return [[], [], sunspec_models]
+        if self.mux_dispatch:
+            tables.append(
+                epcpm.muxdispatch.dispatch_code(
+                    can_root=self.can_root,
+                    parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
+                    item_uuids=self.item_uuids,
+                    item_name=interface_item_name,
+                )
+            )
 
-        scale_factor_variable = "NULL"
-        scale_factor_updater = "NULL"
+        if len(tables) > 0 and self.sharded:
+            self.start_shard()
 
-        if parameter.getter_function is None:
-            getter_function = "NULL"
-        else:
-            getter_function = parameter.getter_function
+        for c, h in tables:
+            self.c.lines(c)
+            self.h.lines(h)
 
-        if parameter.setter_function is None:
-            setter_function = "NULL"
-        else:
-            setter_function = parameter.setter_function
+        model_ids = self.sunspec_models
+        shards = [*self.shards, self.c]
+        shard_paths = [shard_path(self.c_path, i) for i in range(len(shards))]
 
-        if parameter.internal_variable is not None:
-            var_or_func = "variable"
+        # every shard includes all the model headers since table items don't
+        # report the models they reference
+        def template_context(interface_items, shard_index):
+            return {
+                "sunspec_interface_gen_headers": (
+                    f"sunspecInterfaceGen{id}.h" for id in model_ids
+                ),
+                "sunspec_interface_headers": (
+                    f"sunspecInterface{id:05}.h" for id in model_ids
+                ),
+                "interface_items": interface_items,
+                "declarations": self.h.getvalue(),
+                "shard_index": shard_index,
+                "shard_count": len(shards),
+            }
 
-            variable_or_getter_setter = [
-                f".variable = &{parameter.internal_variable},",
-            ]
-        else:
-            var_or_func = "functions"
+        for shard_index, (path, shard) in enumerate(zip(shard_paths, shards)):
+            epcpm.c.render(
+                source=self.c_path.with_suffix(f"{self.c_path.suffix}_pm"),
+                destination=path,
+                context=template_context(
+                    interface_items=shard.getvalue(),
+                    shard_index=shard_index,
+                ),
+            )
 
-            variable_or_getter_setter = [
-                f".getter = {getter_function},",
-            ]
+        epcpm.c.render(
+            source=self.h_path.with_suffix(f"{self.h_path.suffix}_pm"),
+            destination=self.h_path,
+            context=template_context(
+                interface_items="\n\n".join(shard.getvalue() for shard in shards),
+                shard_index=None,
+            ),
+        )
 
-        variable_or_getter_setter.append(f".setter = {setter_function},")
+        update_shard_manifest(
+            c_path=self.c_path,
+            paths=shard_paths if self.sharded else None,
+        )
 
-        if sunspec_point is None:
-            sunspec_variable = "NULL"
-            sunspec_getter = "NULL"
-            sunspec_setter = "NULL"
-            hand_coded_sunspec_getter_function = "NULL"
-            hand_coded_sunspec_setter_function = "NULL"
+        if self.item_ids is None:
+            flash_saved = 0
         else:
-            maybe_model = sunspec_point.tree_parent
+            # each item's UUID became an id
+            flash_saved = len(self.item_ids.ids) * (
+                epcpm.itemids.uuid_bytes - epcpm.itemids.id_bytes
+            )
 
-            while not isinstance(maybe_model, epcpm.sunspecmodel.Model):
-                maybe_model = maybe_model.tree_parent
+        epcpm.itemids.update_sidecar(
+            c_path=self.c_path,
+            item_ids=self.item_ids,
+            flash_saved=flash_saved,
+        )
 
-            model = maybe_model
 
-            sunspec_models.add(model.id)
+@variable_names(epcpm.sunspecmodel.DataPoint)
+def data_point_variable_name(context, point):
+    parameter = context.parameter_uuid_finder(point.parameter_uuid)
 
-            # TODO: move this somewhere common in python code...
-            sunspec_type = sunspec_types[
-                self.parameter_uuid_finder(sunspec_point.type_uuid).name
-            ]
+    maybe_model = point.tree_parent
 
-            # TODO: handle tables with repeating blocks and references
+    while not isinstance(maybe_model, epcpm.sunspecmodel.Model):
+        maybe_model = maybe_model.tree_parent
 
-            hand_coded_getter_function_name = epcpm.sunspectoxlsx.getter_name(
-                parameter=parameter,
-                model_id=model.id,
-                is_table=False,
-            )
+    model = maybe_model
+    model_variable = f"sunspecInterface.model{model.id}"
 
-            hand_coded_setter_function_name = epcpm.sunspectoxlsx.setter_name(
-                parameter=parameter,
-                model_id=model.id,
-                is_table=False,
-            )
+    return f"&{model_variable}.{parameter.abbreviation}"
 
-            if getattr(sunspec_point, "hand_coded_getter", False):
-                hand_coded_sunspec_getter_function = (
-                    f"&{hand_coded_getter_function_name}"
-                )
-            else:
-                hand_coded_sunspec_getter_function = "NULL"
 
-            if getattr(sunspec_point, "hand_coded_setter", False):
-                hand_coded_sunspec_setter_function = (
-                    f"&{hand_coded_setter_function_name}"
-                )
-            else:
-                hand_coded_sunspec_setter_function = "NULL"
+@variable_names(epcpm.sunspecmodel.DataPointBitfieldMember)
+def data_point_bitfield_member_variable_name(context, member):
+    parameter = context.parameter_uuid_finder(member.parameter_uuid)
 
-            # TODO: CAMPid 67549654267913467967436
-            if getattr(sunspec_point, "factor_uuid", False):
-                factor_point = self.sunspec_root.model.node_from_uuid(
-                    sunspec_point.factor_uuid,
-                )
-                sunspec_scale_factor = self.parameter_uuid_finder(
-                    factor_point.parameter_uuid,
-                ).abbreviation
+    uuid_ = str(parameter.uuid).replace("-", "_")
+    return f"&interfaceItem_variable_{uuid_}"
 
-                sunspec_factor_builder = builders.wrap(
-                    wrapped=factor_point,
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                )
-                scale_factor_variable = sunspec_factor_builder.interface_variable_name()
-                scale_factor_updater_name = (
-                    f"getSUNSPEC_MODEL{model.id}_{sunspec_scale_factor}"
-                )
-                scale_factor_updater = f"&{scale_factor_updater_name}"
 
-            sunspec_point_builder = builders.wrap(
-                wrapped=sunspec_point,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            )
-            sunspec_variable = sunspec_point_builder.interface_variable_name()
+@handlers(epyqlib.pm.parametermodel.Parameter)
+def parameter(context, parameter):
+    can_signal = context.parameter_uuid_to_can_node.get(parameter.uuid)
+    sunspec_point = context.parameter_uuid_to_sunspec_node.get(parameter.uuid)
 
-            # TODO: CAMPid 9675436715674367943196954756419543975314
-            getter_setter_list = [
-                "InterfaceItem",
-                var_or_func,
-                types[parameter.internal_type].name,
-                sunspec_type,
-            ]
+    interface_data = [
+        can_signal,
+        sunspec_point,
+    ]
+
+    uses_interface_item = (
+        isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
+        and parameter.uses_interface_item()
+    )
 
-            sunspec_getter = "_".join(str(x) for x in getter_setter_list + ["getter"])
-            sunspec_setter = "_".join(str(x) for x in getter_setter_list + ["setter"])
+    sunspec_models = set()
 
-        interface_item_type = (
-            f"InterfaceItem_{var_or_func}_{types[parameter.internal_type].name}"
-        )
+    if not uses_interface_item or all(x is None for x in interface_data):
+        return [[], [], sunspec_models]
 
-        can_getter, can_setter, can_variable = can_getter_setter_variable(
-            can_signal=can_signal,
+    scale_factor_variable = "NULL"
+    scale_factor_updater = "NULL"
+
+    if parameter.getter_function is None:
+        getter_function = "NULL"
+    else:
+        getter_function = parameter.getter_function
+
+    if parameter.setter_function is None:
+        setter_function = "NULL"
+    else:
+        setter_function = parameter.setter_function
+
+    if parameter.internal_variable is not None:
+        var_or_func = "variable"
+
+        variable_or_getter_setter = [
+            f".variable = &{parameter.internal_variable},",
+        ]
+    else:
+        var_or_func = "functions"
+
+        variable_or_getter_setter = [
+            f".getter = {getter_function},",
+        ]
+
+    variable_or_getter_setter.append(f".setter = {setter_function},")
+
+    if sunspec_point is None:
+        sunspec_variable = "NULL"
+        sunspec_getter = "NULL"
+        sunspec_setter = "NULL"
+        hand_coded_sunspec_getter_function = "NULL"
+        hand_coded_sunspec_setter_function = "NULL"
+    else:
+        model = context.index.point_to_model[sunspec_point.uuid]
+
+        sunspec_models.add(model.id)
+
+        # TODO: move this somewhere common in python code...
+        sunspec_type = sunspec_types[
+            context.parameter_uuid_finder(sunspec_point.type_uuid).name
+        ]
+
+        # TODO: handle tables with repeating blocks and references
+
+        hand_coded_getter_function_name = epcpm.sunspectoxlsx.getter_name(
             parameter=parameter,
-            var_or_func_or_table=var_or_func,
+            model_id=model.id,
+            is_table=False,
         )
 
-        access_level = get_access_level_string(
+        hand_coded_setter_function_name = epcpm.sunspectoxlsx.setter_name(
             parameter=parameter,
-            parameter_uuid_finder=self.parameter_uuid_finder,
+            model_id=model.id,
+            is_table=False,
         )
 
-        if parameter.rejected_callback is None:
-            rejected_callback = "NULL"
+        if getattr(sunspec_point, "hand_coded_getter", False):
+            hand_coded_sunspec_getter_function = f"&{hand_coded_getter_function_name}"
         else:
-            rejected_callback = f"&{parameter.rejected_callback}"
+            hand_coded_sunspec_getter_function = "NULL"
 
-        result = create_item(
-            item_uuid=parameter.uuid,
-            include_uuid_in_item=self.include_uuid_in_item,
-            access_level=access_level,
-            can_getter=can_getter,
-            can_setter=can_setter,
-            can_variable=can_variable,
-            hand_coded_sunspec_getter_function=hand_coded_sunspec_getter_function,
-            hand_coded_sunspec_setter_function=hand_coded_sunspec_setter_function,
-            interface_item_type=interface_item_type,
-            internal_scale=parameter.internal_scale_factor,
-            meta_initializer_values=create_meta_initializer_values(parameter),
-            parameter=parameter,
-            scale_factor_updater=scale_factor_updater,
-            scale_factor_variable=scale_factor_variable,
-            sunspec_getter=sunspec_getter,
-            sunspec_setter=sunspec_setter,
-            sunspec_variable=sunspec_variable,
-            variable_or_getter_setter=variable_or_getter_setter,
-            rejected_callback=rejected_callback,
-            can_scale_factor=getattr(can_signal, "factor", None),
-            reject_from_inactive_interfaces=parameter.reject_from_inactive_interfaces,
-        )
+        if getattr(sunspec_point, "hand_coded_setter", False):
+            hand_coded_sunspec_setter_function = f"&{hand_coded_setter_function_name}"
+        else:
+            hand_coded_sunspec_setter_function = "NULL"
+
+        # TODO: CAMPid 67549654267913467967436
+        if getattr(sunspec_point, "factor_uuid", False):
+            factor_point = context.sunspec_root.model.node_from_uuid(
+                sunspec_point.factor_uuid,
+            )
+            sunspec_scale_factor = context.parameter_uuid_finder(
+                factor_point.parameter_uuid,
+            ).abbreviation
+
+            scale_factor_variable = variable_names.gen(
+                node=factor_point,
+                context=context,
+            )
+            scale_factor_updater_name = (
+                f"getSUNSPEC_MODEL{model.id}_{sunspec_scale_factor}"
+            )
+            scale_factor_updater = f"&{scale_factor_updater_name}"
+
+        sunspec_variable = variable_names.gen(node=sunspec_point, context=context)
+
+        # TODO: CAMPid 9675436715674367943196954756419543975314
+        getter_setter_list = [
+            "InterfaceItem",
+            var_or_func,
+            types[parameter.internal_type].name,
+            sunspec_type,
+        ]
+
+        sunspec_getter = "_".join(str(x) for x in getter_setter_list + ["getter"])
+        sunspec_setter = "_".join(str(x) for x in getter_setter_list + ["setter"])
+
+    interface_item_type = (
+        f"InterfaceItem_{var_or_func}_{types[parameter.internal_type].name}"
+    )
+
+    can_getter, can_setter, can_variable = can_getter_setter_variable(
+        can_signal=can_signal,
+        parameter=parameter,
+        var_or_func_or_table=var_or_func,
+    )
+
+    access_level = get_access_level_string(
+        parameter=parameter,
+        parameter_uuid_finder=context.parameter_uuid_finder,
+    )
+
+    if parameter.rejected_callback is None:
+        rejected_callback = "NULL"
+    else:
+        rejected_callback = f"&{parameter.rejected_callback}"
+
+    result = create_item(
+        item_uuid=parameter.uuid,
+        include_uuid_in_item=context.include_uuid_in_item,
+        item_ids=context.item_ids,
+        access_level=access_level,
+        can_getter=can_getter,
+        can_setter=can_setter,
+        can_variable=can_variable,
+        hand_coded_sunspec_getter_function=hand_coded_sunspec_getter_function,
+        hand_coded_sunspec_setter_function=hand_coded_sunspec_setter_function,
+        interface_item_type=interface_item_type,
+        internal_scale=parameter.internal_scale_factor,
+        meta_initializer_values=create_meta_initializer_values(parameter),
+        parameter=parameter,
+        scale_factor_updater=scale_factor_updater,
+        scale_factor_variable=scale_factor_variable,
+        sunspec_getter=sunspec_getter,
+        sunspec_setter=sunspec_setter,
+        sunspec_variable=sunspec_variable,
+        variable_or_getter_setter=variable_or_getter_setter,
+        rejected_callback=rejected_callback,
+        can_scale_factor=getattr(can_signal, "factor", None),
+        reject_from_inactive_interfaces=parameter.reject_from_inactive_interfaces,
+    )
 
-        return [*result, sunspec_models]
+    context.item_uuids.append(parameter.uuid)
+
+    return [*result, sunspec_models]
 
 
 @attr.s(frozen=True)
@@ -823,6 +871,8 @@ class TableBaseStructures:
     parameter_uuid_to_sunspec_node = attr.ib()
     parameter_uuid_finder = attr.ib()
     include_uuid_in_item = attr.ib()
+    index = attr.ib()
+    item_ids = attr.ib(default=None)
     common_structure_names = attr.ib(factory=dict)
     c_code = attr.ib(factory=list)
     h_code = attr.ib(factory=list)
@@ -983,6 +1033,7 @@ class TableBaseStructures:
             node_in_model = get_sunspec_point_from_table_element(
                 sunspec_point=sunspec_point,
                 table_element=table_element,
+                references=self.index.parameter_to_table_point_references,
             )
 
             if node_in_model is not None:
@@ -1046,6 +1097,7 @@ class TableBaseStructures:
             reject_from_inactive_interfaces=(parameter.reject_from_inactive_interfaces),
             uuid_=table_element.uuid,
             include_uuid_in_item=self.include_uuid_in_item,
+            item_ids=self.item_ids,
         )
 
         meta_initializer = create_meta_initializer_values(parameter)
@@ -1069,12 +1121,16 @@ class TableBaseStructures:
             f"InterfaceItem_table_{types[parameter.internal_type].name}"
         )
 
-        item_uuid_string = str(table_element.uuid).replace("-", "_")
-        item_name = f"interfaceItem_{item_uuid_string}"
+        item_name = interface_item_name(table_element.uuid)
 
         maybe_uuid = []
         if self.include_uuid_in_item:
-            maybe_uuid = [f".uuid = {uuid_initializer(table_element.uuid)},"]
+            maybe_uuid = [
+                item_identifier_initializer(
+                    uuid_=table_element.uuid,
+                    item_ids=self.item_ids,
+                ),
+            ]
 
         maybe_sunspec_variable_length = []
         if sunspec_variable is None:
@@ -1112,26 +1168,13 @@ class TableBaseStructures:
 
 
 # TODO: CAMPid 3078980986754174316996743174316967431
-def get_sunspec_point_from_table_element(sunspec_point, table_element):
+def get_sunspec_point_from_table_element(sunspec_point, table_element, references):
     value = table_element.original
 
     if isinstance(value, epyqlib.pm.parametermodel.ArrayParameterElement):
         value = value.original
 
-    value = value.uuid
-
-    nodes_in_model = [
-        node
-        for node in sunspec_point.find_root().nodes_by_attribute(
-            attribute_value=value,
-            attribute_name="parameter_uuid",
-            raise_=False,
-        )
-        if isinstance(
-            node,
-            epcpm.sunspecmodel.TableRepeatingBlockReferenceDataPointReference,
-        )
-    ]
+    nodes_in_model = references.get(value.uuid, ())
 
     for node in nodes_in_model:
         for child in node.tree_parent.original.children:
@@ -1184,134 +1227,102 @@ def get_sunspec_model_from_table_group_element(sunspec_point, table_element):
     return model_repeating_block.tree_parent
 
 
-@builders(epyqlib.pm.parametermodel.Table)
-@attr.s
-class Table:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    sunspec_root = attr.ib()
-    include_uuid_in_item = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-    parameter_uuid_to_sunspec_node = attr.ib()
-    parameter_uuid_finder = attr.ib()
-
-    def gen(self):
-        (group,) = (
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.TableGroupElement)
-        )
+@handlers(epyqlib.pm.parametermodel.Table)
+def table(context, table):
+    (group,) = (
+        child
+        for child in table.children
+        if isinstance(child, epyqlib.pm.parametermodel.TableGroupElement)
+    )
 
-        arrays = [
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.Array)
-        ]
+    arrays = [
+        child
+        for child in table.children
+        if isinstance(child, epyqlib.pm.parametermodel.Array)
+    ]
 
-        groups = [
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.Group)
-        ]
+    groups = [
+        child
+        for child in table.children
+        if isinstance(child, epyqlib.pm.parametermodel.Group)
+    ]
 
-        non_arrays = list(
-            itertools.chain.from_iterable(group.children for group in groups)
-        )
+    non_arrays = list(itertools.chain.from_iterable(group.children for group in groups))
 
-        # TODO: CAMPid 0795436754762451671643967431
-        # TODO: get this from the ...  wherever we have it
-        axes = ["x", "y", "z"]
+    # TODO: CAMPid 0795436754762451671643967431
+    # TODO: get this from the ...  wherever we have it
+    axes = ["x", "y", "z"]
 
-        array_nests = {
-            name: NestedArrays.build(s=array.children[0].internal_variable)
-            for name, array in zip(axes, arrays)
-        }
+    array_nests = {
+        name: NestedArrays.build(s=array.children[0].internal_variable)
+        for name, array in zip(axes, arrays)
+    }
 
-        non_array_nests = [
-            NestedArrays.build(s=non_array.internal_variable)
-            for non_array in non_arrays
-            if non_array.internal_variable is not None
-        ]
-        non_array_nests = {nest.remainder: nest for nest in non_array_nests}
+    non_array_nests = [
+        NestedArrays.build(s=non_array.internal_variable)
+        for non_array in non_arrays
+        if non_array.internal_variable is not None
+    ]
+    non_array_nests = {nest.remainder: nest for nest in non_array_nests}
+
+    table_base_structures = TableBaseStructures(
+        array_nests={**array_nests, **non_array_nests},
+        parameter_uuid_to_can_node=context.parameter_uuid_to_can_node,
+        parameter_uuid_to_sunspec_node=(context.parameter_uuid_to_sunspec_node),
+        parameter_uuid_finder=context.parameter_uuid_finder,
+        include_uuid_in_item=context.include_uuid_in_item,
+        index=context.index,
+        item_ids=context.item_ids,
+    )
 
-        table_base_structures = TableBaseStructures(
-            array_nests={**array_nests, **non_array_nests},
-            parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
-            parameter_uuid_to_sunspec_node=(self.parameter_uuid_to_sunspec_node),
-            parameter_uuid_finder=self.parameter_uuid_finder,
-            include_uuid_in_item=self.include_uuid_in_item,
-        )
+    item_code = handlers.gen(
+        node=group,
+        context=context,
+        table_base_structures=table_base_structures,
+    )
 
-        item_code = builders.wrap(
-            wrapped=group,
-            can_root=self.can_root,
-            sunspec_root=self.sunspec_root,
-            table_base_structures=table_base_structures,
-            parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
-            parameter_uuid_to_sunspec_node=(self.parameter_uuid_to_sunspec_node),
-            parameter_uuid_finder=self.parameter_uuid_finder,
-            include_uuid_in_item=self.include_uuid_in_item,
-        ).gen()
+    return [
+        [
+            *table_base_structures.c_code,
+            "",
+            *item_code[0],
+        ],
+        [
+            *table_base_structures.h_code,
+            "",
+            *item_code[1],
+        ],
+        set(),
+    ]
 
-        return [
-            [
-                *table_base_structures.c_code,
-                "",
-                *item_code[0],
-            ],
-            [
-                *table_base_structures.h_code,
-                "",
-                *item_code[1],
-            ],
-            set(),
-        ]
 
+@handlers(epyqlib.pm.parametermodel.TableGroupElement)
+def table_group_element(context, element, table_base_structures, layers=()):
+    c = []
+    h = []
 
-@builders(epyqlib.pm.parametermodel.TableGroupElement)
-@attr.s
-class TableGroupElement:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    sunspec_root = attr.ib()
-    table_base_structures = attr.ib()
-    include_uuid_in_item = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-    parameter_uuid_to_sunspec_node = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    layers = attr.ib(default=[])
+    table_tree_root = not isinstance(
+        element.tree_parent,
+        epyqlib.pm.parametermodel.TableGroupElement,
+    )
 
-    def gen(self):
-        c = []
-        h = []
+    layers = list(layers)
+    if not table_tree_root:
+        layers.append(element.name)
 
-        table_tree_root = not isinstance(
-            self.wrapped.tree_parent,
-            epyqlib.pm.parametermodel.TableGroupElement,
+    for child in element.children:
+        result = handlers.gen(
+            node=child,
+            context=context,
+            table_base_structures=table_base_structures,
+            layers=layers,
         )
 
-        layers = list(self.layers)
-        if not table_tree_root:
-            layers.append(self.wrapped.name)
+        c_built, h_built = result
+        c.extend(c_built)
+        h.extend(h_built)
 
-        for child in self.wrapped.children:
-            result = builders.wrap(
-                wrapped=child,
-                can_root=self.can_root,
-                sunspec_root=self.sunspec_root,
-                table_base_structures=self.table_base_structures,
-                parameter_uuid_to_can_node=self.parameter_uuid_to_can_node,
-                parameter_uuid_to_sunspec_node=(self.parameter_uuid_to_sunspec_node),
-                parameter_uuid_finder=self.parameter_uuid_finder,
-                layers=layers,
-                include_uuid_in_item=self.include_uuid_in_item,
-            ).gen()
-
-            c_built, h_built = result
-            c.extend(c_built)
-            h.extend(h_built)
-
-        return c, h
+    return c, h
 
 
 # TODO: CAMPid 079549750417808543178043180
@@ -1325,35 +1336,27 @@ def get_curve_type(combination_string):
     }.get(combination_string)
 
 
-@builders(epyqlib.pm.parametermodel.TableArrayElement)
-@attr.s
-class TableArrayElement:
-    wrapped = attr.ib()
-    can_root = attr.ib()
-    sunspec_root = attr.ib()
-    table_base_structures = attr.ib()
-    layers = attr.ib()
-    include_uuid_in_item = attr.ib()
-    parameter_uuid_to_can_node = attr.ib()
-    parameter_uuid_to_sunspec_node = attr.ib()
-    parameter_uuid_finder = attr.ib()
+@handlers(epyqlib.pm.parametermodel.TableArrayElement)
+def table_array_element(context, table_element, table_base_structures, layers):
+    zone_node = table_element.tree_parent.tree_parent.tree_parent
+    curve_node = zone_node.children[0]
+    parameter = curve_node.descendent(
+        table_element.tree_parent.name,
+        table_element.name,
+    )
 
-    def gen(self):
-        table_element = self.wrapped
-        zone_node = table_element.tree_parent.tree_parent.tree_parent
-        curve_node = zone_node.children[0]
-        parameter = curve_node.descendent(
-            self.wrapped.tree_parent.name,
-            self.wrapped.name,
-        )
+    sunspec_point = context.parameter_uuid_to_sunspec_node.get(parameter.uuid)
+
+    c, h = table_base_structures.create_item(
+        table_element=table_element,
+        layers=layers,
+        sunspec_point=sunspec_point,
+    )
 
-        sunspec_point = self.parameter_uuid_to_sunspec_node.get(parameter.uuid)
+    if len(c) > 0:
+        context.item_uuids.append(table_element.uuid)
 
-        return self.table_base_structures.create_item(
-            table_element=self.wrapped,
-            layers=self.layers,
-            sunspec_point=sunspec_point,
-        )
+    return c, h
 
 
 def create_item(
@@ -1378,9 +1381,9 @@ def create_item(
     rejected_callback,
     can_scale_factor,
     reject_from_inactive_interfaces,
+    item_ids=None,
 ):
-    item_uuid_string = str(item_uuid).replace("-", "_")
-    item_name = f"interfaceItem_{item_uuid_string}"
+    item_name = interface_item_name(item_uuid)
 
     if meta_initializer_values is None:
         meta_initializer = []
@@ -1408,6 +1411,7 @@ def create_item(
         reject_from_inactive_interfaces=reject_from_inactive_interfaces,
         uuid_=item_uuid,
         include_uuid_in_item=include_uuid_in_item,
+        item_ids=item_ids,
     )
 
     item = [
@@ -1433,6 +1437,12 @@ def create_item(
     ]
 
 
+def interface_item_name(uuid_):
+    item_uuid_string = str(uuid_).replace("-", "_")
+
+    return f"interfaceItem_{item_uuid_string}"
+
+
 def uuid_initializer(uuid_):
     return "{{{}}}".format(
         ", ".join(
@@ -1442,6 +1452,13 @@ def uuid_initializer(uuid_):
     )
 
 
+def item_identifier_initializer(uuid_, item_ids):
+    if item_ids is None:
+        return f".uuid = {uuid_initializer(uuid_)},"
+
+    return f".id = {epcpm.itemids.literal(item_ids.get(uuid_))},"
+
+
 def create_common_initializers(
     access_level,
     can_getter,
@@ -1459,6 +1476,7 @@ def create_common_initializers(
     reject_from_inactive_interfaces,
     uuid_,
     include_uuid_in_item,
+    item_ids=None,
 ):
     if can_scale_factor is None:
         # TODO: don't default here?
@@ -1466,7 +1484,7 @@ def create_common_initializers(
 
     maybe_uuid = []
     if include_uuid_in_item:
-        maybe_uuid = [f".uuid = {uuid_initializer(uuid_)},"]
+        maybe_uuid = [item_identifier_initializer(uuid_=uuid_, item_ids=item_ids)]
 
     reject_from_inactive_interfaces_literal = (
         "true" if reject_from_inactive_interfaces else "false"
@@ -4,12 +4,10 @@ import attr
 import toolz
 
 import epyqlib.pm.parametermodel
-import epyqlib.utils.general
 
 import epcpm.c
-
-
-builders = epyqlib.utils.general.TypeMap()
+import epcpm.itemids
+import epcpm.parametervisitor
 
 
 # TODO: get rid of this or get it somewhere else (pm exclude-from-SIL bool?)
@@ -25,159 +23,195 @@ def ignore_item(item):
 
 @attr.s
 class CHContents:
-    c = attr.ib(factory=list)
-    h = attr.ib(factory=list)
+    c = attr.ib(factory=lambda: epcpm.c.Emitter(strip=True))
+    h = attr.ib(factory=lambda: epcpm.c.Emitter(strip=True))
 
-    def extend(self, other):
-        self.c.extend(other.c)
-        self.h.extend(other.h)
 
-    def append(self, other):
-        self.c.append(other.c)
-        self.h.append(other.h)
+def export(c_path, h_path, parameters_model, compact_item_ids=False):
+    target = Target.build(
+        c_path=c_path,
+        h_path=h_path,
+        compact_item_ids=compact_item_ids,
+    )
 
+    epcpm.parametervisitor.walk(root=parameters_model.root, targets=[target])
+    target.finish()
 
-def export(c_path, h_path, parameters_model):
-    builder = builders.wrap(
-        wrapped=parameters_model.root,
-    )
 
-    c_path.parent.mkdir(parents=True, exist_ok=True)
+def collect_items(parameters_root):
+    target = Target()
+    epcpm.parametervisitor.walk(root=parameters_root, targets=[target])
 
-    built, items = builder.gen()
+    return target.items
 
-    template_context = {
-        "item_count": len(items),
-        "initializers": epcpm.c.format_nested_lists(built.c).rstrip(),
-        "declarations": epcpm.c.format_nested_lists(built.h).rstrip(),
-    }
 
-    epcpm.c.render(
-        source=c_path.with_suffix(f"{c_path.suffix}_pm"),
-        destination=c_path,
-        context=template_context,
-    )
+def contents(items):
+    everything = CHContents()
 
-    epcpm.c.render(
-        source=h_path.with_suffix(f"{h_path.suffix}_pm"),
-        destination=h_path,
-        context=template_context,
+    with everything.c.indented():
+        for index, item in enumerate(items):
+            everything.c.lines(item.create_initializer(index=index))
+
+    everything.h.lines(
+        [
+            # 'typedef enum SetterTypes {',
+            # [
+            #     f'setter_{type},'
+            #     for type in types
+            # ],
+            # '} SetterTypes;',
+            # '',
+            # *[
+            #     f'typedef void (*SetterPointer_{type})({type});'
+            #     for type in types
+            # ],
+            # '',
+            # 'typedef union Setter {',
+            # [
+            #     f'SetterPointer_{type} {type}_;'
+            #     for type in types
+            # ],
+            # '} Setter;',
+            # '',
+            f"extern Item SIL_interfaceItems[{len(items)}];",
+        ]
     )
 
+    return everything
 
-def collect_items(parameters_root):
-    all_items = []
-
-    parameters = next(
-        node for node in parameters_root.children if node.name == "Parameters"
-    )
 
-    for child in parameters.children:
-        if not isinstance(
-            child,
-            (
-                epyqlib.pm.parametermodel.Group,
-                epyqlib.pm.parametermodel.Parameter,
-                epyqlib.pm.parametermodel.Table,
-            ),
-        ):
-            continue
+@attr.s
+class Target(epcpm.parametervisitor.Target):
+    c_path = attr.ib(default=None)
+    h_path = attr.ib(default=None)
+    items = attr.ib(factory=list)
+    root = attr.ib(default=None)
+    parameters = attr.ib(default=None)
+    # names of the groups, tables and table group elements being visited
+    path = attr.ib(factory=list)
+    table = attr.ib(default=None)
+    array_nests = attr.ib(default=None)
+    layers = attr.ib(factory=list)
+    # identifies the items by epcpm.itemids ids rather than UUIDs if set
+    item_ids = attr.ib(default=None)
 
-        items = builders.wrap(
-            wrapped=child,
-            path=(),
-            parameters_root=parameters_root,
-            parameter_uuid_finder=parameters_root.model.node_from_uuid,
-        ).gen()
+    @classmethod
+    def build(cls, compact_item_ids=False, **kwargs):
+        if compact_item_ids:
+            kwargs["item_ids"] = epcpm.itemids.ItemIds()
 
-        all_items.extend(items)
+        return cls(**kwargs)
 
-    return all_items
+    def enter(self, node):
+        parent = node.tree_parent
 
+        if isinstance(node, epyqlib.pm.parametermodel.Root):
+            self.root = node
+            self.parameters = next(
+                child for child in node.children if child.name == "Parameters"
+            )
+        elif parent is self.root:
+            if node is not self.parameters:
+                return epcpm.parametervisitor.skip
+        elif isinstance(node, epyqlib.pm.parametermodel.Parameter):
+            self.items.extend(parameter_items(parameter=node, path=tuple(self.path)))
+        elif isinstance(node, epyqlib.pm.parametermodel.TableArrayElement):
+            self.items.extend(
+                table_element_items(
+                    table_element=node,
+                    path=tuple(self.path),
+                    table=self.table,
+                    layers=self.layers,
+                    array_nests=self.array_nests,
+                ),
+            )
+        elif isinstance(node, epyqlib.pm.parametermodel.Group):
+            if isinstance(parent, epyqlib.pm.parametermodel.Table):
+                return epcpm.parametervisitor.skip
+
+            self.path.append(node.name)
+        elif isinstance(node, epyqlib.pm.parametermodel.Table):
+            arrays = [
+                child
+                for child in node.children
+                if isinstance(child, epyqlib.pm.parametermodel.Array)
+            ]
 
-@builders(epyqlib.pm.parametermodel.Root)
-@attr.s
-class Root:
-    wrapped = attr.ib()
+            self.table = node
+            self.array_nests = {
+                name: NestedArrays.build(s=array.children[0].internal_variable)
+                for name, array in zip(axes, arrays)
+            }
+            self.path.append(node.name)
+        elif isinstance(node, epyqlib.pm.parametermodel.TableGroupElement):
+            # the table's top group element is not a layer
+            if isinstance(parent, epyqlib.pm.parametermodel.TableGroupElement):
+                self.layers.append(node.name)
+
+            self.path.append(node.name)
+
+    def leave(self, node):
+        if node is self.root or node.tree_parent is self.root:
+            return
+
+        if isinstance(node, epyqlib.pm.parametermodel.Table):
+            self.table = None
+            self.array_nests = None
+        elif isinstance(node, epyqlib.pm.parametermodel.TableGroupElement):
+            if isinstance(
+                node.tree_parent,
+                epyqlib.pm.parametermodel.TableGroupElement,
+            ):
+                self.layers.pop()
+        elif not isinstance(node, epyqlib.pm.parametermodel.Group):
+            return
+        elif isinstance(node.tree_parent, epyqlib.pm.parametermodel.Table):
+            return
 
-    def gen(self):
-        contents = CHContents()
-        types = set()
+        self.path.pop()
 
-        items = collect_items(parameters_root=self.wrapped)
-        for index, item in enumerate(items):
-            types.add(item.type)
-            item_lines = item.create_initializer(index=index)
-            contents.c.extend(item_lines)
+    def finish(self):
+        if self.c_path is None:
+            return
 
-        everything = CHContents()
+        self.c_path.parent.mkdir(parents=True, exist_ok=True)
 
-        everything.c.extend(
-            [
-                contents.c,
-            ]
-        )
+        items = self.items
+        flash_saved = 0
 
-        everything.h.extend(
-            [
-                # 'typedef enum SetterTypes {',
-                # [
-                #     f'setter_{type},'
-                #     for type in types
-                # ],
-                # '} SetterTypes;',
-                # '',
-                # *[
-                #     f'typedef void (*SetterPointer_{type})({type});'
-                #     for type in types
-                # ],
-                # '',
-                # 'typedef union Setter {',
-                # [
-                #     f'SetterPointer_{type} {type}_;'
-                #     for type in types
-                # ],
-                # '} Setter;',
-                # '',
-                f"extern Item SIL_interfaceItems[{len(items)}];",
+        if self.item_ids is not None:
+            items = [
+                attr.evolve(item, item_id=self.item_ids.get(item.uuid))
+                for item in items
             ]
-        )
-
-        return everything, items
+            # the UUID strings, with their terminators, are no longer stored
+            flash_saved = sum(len(str(item.uuid)) + 1 for item in items)
 
+        built = contents(items=items)
 
-@builders(epyqlib.pm.parametermodel.Group)
-@attr.s
-class Group:
-    wrapped = attr.ib()
-    path = attr.ib()
-    parameters_root = attr.ib()
-    parameter_uuid_finder = attr.ib()
-
-    def gen(self):
-        items = []
-
-        for child in self.wrapped.children:
-            if not isinstance(
-                child,
-                (
-                    epyqlib.pm.parametermodel.Group,
-                    epyqlib.pm.parametermodel.Parameter,
-                    epyqlib.pm.parametermodel.Table,
-                ),
-            ):
-                continue
+        template_context = {
+            "item_count": len(items),
+            "initializers": built.c.getvalue(),
+            "declarations": built.h.getvalue(),
+        }
 
-            built = builders.wrap(
-                wrapped=child,
-                path=self.path + (self.wrapped.name,),
-                parameters_root=self.parameters_root,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            ).gen()
+        epcpm.c.render(
+            source=self.c_path.with_suffix(f"{self.c_path.suffix}_pm"),
+            destination=self.c_path,
+            context=template_context,
+        )
 
-            items.extend(built)
+        epcpm.c.render(
+            source=self.h_path.with_suffix(f"{self.h_path.suffix}_pm"),
+            destination=self.h_path,
+            context=template_context,
+        )
 
-        return items
+        epcpm.itemids.update_sidecar(
+            c_path=self.c_path,
+            item_ids=self.item_ids,
+            flash_saved=flash_saved,
+        )
 
 
 @attr.s
@@ -190,6 +224,7 @@ class Item:
     is_table = attr.ib(default=False)
     table_info = attr.ib(default=None)
     path = attr.ib(default=[])
+    item_id = attr.ib(default=None)
     #     factory=lambda: TableInfo(zone=0, curve=0, index=0, setter=0, type=''),
     # )
 
@@ -223,8 +258,13 @@ class Item:
 
         is_table = "true" if self.is_table else "false"
 
+        if self.item_id is None:
+            identifier = f'.uuid = "{self.uuid}",'
+        else:
+            identifier = f".id = {epcpm.itemids.literal(self.item_id)},"
+
         initializers = [
-            f'.uuid = "{self.uuid}",',
+            identifier,
             f".setterType = setter_{self.type},",
             f".setter = {{ .{self.type}_ = {self.on_write} }},",
             f".variable = {{ .{self.type}_ = {self.variable} }},",
@@ -279,51 +319,41 @@ class TableInfo:
         return initializers
 
 
-@builders(epyqlib.pm.parametermodel.Parameter)
-@attr.s
-class Parameter:
-    wrapped = attr.ib()
-    path = attr.ib()
-    parameters_root = attr.ib()
-    parameter_uuid_finder = attr.ib()
-
-    def gen(self):
-        parameter = self.wrapped
+def parameter_items(parameter, path):
+    supported_item_type = parameter.uses_interface_item()
 
-        supported_item_type = parameter.uses_interface_item()
+    if not supported_item_type:
+        return []
 
-        if not supported_item_type:
-            return []
+    if parameter.internal_type == "void*":
+        return []
 
-        if parameter.internal_type == "void*":
-            return []
+    if "txRate" in parameter.name:
+        return []
 
-        if "txRate" in parameter.name:
-            return []
+    if parameter.setter_function is None:
+        on_write = "NULL"
+    else:
+        on_write = f"&{parameter.setter_function}"
 
-        if parameter.setter_function is None:
-            on_write = "NULL"
-        else:
-            on_write = f"&{parameter.setter_function}"
+    if parameter.internal_variable is None:
+        variable = "NULL"
+    else:
+        variable = f"&{parameter.internal_variable}"
 
-        if parameter.internal_variable is None:
-            variable = "NULL"
-        else:
-            variable = f"&{parameter.internal_variable}"
-
-        item = Item(
-            uuid=parameter.uuid,
-            variable=variable,
-            type=parameter.internal_type,
-            on_write=on_write,
-            internal_scale=parameter.internal_scale_factor,
-            path=self.path,
-        )
+    item = Item(
+        uuid=parameter.uuid,
+        variable=variable,
+        type=parameter.internal_type,
+        on_write=on_write,
+        internal_scale=parameter.internal_scale_factor,
+        path=path,
+    )
 
-        if ignore_item(item):
-            return []
+    if ignore_item(item):
+        return []
 
-        return [item]
+    return [item]
 
 
 # TODO: CAMPid 68945967541316743769675426795146379678431
@@ -391,195 +421,117 @@ class NestedArrays:
 axes = ["x", "y", "z"]
 
 
-@builders(epyqlib.pm.parametermodel.Table)
-@attr.s
-class Table:
-    wrapped = attr.ib()
-    path = attr.ib()
-    parameters_root = attr.ib()
-    parameter_uuid_finder = attr.ib()
-
-    def gen(self):
-        (group,) = (
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.TableGroupElement)
-        )
-
-        arrays = [
-            child
-            for child in self.wrapped.children
-            if isinstance(child, epyqlib.pm.parametermodel.Array)
-        ]
-
-        array_nests = {
-            name: NestedArrays.build(s=array.children[0].internal_variable)
-            for name, array in zip(axes, arrays)
-        }
-
-        items = builders.wrap(
-            wrapped=group,
-            path=self.path + (self.wrapped.name,),
-            table=self.wrapped,
-            array_nests=array_nests,
-            parameter_uuid_finder=self.parameter_uuid_finder,
-        ).gen()
-
-        return items
-
+def table_element_items(table_element, path, table, layers, array_nests):
+    # TODO: CAMPid 9655426754319431461354643167
+    array_element = table_element.original
 
-@builders(epyqlib.pm.parametermodel.TableGroupElement)
-@attr.s
-class TableGroupElement:
-    wrapped = attr.ib()
-    path = attr.ib()
-    table = attr.ib()
-    array_nests = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    layers = attr.ib(default=[])
-
-    def gen(self):
-        items = []
-
-        table_tree_root = not isinstance(
-            self.wrapped.tree_parent,
-            epyqlib.pm.parametermodel.TableGroupElement,
-        )
-
-        layers = list(self.layers)
-        if not table_tree_root:
-            layers.append(self.wrapped.name)
-
-        for child in self.wrapped.children:
-            result = builders.wrap(
-                wrapped=child,
-                path=self.path + (self.wrapped.name,),
-                table=self.table,
-                layers=layers,
-                array_nests=self.array_nests,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            ).gen()
-
-            items.extend(result)
-
-        return items
+    if isinstance(array_element, epyqlib.pm.parametermodel.Parameter):
+        parameter = array_element
+    else:
+        parameter = array_element.tree_parent.children[0]
 
+    is_group = isinstance(
+        parameter.tree_parent,
+        epyqlib.pm.parametermodel.Group,
+    )
 
-@builders(epyqlib.pm.parametermodel.TableArrayElement)
-@attr.s
-class TableArrayElement:
-    wrapped = attr.ib()
-    path = attr.ib()
-    table = attr.ib()
-    layers = attr.ib()
-    array_nests = attr.ib()
-    parameter_uuid_finder = attr.ib()
-
-    def gen(self):
-        table_element = self.wrapped
-
-        # TODO: CAMPid 9655426754319431461354643167
-        array_element = table_element.original
-
-        if isinstance(array_element, epyqlib.pm.parametermodel.Parameter):
-            parameter = array_element
-        else:
-            parameter = array_element.tree_parent.children[0]
-
-        is_group = isinstance(
-            parameter.tree_parent,
-            epyqlib.pm.parametermodel.Group,
+    if is_group:
+        return table_group_items(
+            table_element=table_element,
+            path=path,
+            layers=layers,
         )
 
-        if is_group:
-            return self.handle_group()
-
-        return self.handle_array()
-
-    def handle_array(self):
-        table_element = self.wrapped
+    return table_array_items(
+        table_element=table_element,
+        path=path,
+        table=table,
+        layers=layers,
+        array_nests=array_nests,
+    )
 
-        # TODO: CAMPid 9655426754319431461354643167
-        array_element = table_element.original
 
-        if isinstance(array_element, epyqlib.pm.parametermodel.Parameter):
-            parameter = array_element
-        else:
-            parameter = array_element.tree_parent.children[0]
+def table_array_items(table_element, path, table, layers, array_nests):
+    # TODO: CAMPid 9655426754319431461354643167
+    array_element = table_element.original
 
-        indexes = {
-            "curve_type": get_curve_type("".join(self.layers[:2])),
-            "curve_index": int(self.layers[-2]) - 1,
-            "point_index": int(table_element.name.lstrip("_").lstrip("0")) - 1,
-        }
+    if isinstance(array_element, epyqlib.pm.parametermodel.Parameter):
+        parameter = array_element
+    else:
+        parameter = array_element.tree_parent.children[0]
 
-        axis = axes[self.table.arrays.index(parameter.tree_parent)]
-        variable = self.array_nests[axis].full(indexes)
-        # This cast covers the fact that all table points are internally
-        # int16_t despite some being used as uint16_t.
-        # TODO: verify compatible size at least?
-        variable = f"({parameter.internal_type} *) &{variable}"
+    indexes = {
+        "curve_type": get_curve_type("".join(layers[:2])),
+        "curve_index": int(layers[-2]) - 1,
+        "point_index": int(table_element.name.lstrip("_").lstrip("0")) - 1,
+    }
 
-        if parameter.setter_function is None:
-            # TODO: should Item do this?
-            table_on_write = "NULL"
-        else:
-            table_on_write = parameter.setter_function.format(upper_axis=axis.upper())
+    axis = axes[table.arrays.index(parameter.tree_parent)]
+    variable = array_nests[axis].full(indexes)
+    # This cast covers the fact that all table points are internally
+    # int16_t despite some being used as uint16_t.
+    # TODO: verify compatible size at least?
+    variable = f"({parameter.internal_type} *) &{variable}"
+
+    if parameter.setter_function is None:
+        # TODO: should Item do this?
+        table_on_write = "NULL"
+    else:
+        table_on_write = parameter.setter_function.format(upper_axis=axis.upper())
+
+    table_info = TableInfo(
+        zone=indexes["curve_type"],
+        curve=indexes["curve_index"],
+        index=indexes["point_index"],
+        setter=table_on_write,
+        type=parameter.internal_type,
+    )
 
-        table_info = TableInfo(
-            zone=indexes["curve_type"],
-            curve=indexes["curve_index"],
-            index=indexes["point_index"],
-            setter=table_on_write,
+    return [
+        Item(
+            uuid=table_element.uuid,
+            variable=variable,
             type=parameter.internal_type,
+            on_write="NULL",
+            internal_scale=parameter.internal_scale_factor,
+            is_table=True,
+            table_info=table_info,
+            path=path,
         )
+    ]
 
-        return [
-            Item(
-                uuid=table_element.uuid,
-                variable=variable,
-                type=parameter.internal_type,
-                on_write="NULL",
-                internal_scale=parameter.internal_scale_factor,
-                is_table=True,
-                table_info=table_info,
-                path=self.path,
-            )
-        ]
-
-    def handle_group(self):
-        table_element = self.wrapped
 
-        curve_index = int(self.layers[-2]) - 1
+def table_group_items(table_element, path, layers):
+    curve_index = int(layers[-2]) - 1
 
-        parameter = table_element.original
+    parameter = table_element.original
 
-        if parameter.internal_type == "PackedString":
-            return []
+    if parameter.internal_type == "PackedString":
+        return []
 
-        if parameter.internal_variable is None:
-            return []
+    if parameter.internal_variable is None:
+        return []
 
-        if parameter.setter_function is None:
-            # TODO: i think it's reasonable for Item to handle this?
-            setter_function = "NULL"
-        else:
-            setter_function = "&" + parameter.setter_function
+    if parameter.setter_function is None:
+        # TODO: i think it's reasonable for Item to handle this?
+        setter_function = "NULL"
+    else:
+        setter_function = "&" + parameter.setter_function
 
-        curve_type = get_curve_type("".join(self.layers[:2]))
+    curve_type = get_curve_type("".join(layers[:2]))
 
-        internal_variable = parameter.internal_variable.format(
-            curve_type=curve_type,
-            curve_index=curve_index,
-        )
+    internal_variable = parameter.internal_variable.format(
+        curve_type=curve_type,
+        curve_index=curve_index,
+    )
 
-        item = Item(
-            uuid=table_element.uuid,
-            variable=f"&{internal_variable}",
-            type=parameter.internal_type,
-            on_write=setter_function,
-            internal_scale=parameter.internal_scale_factor,
-            path=self.path,
-        )
+    item = Item(
+        uuid=table_element.uuid,
+        variable=f"&{internal_variable}",
+        type=parameter.internal_type,
+        on_write=setter_function,
+        internal_scale=parameter.internal_scale_factor,
+        path=path,
+    )
 
-        return [item]
+    return [item]
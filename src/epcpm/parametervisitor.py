@@ -0,0 +1,80 @@
+import attr
+
+import epyqlib.pm.parametermodel
+
+
+# Returned by a target's enter() to not be called for the node's descendants.
+# The target's leave() is still called for the node itself.
+skip = object()
+
+visited_types = (
+    epyqlib.pm.parametermodel.Group,
+    epyqlib.pm.parametermodel.Parameter,
+    epyqlib.pm.parametermodel.Table,
+    epyqlib.pm.parametermodel.TableGroupElement,
+    epyqlib.pm.parametermodel.TableArrayElement,
+)
+
+
+class Target:
+    def enter(self, node):
+        pass
+
+    def leave(self, node):
+        pass
+
+    def finish(self):
+        pass
+
+
+@attr.s
+class Isolated:
+    """Keep the first exception raised by the target, which then gets no
+    more events, so it doesn't stop the walk for the other targets.  The
+    exception is raised again by finish()."""
+
+    target = attr.ib()
+    error = attr.ib(default=None)
+
+    def enter(self, node):
+        if self.error is None:
+            try:
+                return self.target.enter(node)
+            except Exception as e:
+                self.error = e
+
+        return skip
+
+    def leave(self, node):
+        if self.error is None:
+            try:
+                self.target.leave(node)
+            except Exception as e:
+                self.error = e
+
+    def finish(self):
+        if self.error is not None:
+            raise self.error
+
+        return self.target.finish()
+
+
+def walk(root, targets):
+    """Walk the parameter tree once calling each target's enter() for every
+    visited node before its descendants and leave() after them."""
+    targets = list(targets)
+
+    if len(targets) > 0:
+        visit(node=root, targets=targets)
+
+
+def visit(node, targets):
+    descending = [target for target in targets if target.enter(node) is not skip]
+
+    if len(descending) > 0:
+        for child in node.children:
+            if isinstance(child, visited_types):
+                visit(node=child, targets=descending)
+
+    for target in targets:
+        target.leave(node)
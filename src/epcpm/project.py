@@ -1,13 +1,19 @@
+import contextlib
+import functools
+import os
 import pathlib
+import time
 
 import attr
 import graham
 import marshmallow
 
+import epyqlib.checkresultmodel
 import epyqlib.pm.parametermodel
 import epyqlib.utils.qt
 
 import epcpm.canmodel
+import epcpm.projectcache
 import epcpm.sunspecmodel
 
 
@@ -26,84 +32,100 @@ def create_blank():
     return project
 
 
-def loads(s, project_path=None, post_load=True):
+def loads(s, project_path=None, post_load=True, cache=False, models=None):
     project = graham.schema(Project).loads(s).data
 
     if project_path is not None:
         project.filename = pathlib.Path(project_path).absolute()
 
     if post_load:
-        _post_load(project)
+        _post_load(project, cache=cache, names=models)
 
     return project
 
 
-def load(f, post_load=True):
-    project = loads(f.read(), project_path=f.name, post_load=post_load)
+def load(f, post_load=True, cache=False, models=None):
+    project = loads(
+        f.read(),
+        project_path=f.name,
+        post_load=post_load,
+        cache=cache,
+        models=models,
+    )
 
     return project
 
 
-def loadp(path, post_load=True):
+def loadp(path, post_load=True, cache=False, models=None):
     with open(path) as f:
-        return load(f, post_load=post_load)
+        return load(f, post_load=post_load, cache=cache, models=models)
+
+
+# name: (root type, columns, models referenced while building the model)
+def model_types():
+    return {
+        "parameters": (
+            epyqlib.pm.parametermodel.Root,
+            epyqlib.pm.parametermodel.columns,
+            (),
+        ),
+        "can": (epcpm.canmodel.Root, epcpm.canmodel.columns, ()),
+        "sunspec": (
+            epcpm.sunspecmodel.Root,
+            epcpm.sunspecmodel.columns,
+            ("parameters",),
+        ),
+    }
 
 
-def _post_load(project):
+def _post_load(project, cache=False, names=None):
     models = project.models
+    first = len(project.change_trackers) == 0
 
-    if models.parameters is None:
-        if project.paths.parameters is None:
-            models.parameters = epyqlib.attrsmodel.Model(
-                root=epyqlib.pm.parametermodel.Root(),
-                columns=epyqlib.pm.parametermodel.columns,
-            )
-        else:
-            models.parameters = load_model(
-                project=project,
-                path=project.paths.parameters,
-                root_type=epyqlib.pm.parametermodel.Root,
-                columns=epyqlib.pm.parametermodel.columns,
-            )
+    if names is None:
+        names = set(model_types())
+    else:
+        # the other models take their enumerations from the parameters
+        names = {"parameters", *names}
 
-    if models.can is None:
-        if project.paths.can is None:
-            models.can = epyqlib.attrsmodel.Model(
-                root=epcpm.canmodel.Root(),
-                columns=epcpm.canmodel.columns,
-            )
-        else:
-            models.can = load_model(
-                project=project,
-                path=project.paths.can,
-                root_type=epcpm.canmodel.Root,
-                columns=epcpm.canmodel.columns,
-            )
+    for name, (root_type, columns, drop_source_names) in model_types().items():
+        if name not in names or models[name] is not None:
+            continue
 
-    if models.sunspec is None:
-        if project.paths.sunspec is None:
-            models.sunspec = epyqlib.attrsmodel.Model(
-                root=epcpm.sunspecmodel.Root(),
-                columns=epcpm.sunspecmodel.columns,
+        path = project.paths[name]
+
+        if path is None:
+            models[name] = epyqlib.attrsmodel.Model(
+                root=root_type(),
+                columns=columns,
             )
         else:
-            models.sunspec = load_model(
+            models[name] = load_model(
                 project=project,
-                path=project.paths.sunspec,
-                root_type=epcpm.sunspecmodel.Root,
-                columns=epcpm.sunspecmodel.columns,
-                drop_sources=(models.parameters,),
+                path=path,
+                root_type=root_type,
+                columns=columns,
+                drop_sources=tuple(models[source] for source in drop_source_names),
+                cache=cache,
             )
 
-    models.parameters.droppable_from.add(models.parameters)
+    new_names = {
+        name
+        for name, model in models.items()
+        if model is not None
+        and getattr(project.change_trackers.get(name), "model", None) is not model
+    }
+
+    for name in new_names:
+        models[name].droppable_from.add(models.parameters)
+        models[name].droppable_from.add(models[name])
 
-    models.can.droppable_from.add(models.parameters)
-    models.can.droppable_from.add(models.can)
+    models.update_enumeration_roots(names=new_names)
 
-    models.sunspec.droppable_from.add(models.parameters)
-    models.sunspec.droppable_from.add(models.sunspec)
+    project.track_changes(names=new_names)
 
-    models.update_enumeration_roots()
+    if first:
+        project.saved = (project.filename, path_values(project.paths))
 
 
 @graham.schemify(tag="models")
@@ -150,7 +172,23 @@ class Models:
 
         setattr(self, attr.fields(type(self))[item].name, value)
 
-    def update_enumeration_roots(self):
+    def check(self):
+        root = epyqlib.checkresultmodel.Root()
+
+        for name, model in self.items():
+            node = epyqlib.checkresultmodel.Node.build(
+                name=name,
+                node=model.root,
+            )
+            model.root.check_and_append(
+                parent=node,
+                models=self,
+            )
+            root.append_child(node)
+
+        return root
+
+    def update_enumeration_roots(self, names=None):
         enumerations_root = [
             child
             for child in self.parameters.root.children
@@ -195,13 +233,18 @@ class Models:
             else:
                 sunspec_types_root = None
         self.parameters.list_selection_roots["sunspec types"] = sunspec_types_root
-        self.sunspec.list_selection_roots["sunspec types"] = sunspec_types_root
-        self.sunspec.list_selection_roots["enumerations"] = enumerations_root
 
-        self.can.list_selection_roots["enumerations"] = enumerations_root
-        self.parameters.update_nodes()
-        self.can.update_nodes()
-        self.sunspec.update_nodes()
+        if self.sunspec is not None:
+            self.sunspec.list_selection_roots["sunspec types"] = sunspec_types_root
+            self.sunspec.list_selection_roots["enumerations"] = enumerations_root
+
+        if self.can is not None:
+            self.can.list_selection_roots["enumerations"] = enumerations_root
+
+        # in field order since the other models' updates read parameter tables
+        for name, model in self.items():
+            if model is not None and (names is None or name in names):
+                model.update_nodes()
 
 
 @graham.schemify(tag="project")
@@ -217,8 +260,17 @@ class Project:
     models = attr.ib(default=attr.Factory(Models))
     filters = attr.ib(default=(("Parameter Project", ["pmp"]), ("All Files", ["*"])))
     data_filters = attr.ib(default=(("Dataset", ["json"]), ("All Files", ["*"])))
+    change_trackers = attr.ib(default=attr.Factory(dict), cmp=False, repr=False)
+    # (filename, paths) as last loaded or saved
+    saved = attr.ib(default=(None, None), cmp=False, repr=False)
+
+    def load_models(self, *names, cache=False):
+        _post_load(self, cache=cache, names=names if len(names) > 0 else None)
 
     def save(self, parent=None):
+        # partially loaded projects are completed before their paths can change
+        self.load_models()
+
         if self.filename is None:
             project_path = epyqlib.utils.qt.file_dialog(
                 filters=self.filters,
@@ -254,54 +306,221 @@ class Project:
 
         self.paths = paths
 
-        with open(self.filename, "w", newline="\n") as f:
-            s = graham.dumps(self, indent=4).data
+        saved_filename, saved_paths = self.saved
+        relocated = self.filename != saved_filename
+        dirty = self.dirty_models()
+
+        rewrite_project = (
+            relocated or path_values(paths) != saved_paths or not self.filename.exists()
+        )
+        if rewrite_project:
+            write_text_atomically(self.filename, graham.dumps(self, indent=4).data)
+
+        for name, path in paths.items():
+            full_path = project_directory / path
+
+            unchanged = (
+                not relocated
+                and name not in dirty
+                and pathlib.Path(path) == saved_paths[name]
+                and full_path.exists()
+            )
+            if unchanged:
+                continue
+
+            write_text_atomically(
+                full_path,
+                graham.dumps(self.models[name].root, indent=4).data,
+            )
+
+        self.mark_saved()
+
+    def track_changes(self, names):
+        for name in names:
+            model = self.models[name]
+            tracker = self.change_trackers.get(name)
+
+            if tracker is not None and tracker.model is not model:
+                tracker.disconnect()
+                tracker = None
+
+            if tracker is None:
+                tracker = ModelChangeTracker(model=model)
+                self.change_trackers[name] = tracker
+
+            tracker.dirty = False
+
+    def mark_saved(self):
+        self.track_changes(
+            names=[name for name, model in self.models.items() if model is not None],
+        )
+        self.saved = (self.filename, path_values(self.paths))
+
+    def dirty_models(self):
+        return {
+            name
+            for name, model in self.models.items()
+            if model is not None
+            and (
+                name not in self.change_trackers
+                or self.change_trackers[name].model is not model
+                or self.change_trackers[name].dirty
+            )
+        }
+
+
+def path_values(paths):
+    return {
+        name: None if path is None else pathlib.Path(path)
+        for name, path in paths.items()
+    }
+
+
+def write_text_atomically(path, s):
+    if not s.endswith("\n"):
+        s += "\n"
+
+    path = pathlib.Path(path)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(temporary_path, "w", newline="\n") as f:
             f.write(s)
 
-            if not s.endswith("\n"):
-                f.write("\n")
+        os.replace(temporary_path, path)
+    finally:
+        if temporary_path.exists():
+            temporary_path.unlink()
+
+
+# Edits made through the GUI and tree changes all pass through the Qt model.
+@attr.s
+class ModelChangeTracker:
+    model = attr.ib()
+    dirty = attr.ib(default=False)
+
+    def __attrs_post_init__(self):
+        for signal in self.signals():
+            signal.connect(self.changed)
+
+    def signals(self):
+        qt_model = self.model.model
+
+        return (
+            qt_model.dataChanged,
+            qt_model.rowsInserted,
+            qt_model.rowsRemoved,
+            qt_model.rowsMoved,
+            qt_model.modelReset,
+            qt_model.layoutChanged,
+        )
+
+    def changed(self, *args):
+        self.dirty = True
+
+    def disconnect(self):
+        for signal in self.signals():
+            signal.disconnect(self.changed)
+
+
+@attr.s
+class LoadTimes:
+    deserialize = attr.ib(default=0)
+    collect = attr.ib(default=0)
+    resolve = attr.ib(default=0)
 
-        for path, model in zip(paths.values(), self.models.values()):
-            s = graham.dumps(model.root, indent=4).data
 
-            with open(project_directory / path, "w", newline="\n") as f:
-                f.write(s)
+_load_time_collectors = []
 
-                if not s.endswith("\n"):
-                    f.write("\n")
 
+@contextlib.contextmanager
+def collect_load_times():
+    load_times = {}
+    _load_time_collectors.append(load_times)
+
+    try:
+        yield load_times
+    finally:
+        _load_time_collectors.remove(load_times)
+
+
+@functools.lru_cache(maxsize=None)
+def reference_fields(cls):
+    names = []
+
+    for field in attr.fields(cls):
+        metadata = field.metadata.get(graham.core.metadata_key)
+        if metadata is None:
+            continue
+
+        if isinstance(metadata.field, epyqlib.attrsmodel.Reference):
+            names.append(field.name)
+
+    return tuple(names)
+
+
+def load_model(project, path, root_type, columns, drop_sources=(), cache=False):
+    times = LoadTimes()
+    start = time.perf_counter()
 
-def load_model(project, path, root_type, columns, drop_sources=()):
     resolved_path = path
     if project.filename is not None:
         resolved_path = project.filename.parents[0] / resolved_path
 
-    with open(resolved_path) as f:
-        raw = f.read()
-
-    root_schema = graham.schema(root_type)
-    root = root_schema.loads(raw).data
+    with open(resolved_path, "rb") as f:
+        content = f.read()
+
+    cache = cache and project.filename is not None
+
+    root = None
+    if cache:
+        name = epcpm.projectcache.root_name(root_type)
+        root = epcpm.projectcache.load_root(
+            project_path=project.filename,
+            name=name,
+            content=content,
+        )
+
+    if root is None:
+        root_schema = graham.schema(root_type)
+        root = root_schema.loads(content.decode()).data
+
+        if cache:
+            epcpm.projectcache.store_root(
+                project_path=project.filename,
+                name=name,
+                content=content,
+                root=root,
+            )
 
-    def collect(node, payload):
-        payload[node.uuid] = node
+    times.deserialize = time.perf_counter() - start
+    start = time.perf_counter()
 
     uuid_to_node = {}
-    root.traverse(call_this=collect, payload=uuid_to_node, internal_nodes=True)
-
-    def update(node, payload):
-        for field in attr.fields(type(node)):
-            if field.metadata.get(graham.core.metadata_key) is None or not isinstance(
-                field.metadata.get(graham.core.metadata_key).field,
-                epyqlib.attrsmodel.Reference,
-            ):
-                continue
+    referencing = []
+
+    def collect(node, _):
+        uuid_to_node[node.uuid] = node
 
-            value = getattr(node, field.name)
-            original = payload.get(value)
+        names = reference_fields(type(node))
+        if len(names) > 0:
+            referencing.append((node, names))
+
+    root.traverse(call_this=collect, internal_nodes=True)
+
+    times.collect = time.perf_counter() - start
+    start = time.perf_counter()
+
+    for node, names in referencing:
+        for name in names:
+            original = uuid_to_node.get(getattr(node, name))
             if original is not None:
-                setattr(node, field.name, original)
+                setattr(node, name, original)
+
+    times.resolve = time.perf_counter() - start
 
-    root.traverse(call_this=update, payload=uuid_to_node, internal_nodes=True)
+    for load_times in _load_time_collectors:
+        load_times[resolved_path] = times
 
     return epyqlib.attrsmodel.Model(
         root=root,
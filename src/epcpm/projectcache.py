@@ -0,0 +1,159 @@
+import copyreg
+import hashlib
+import os
+import pickle
+
+import attr
+import epyqlib
+import epyqlib.attrsmodel
+import graham
+import epyqlib.pm.parametermodel
+import epyqlib.treenode
+
+import epcpm
+import epcpm.canmodel
+import epcpm.sunspecmodel
+
+
+directory_name = ".pm-cache"
+format_version = 1
+pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+
+def root_types():
+    return {
+        "parameters": epyqlib.pm.parametermodel.Root,
+        "can": epcpm.canmodel.Root,
+        "sunspec": epcpm.sunspecmodel.Root,
+    }
+
+
+def root_type(name):
+    return root_types()[name]
+
+
+def root_name(type_):
+    (name,) = (name for name, t in root_types().items() if t is type_)
+
+    return name
+
+
+def cache_directory(project_path):
+    return project_path.parent / directory_name
+
+
+def cache_path(project_path, name):
+    return cache_directory(project_path) / f"{name}.pickle"
+
+
+def cache_key(name, content):
+    return {
+        "format": format_version,
+        "epcpm": epcpm.__version__,
+        "epyqlib": epyqlib.__version__,
+        "model": name,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+# The same values graham would pass when deserializing, including references
+# as UUIDs.  Node initializers may link references so they are re-resolved
+# after loading just like after a normal load.
+def serialized_values(node):
+    values = {}
+
+    for field in attr.fields(type(node)):
+        metadata = field.metadata.get(graham.core.metadata_key)
+        if metadata is None:
+            continue
+
+        value = getattr(node, field.name)
+        if isinstance(metadata.field, epyqlib.attrsmodel.Reference):
+            value = getattr(value, "uuid", value)
+
+        values[field.name] = value
+
+    return values
+
+
+def rebuild_node(cls, values):
+    return cls(**values)
+
+
+def rebuild_root(name, values):
+    return rebuild_node(cls=root_type(name), values=values)
+
+
+def reduce_node(node):
+    return rebuild_node, (type(node), serialized_values(node))
+
+
+def reduce_root(node):
+    return rebuild_root, (root_name(type(node)), serialized_values(node))
+
+
+def node_types(cls=epyqlib.treenode.TreeNode):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from node_types(subclass)
+
+
+def dispatch_table():
+    table = copyreg.dispatch_table.copy()
+
+    for type_ in node_types():
+        if attr.has(type_):
+            table[type_] = reduce_node
+
+    for type_ in root_types().values():
+        table[type_] = reduce_root
+
+    return table
+
+
+# Tree nodes carry Qt signal objects that can't be pickled so they are stored
+# as their serialized attrs field values and rebuilt.  The model roots are
+# classes created inside a factory function so they are referenced by name.
+class Pickler(pickle.Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.dispatch_table = dispatch_table()
+
+
+def load_root(project_path, name, content):
+    path = cache_path(project_path=project_path, name=name)
+
+    try:
+        with open(path, "rb") as f:
+            key = pickle.load(f)
+
+            if key != cache_key(name=name, content=content):
+                return None
+
+            return pickle.load(f)
+    except Exception:
+        # any unreadable or stale cache just means a normal load
+        return None
+
+
+def store_root(project_path, name, content, root):
+    path = cache_path(project_path=project_path, name=name)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        if not path.parent.exists():
+            path.parent.mkdir()
+            (path.parent / ".gitignore").write_text("*\n")
+
+        with open(temporary_path, "wb") as f:
+            pickle.dump(cache_key(name=name, content=content), f)
+            Pickler(f, protocol=pickle_protocol).dump(root)
+
+        os.replace(temporary_path, path)
+    except Exception:
+        # failing to write the cache just means a normal load next time
+        pass
+    finally:
+        if temporary_path.exists():
+            temporary_path.unlink()
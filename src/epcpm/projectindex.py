@@ -0,0 +1,216 @@
+import collections
+import types
+import uuid
+
+import attr
+
+import epyqlib.attrsmodel
+import epyqlib.pm.parametermodel
+
+import epcpm.canmodel
+import epcpm.sunspecmodel
+
+
+ccp_uuids = {
+    # CCP Response
+    uuid.UUID("39315d58-1ddb-48b9-960c-96e724c89da1"),
+    # CCP
+    uuid.UUID("983bdc5d-8d4e-4107-a0a0-983f0ab101ce"),
+}
+
+
+def node_path_string(node):
+    nodes = [node, *node.ancestors()][:-1]
+    names = [node.name for node in reversed(nodes)]
+
+    return " > ".join(names)
+
+
+class DuplicateMappingError(Exception):
+    @classmethod
+    def build(cls, duplicates):
+        lines = ["Parameters mapped to more than one CAN signal:"]
+
+        for parameter_uuid, signals in sorted(
+            duplicates.items(), key=lambda item: str(item[0])
+        ):
+            lines.append(f"    {parameter_uuid}")
+            lines.extend(
+                f"        {path}"
+                for path in sorted(node_path_string(signal) for signal in signals)
+            )
+
+        return cls("\n".join(lines))
+
+
+def can_signal_wanted(node):
+    return not any(ancestor.uuid in ccp_uuids for ancestor in node.ancestors())
+
+
+def is_parameter_query_signal(node):
+    parameter_query_parent = node.tree_parent.tree_parent
+
+    is_a_can_table = isinstance(
+        node.tree_parent.tree_parent,
+        epcpm.canmodel.CanTable,
+    )
+    if is_a_can_table:
+        parameter_query_parent = parameter_query_parent.tree_parent
+
+    return getattr(parameter_query_parent, "name", "") == "ParameterQuery"
+
+
+def frozen(d):
+    return types.MappingProxyType(d)
+
+
+@attr.s(frozen=True)
+class ProjectIndex:
+    # parameter uuid -> CAN signal, CCP signals excluded
+    parameter_to_can_signal = attr.ib()
+    # parameter uuid -> CAN signal in a ParameterQuery message
+    parameter_to_query_signal = attr.ib()
+    # parameter uuid -> SunSpec data point or bitfield member
+    parameter_to_sunspec_point = attr.ib()
+    # parameter uuid -> table repeating block point references
+    parameter_to_table_point_references = attr.ib()
+    # SunSpec point uuid -> owning SunSpec model
+    point_to_model = attr.ib()
+    # SunSpec block uuid -> {scale factor point uuid -> point}
+    block_scale_factors = attr.ib()
+    enumerations = attr.ib()
+
+    @classmethod
+    def from_models(cls, models):
+        def root(model):
+            return None if model is None else model.root
+
+        return cls.build(
+            parameters_root=root(models.parameters),
+            can_root=root(models.can),
+            sunspec_root=root(models.sunspec),
+        )
+
+    @classmethod
+    def build(cls, parameters_root=None, can_root=None, sunspec_root=None):
+        can_signals = collections.defaultdict(list)
+        enumerations = []
+
+        def collect_can(node, _):
+            if getattr(node, "parameter_uuid", None) is None:
+                return
+
+            if can_signal_wanted(node):
+                can_signals[node.parameter_uuid].append(node)
+
+        def collect_parameters(node, _):
+            is_enumeration = isinstance(
+                node,
+                (
+                    epyqlib.pm.parametermodel.Enumeration,
+                    epyqlib.pm.parametermodel.AccessLevels,
+                ),
+            )
+            if is_enumeration:
+                enumerations.append(node)
+
+        if can_root is not None:
+            can_root.traverse(call_this=collect_can, internal_nodes=True)
+
+        if parameters_root is not None:
+            parameters_root.traverse(
+                call_this=collect_parameters,
+                internal_nodes=True,
+            )
+
+        duplicates = {
+            parameter_uuid: signals
+            for parameter_uuid, signals in can_signals.items()
+            if len(signals) > 1
+        }
+        if len(duplicates) > 0:
+            raise DuplicateMappingError.build(duplicates=duplicates)
+
+        parameter_to_can_signal = {
+            parameter_uuid: signal for parameter_uuid, (signal,) in can_signals.items()
+        }
+
+        parameter_to_sunspec_point = {}
+        parameter_to_table_point_references = collections.defaultdict(list)
+        point_to_model = {}
+        block_scale_factors = collections.defaultdict(dict)
+
+        if sunspec_root is not None:
+            type_names = {}
+
+            def type_name(type_uuid):
+                if type_uuid not in type_names:
+                    try:
+                        type_node = sunspec_root.model.node_from_uuid(type_uuid)
+                    except epyqlib.attrsmodel.NotFoundError:
+                        type_node = None
+
+                    type_names[type_uuid] = getattr(type_node, "name", None)
+
+                return type_names[type_uuid]
+
+            def collect_sunspec(node, model):
+                if isinstance(node, epcpm.sunspecmodel.Model):
+                    model = node
+                elif isinstance(node, epcpm.sunspecmodel.Table):
+                    model = None
+
+                if model is not None:
+                    point_to_model[node.uuid] = model
+
+                type_uuid = getattr(node, "type_uuid", None)
+                if type_uuid is not None and type_name(type_uuid) == "sunssf":
+                    block_scale_factors[node.tree_parent.uuid][node.uuid] = node
+
+                if getattr(node, "parameter_uuid", None) is not None:
+                    wanted_types = (
+                        epcpm.sunspecmodel.DataPoint,
+                        epcpm.sunspecmodel.DataPointBitfieldMember,
+                    )
+                    if isinstance(node, wanted_types):
+                        parameter_to_sunspec_point[node.parameter_uuid] = node
+
+                    reference_type = (
+                        epcpm.sunspecmodel.TableRepeatingBlockReferenceDataPointReference
+                    )
+                    if isinstance(node, reference_type):
+                        references = parameter_to_table_point_references
+                        references[node.parameter_uuid].append(node)
+
+                for child in node.children:
+                    collect_sunspec(child, model)
+
+            collect_sunspec(sunspec_root, None)
+
+        return cls(
+            parameter_to_can_signal=frozen(parameter_to_can_signal),
+            parameter_to_query_signal=frozen(
+                {
+                    parameter_uuid: signal
+                    for parameter_uuid, signal in parameter_to_can_signal.items()
+                    if is_parameter_query_signal(signal)
+                }
+            ),
+            parameter_to_sunspec_point=frozen(parameter_to_sunspec_point),
+            parameter_to_table_point_references=frozen(
+                {
+                    parameter_uuid: tuple(references)
+                    for parameter_uuid, references in (
+                        parameter_to_table_point_references.items()
+                    )
+                }
+            ),
+            point_to_model=frozen(point_to_model),
+            block_scale_factors=frozen(
+                {
+                    block_uuid: frozen(scale_factors)
+                    for block_uuid, scale_factors in block_scale_factors.items()
+                }
+            ),
+            enumerations=tuple(enumerations),
+        )
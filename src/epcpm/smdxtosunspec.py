@@ -1,5 +1,7 @@
 import collections
+import concurrent.futures
 import contextlib
+import itertools
 import os
 
 import attr
@@ -207,34 +209,120 @@ class GetSetKey:
     get_set = attr.ib()
 
 
-def import_get_set(path):
-    workbook = openpyxl.load_workbook(path)
+class GetSetColumnsError(Exception):
+    @classmethod
+    def build(cls, path, title, missing):
+        columns = ", ".join(repr(column) for column in missing)
+        message = f"Sheet {title!r} of {os.fspath(path)} has no {columns} column"
+
+        return cls(message)
+
+
+get_set_columns = ("Name", "get", "set")
 
-    collected = {}
 
-    for sheet in workbook.worksheets:
+def model_sheet_titles(workbook):
+    """The titles of the sheets holding a SunSpec model, keyed by the model
+    id their title is."""
+    titles = {}
+
+    for title in workbook.sheetnames:
         try:
-            model = int(sheet.title)
+            model = int(title)
         except ValueError:
             continue
 
-        iter_rows = iter(sheet.rows)
+        titles[model] = title
+
+    return titles
+
+
+def sheet_values(sheet):
+    for row in sheet.iter_rows():
+        yield [cell.value for cell in row]
 
-        column_indexes = {cell.value: i for i, cell in enumerate(next(iter_rows))}
 
-        for row in iter_rows:
-            for get_set in ("get", "set"):
-                value = row[column_indexes[get_set]].value
+def sheet_get_set(path, title, model, rows):
+    rows = iter(rows)
 
-                if value in (None, ""):
-                    continue
+    column_indexes = {value: i for i, value in enumerate(next(rows, ()))}
+
+    missing = [column for column in get_set_columns if column not in column_indexes]
+    if len(missing) > 0:
+        raise GetSetColumnsError.build(path=path, title=title, missing=missing)
+
+    name_index = column_indexes["Name"]
+    get_set_indexes = [(get_set, column_indexes[get_set]) for get_set in ("get", "set")]
+
+    collected = {}
+
+    for row in rows:
+        for get_set, index in get_set_indexes:
+            value = row[index] if index < len(row) else None
+
+            if value in (None, ""):
+                continue
+
+            key = GetSetKey(
+                model=model,
+                name=row[name_index] if name_index < len(row) else None,
+                get_set=get_set,
+            )
+            collected[key] = value
 
-                name = row[column_indexes["Name"]].value
-                key = GetSetKey(
+    return collected
+
+
+def _import_sheet_get_set(path, title, model):
+    workbook = openpyxl.load_workbook(path, read_only=True)
+
+    try:
+        return sheet_get_set(
+            path=path,
+            title=title,
+            model=model,
+            rows=sheet_values(workbook[title]),
+        )
+    finally:
+        workbook.close()
+
+
+def import_get_set(path, jobs=1):
+    """Collect the get and set accessors of each point from the spreadsheet.
+    The sheets are streamed read only and, with more than one job, read in
+    separate processes."""
+    workbook = openpyxl.load_workbook(path, read_only=True)
+
+    try:
+        titles = model_sheet_titles(workbook)
+
+        if jobs == 1 or len(titles) <= 1:
+            results = [
+                sheet_get_set(
+                    path=path,
+                    title=title,
                     model=model,
-                    name=name,
-                    get_set=get_set,
+                    rows=sheet_values(workbook[title]),
                 )
-                collected[key] = value
+                for model, title in titles.items()
+            ]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _import_sheet_get_set,
+                        itertools.repeat(path),
+                        titles.values(),
+                        titles.keys(),
+                    )
+                )
+    finally:
+        workbook.close()
+
+    collected = {}
+    for result in results:
+        collected.update(result)
 
     return collected
@@ -1219,6 +1219,15 @@ Root = epyqlib.attrsmodel.Root(
 )
 
 
+def root_or_empty(model, skip_sunspec):
+    """The model's root and UUID lookup, or an empty root when SunSpec is
+    skipped so that the model need not have been loaded."""
+    if skip_sunspec:
+        return Root(), None
+
+    return model.root, model.node_from_uuid
+
+
 types = epyqlib.attrsmodel.Types(
     types=(
         Root,
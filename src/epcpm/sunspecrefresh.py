@@ -0,0 +1,133 @@
+import epcpm.sunspecmodel
+import epcpm.sunspectoxlsx
+
+
+block_names = {
+    epcpm.sunspecmodel.HeaderBlock: "Header",
+    epcpm.sunspecmodel.FixedBlock: "Fixed",
+}
+
+
+def block_getters(
+    block,
+    model_id,
+    parameter_uuid_finder,
+    index,
+    power_of_ten_scaling=False,
+):
+    """The getters of the block's points as the spreadsheet's get column
+    would hold them, but with their scale factor getter kept apart.  They
+    are grouped by scale factor, in order of each one's first point."""
+    context = epcpm.sunspectoxlsx.Context(
+        column_filter=None,
+        parameter_uuid_finder=parameter_uuid_finder,
+        index=index,
+        getters=[],
+        power_of_ten_scaling=power_of_ten_scaling,
+    )
+
+    epcpm.sunspectoxlsx.handlers.gen(
+        node=block,
+        context=context,
+        add_padding=False,
+        model_type=None,
+        model_id=model_id,
+        model_offset=0,
+        address_offset=0,
+    )
+
+    groups = {}
+    for getter in context.getters:
+        groups.setdefault(getter.scale_factor_getter, []).append(getter)
+
+    return [getter for group in groups.values() for getter in group]
+
+
+def scale_factor_calls(getters):
+    scale_factor_getters = dict.fromkeys(
+        getter.scale_factor_getter
+        for getter in getters
+        if getter.scale_factor_getter is not None
+    )
+
+    return [f"{name}();" for name in scale_factor_getters]
+
+
+def refresh_code(
+    sunspec_root,
+    parameter_uuid_finder,
+    index,
+    power_of_ten_scaling=False,
+):
+    """C definitions and declarations of a refresh function for each model
+    and each of its header and fixed blocks.  Each updates every distinct
+    scale factor once and then fills all the points rather than each point's
+    getter updating its scale factor again.  Table blocks are filled per
+    curve and are left out."""
+    c = []
+    h = []
+
+    models = sorted(
+        (
+            child
+            for child in sunspec_root.children
+            if isinstance(child, epcpm.sunspecmodel.Model)
+        ),
+        key=lambda model: model.id,
+    )
+
+    for model in models:
+        model_name = f"refreshSunspecModel{model.id}"
+        model_getters = []
+        fill_calls = []
+
+        for block in model.children:
+            block_name = block_names.get(type(block))
+            if block_name is None:
+                continue
+
+            getters = block_getters(
+                block=block,
+                model_id=model.id,
+                parameter_uuid_finder=parameter_uuid_finder,
+                index=index,
+                power_of_ten_scaling=power_of_ten_scaling,
+            )
+            if len(getters) == 0:
+                continue
+
+            fill_name = f"fillSunspecModel{model.id}_{block_name}"
+            model_getters.extend(getters)
+            fill_calls.append(f"{fill_name}();")
+
+            c.extend(
+                [
+                    "",
+                    f"static void {fill_name}(void)",
+                    "{",
+                    [line for getter in getters for line in getter.lines],
+                    "}",
+                    "",
+                    f"void {model_name}_{block_name}(void)",
+                    "{",
+                    [*scale_factor_calls(getters), f"{fill_name}();"],
+                    "}",
+                ]
+            )
+            h.append(f"void {model_name}_{block_name}(void);")
+
+        if len(fill_calls) == 0:
+            continue
+
+        c.extend(
+            [
+                "",
+                f"void {model_name}(void)",
+                "{",
+                [*scale_factor_calls(model_getters), *fill_calls],
+                "}",
+            ]
+        )
+        h.append(f"void {model_name}(void);")
+
+    return c, h
@@ -0,0 +1,125 @@
+minimum_exponent = -20
+maximum_exponent = 20
+
+
+class ExponentRangeError(Exception):
+    @classmethod
+    def build(cls, exponent):
+        return cls(
+            f"Power of ten exponent {exponent} is outside of"
+            f" {minimum_exponent}..{maximum_exponent}"
+        )
+
+
+def constant_scale_factor(parameter):
+    """The value of a scale factor parameter limited to a single value, or
+    None when it can change at runtime."""
+    if parameter.minimum is None or parameter.minimum != parameter.maximum:
+        return None
+
+    return int(parameter.minimum)
+
+
+def multiplier(exponent):
+    if not minimum_exponent <= exponent <= maximum_exponent:
+        raise ExponentRangeError.build(exponent=exponent)
+
+    return f"1e{exponent}f"
+
+
+def exponent_expression(scale_factor_variable, internal_scale, factor_operator):
+    if factor_operator == "*":
+        if internal_scale == 0:
+            return scale_factor_variable
+
+        if internal_scale < 0:
+            return f"{scale_factor_variable} - {-internal_scale}"
+
+        return f"{scale_factor_variable} + {internal_scale}"
+
+    if internal_scale == 0:
+        return f"-{scale_factor_variable}"
+
+    return f"{-internal_scale} - {scale_factor_variable}"
+
+
+def scaled(value, scale_factor_variable, internal_scale, factor_operator):
+    exponent = exponent_expression(
+        scale_factor_variable=scale_factor_variable,
+        internal_scale=internal_scale,
+        factor_operator=factor_operator,
+    )
+
+    return f"(({value}) * SUNSPEC_POWER_OF_TEN({exponent}))"
+
+
+def constant_scaled(value, scale_factor, internal_scale, factor_operator):
+    exponent = scale_factor + internal_scale
+    if factor_operator == "/":
+        exponent = -exponent
+
+    if exponent == 0:
+        return f"({value})"
+
+    return f"(({value}) * {multiplier(exponent)})"
+
+
+def power_of_ten_code():
+    """C definition and declarations of the table of powers of ten looked up
+    by SUNSPEC_POWER_OF_TEN() in place of computing sunspecScale() on each
+    access.  Runtime scale factors can take the exponent outside of the
+    table so those are checked for and computed instead."""
+    exponents = range(minimum_exponent, maximum_exponent + 1)
+
+    c = [
+        "",
+        "float const sunspecPowersOfTen[SUNSPEC_POWERS_OF_TEN_COUNT] = {",
+        [f"1e{exponent}f," for exponent in exponents],
+        "};",
+        "",
+        "float sunspecPowerOfTenComputed(int32_t exponent)",
+        "{",
+        [
+            "float power = 1.0f;",
+            "",
+            "for (; exponent > 0; exponent--)",
+            "{",
+            ["power *= 10.0f;"],
+            "}",
+            "",
+            "for (; exponent < 0; exponent++)",
+            "{",
+            ["power /= 10.0f;"],
+            "}",
+            "",
+            "return power;",
+        ],
+        "}",
+    ]
+
+    h = [
+        "",
+        f"#define SUNSPEC_POWERS_OF_TEN_COUNT ({len(exponents)})",
+        f"#define SUNSPEC_POWER_OF_TEN_OFFSET ({-minimum_exponent})",
+        "extern float const sunspecPowersOfTen[SUNSPEC_POWERS_OF_TEN_COUNT];",
+        "",
+        "float sunspecPowerOfTenComputed(int32_t exponent);",
+        "",
+        "static inline float sunspecPowerOfTen(int32_t exponent)",
+        "{",
+        [
+            "int32_t const index = exponent + SUNSPEC_POWER_OF_TEN_OFFSET;",
+            "",
+            "if (index < 0 || index >= SUNSPEC_POWERS_OF_TEN_COUNT)",
+            "{",
+            ["return sunspecPowerOfTenComputed(exponent);"],
+            "}",
+            "",
+            "return sunspecPowersOfTen[index];",
+        ],
+        "}",
+        "",
+        "#define SUNSPEC_POWER_OF_TEN(exponent) (sunspecPowerOfTen(exponent))",
+    ]
+
+    return c, h
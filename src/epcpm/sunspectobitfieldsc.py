@@ -1,6 +1,7 @@
 import attr
 
 import epcpm.c
+import epcpm.dispatch
 import epcpm.parameterstointerface
 import epcpm.sunspecmodel
 import epcpm.sunspectoxlsx
@@ -8,12 +9,24 @@ import epyqlib.utils.general
 
 
 builders = epyqlib.utils.general.TypeMap()
+handlers = epcpm.dispatch.Dispatcher()
 
 
-def export(c_path, h_path, sunspec_model, include_uuid_in_item):
+@attr.s
+class Context:
+    parameter_uuid_finder = attr.ib()
+    include_uuid_in_item = attr.ib()
+
+
+def export(c_path, h_path, sunspec_model, include_uuid_in_item, skip_sunspec=False):
+    wrapped, parameter_uuid_finder = epcpm.sunspecmodel.root_or_empty(
+        model=sunspec_model,
+        skip_sunspec=skip_sunspec,
+    )
+
     builder = builders.wrap(
-        wrapped=sunspec_model.root,
-        parameter_uuid_finder=sunspec_model.node_from_uuid,
+        wrapped=wrapped,
+        parameter_uuid_finder=parameter_uuid_finder,
         c_path=c_path,
         h_path=h_path,
         include_uuid_in_item=include_uuid_in_item,
@@ -23,19 +36,16 @@ def export(c_path, h_path, sunspec_model, include_uuid_in_item):
     builder.gen()
 
 
-def gen(self, first=0):
+@handlers(epcpm.sunspecmodel.HeaderBlock, epcpm.sunspecmodel.FixedBlock)
+def children(context, node, first=0):
     lines = [[], []]
 
-    for member in self.wrapped.children[first:]:
+    for member in node.children[first:]:
         try:
-            builder = builders.wrap(
-                wrapped=member,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-                include_uuid_in_item=self.include_uuid_in_item,
-            )
+            handler = handlers[type(member)]
         except KeyError:
             continue
-        new_lines = builder.gen()
+        new_lines = handler(context, member)
         for ch_lines, ch_new_lines in zip(lines, new_lines):
             if len(ch_new_lines) > 0:
                 ch_lines.extend(ch_new_lines)
@@ -64,6 +74,11 @@ class Root:
             "",
         ]
 
+        context = Context(
+            parameter_uuid_finder=self.parameter_uuid_finder,
+            include_uuid_in_item=self.include_uuid_in_item,
+        )
+
         include_guard = self.h_path.name.replace(".", "_").upper()
 
         h_lines = [
@@ -75,136 +90,108 @@ class Root:
             f"",
         ]
 
-        for member in self.wrapped.children:
-            try:
-                builder = builders.wrap(
-                    wrapped=member,
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                    include_uuid_in_item=self.include_uuid_in_item,
-                )
-            except KeyError:
-                continue
-            more_c_lines, more_h_lines = builder.gen()
-            c_lines.extend(more_c_lines)
-            h_lines.extend(more_h_lines)
-
-        h_lines.append("#endif")
-
-        with self.c_path.open("w", newline="\n") as f:
-            f.write(epcpm.c.format_nested_lists(c_lines).strip() + "\n")
-
-        with self.h_path.open("w", newline="\n") as f:
-            f.write(epcpm.c.format_nested_lists(h_lines).strip() + "\n")
+        with epcpm.c.emit_file(path=self.c_path) as c:
+            with epcpm.c.emit_file(path=self.h_path) as h:
+                c.lines(c_lines)
+                h.lines(h_lines)
 
+                for member in self.wrapped.children:
+                    try:
+                        handler = handlers[type(member)]
+                    except KeyError:
+                        continue
+                    more_c_lines, more_h_lines = handler(context, member)
+                    c.lines(more_c_lines)
+                    h.lines(more_h_lines)
 
-@builders(epcpm.sunspecmodel.Model)
-@attr.s
-class SunSpecModel:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    include_uuid_in_item = attr.ib()
-
-    def gen(self):
-        return gen(self=self, first=1)
-
-
-@builders(epcpm.sunspecmodel.HeaderBlock)
-@builders(epcpm.sunspecmodel.FixedBlock)
-@attr.s
-class Block:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    include_uuid_in_item = attr.ib()
+                h.line("#endif")
 
-    gen = gen
 
+@handlers(epcpm.sunspecmodel.Model)
+def model(context, model):
+    return children(context=context, node=model, first=1)
 
-@builders(epcpm.sunspecmodel.DataPointBitfield)
-@attr.s
-class DataPointBitfield:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    include_uuid_in_item = attr.ib()
 
-    def gen(self):
-        # TODO: CAMPid 07954360685417610543064316843160
+@handlers(epcpm.sunspecmodel.DataPointBitfield)
+def data_point_bitfield(context, bitfield):
+    # TODO: CAMPid 07954360685417610543064316843160
 
-        bits_per_modbus_register = 16
-        bit_length = bits_per_modbus_register * self.wrapped.size
+    bits_per_modbus_register = 16
+    bit_length = bits_per_modbus_register * bitfield.size
 
-        name_uuid = str(self.wrapped.parameter_uuid).replace("-", "_")
+    name_uuid = str(bitfield.parameter_uuid).replace("-", "_")
 
-        members = self.wrapped.children
+    members = bitfield.children
 
-        array_name = f"sunspecBitfieldItems_{name_uuid}"
-        model = self.wrapped.tree_parent.tree_parent.id
+    array_name = f"sunspecBitfieldItems_{name_uuid}"
+    model = bitfield.tree_parent.tree_parent.id
 
-        parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
+    parameter = context.parameter_uuid_finder(bitfield.parameter_uuid)
 
-        c_lines = []
-        h_lines = []
+    c_lines = []
+    h_lines = []
 
-        for member in members:
-            member_name_uuid = str(member.parameter_uuid).replace("-", "_")
-            variable_name = f"interfaceItem_variable_{member_name_uuid}"
-            variable_type = epcpm.parameterstointerface.sunspec_types[
-                self.parameter_uuid_finder(member.type_uuid).name
-            ]
+    for member in members:
+        member_name_uuid = str(member.parameter_uuid).replace("-", "_")
+        variable_name = f"interfaceItem_variable_{member_name_uuid}"
+        variable_type = epcpm.parameterstointerface.sunspec_types[
+            context.parameter_uuid_finder(member.type_uuid).name
+        ]
 
-            h_lines.append(
-                f"extern {variable_type} {variable_name};",
-            )
+        h_lines.append(
+            f"extern {variable_type} {variable_name};",
+        )
 
-            # TODO: initializer that doesn't assume int16_t
-            c_lines.append(
-                f"{variable_type} {variable_name} = 0;",
-            )
+        # TODO: initializer that doesn't assume int16_t
+        c_lines.append(
+            f"{variable_type} {variable_name} = 0;",
+        )
 
-        c_lines.append("")
-        h_lines.append("")
+    c_lines.append("")
+    h_lines.append("")
 
-        c_lines.extend(
+    c_lines.extend(
+        [
+            f"InterfaceItem_BitfieldMember {array_name}[{len(members)}] = {{",
             [
-                f"InterfaceItem_BitfieldMember {array_name}[{len(members)}] = {{",
                 [
+                    f"[{i}] = {{",
                     [
-                        f"[{i}] = {{",
-                        [
-                            f".offset = {member.bit_offset},",
-                            f".length = {member.bit_length},",
-                            f'.item = &interfaceItem_{str(member.parameter_uuid).replace("-", "_")},',
-                        ],
-                        f"}},",
-                    ]
-                    for i, member in enumerate(members)
-                ],
-                f"}};",
-                f"",
-                f"InterfaceItem_Bitfield interfaceItem_{name_uuid} = {{",
-                [
-                    f".common = {{",
-                    [  # TODO: generate a real complete common initializer
-                        f".sunspec = {{",
-                        [
-                            f".getter = InterfaceItem_bitfield_{bit_length}_getter,",
-                            f".setter = InterfaceItem_bitfield_{bit_length}_setter,",
-                            f".variable = &sunspecInterface.model{model:05}.{parameter.abbreviation},",
-                        ],
-                        f"}},",
+                        f".offset = {member.bit_offset},",
+                        f".length = {member.bit_length},",
+                        f'.item = &interfaceItem_{str(member.parameter_uuid).replace("-", "_")},',
+                    ],
+                    f"}},",
+                ]
+                for i, member in enumerate(members)
+            ],
+            f"}};",
+            f"",
+            f"InterfaceItem_Bitfield interfaceItem_{name_uuid} = {{",
+            [
+                f".common = {{",
+                [  # TODO: generate a real complete common initializer
+                    f".sunspec = {{",
+                    [
+                        f".getter = InterfaceItem_bitfield_{bit_length}_getter,",
+                        f".setter = InterfaceItem_bitfield_{bit_length}_setter,",
+                        f".variable = &sunspecInterface.model{model:05}.{parameter.abbreviation},",
                     ],
                     f"}},",
-                    f".members = {array_name},",
-                    f".membersCount = {len(members)},",
                 ],
-                f"}};",
-            ]
-        )
+                f"}},",
+                f".members = {array_name},",
+                f".membersCount = {len(members)},",
+            ],
+            f"}};",
+        ]
+    )
 
-        h_lines.extend(
-            [
-                f"extern InterfaceItem_BitfieldMember {array_name}[{len(members)}];",
-                f"extern InterfaceItem_Bitfield interfaceItem_{name_uuid};",
-            ]
-        )
+    h_lines.extend(
+        [
+            f"extern InterfaceItem_BitfieldMember {array_name}[{len(members)}];",
+            f"extern InterfaceItem_Bitfield interfaceItem_{name_uuid};",
+        ]
+    )
 
-        return c_lines, h_lines
+    return c_lines, h_lines
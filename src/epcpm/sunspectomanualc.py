@@ -64,8 +64,9 @@ class Root:
                 "",
             ]
             lines.extend(builder.gen())
-            with path.open("w", newline="\n") as f:
-                f.write(epcpm.c.format_nested_lists(lines).strip() + "\n")
+
+            with epcpm.c.emit_file(path=path) as emitter:
+                emitter.lines(lines)
 
 
 @builders(epcpm.sunspecmodel.Model)
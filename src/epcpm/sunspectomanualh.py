@@ -58,8 +58,8 @@ class Root:
                 f"#endif //{inc_guard}",
             ]
 
-            with path.open("w", newline="\n") as f:
-                f.write(epcpm.c.format_nested_lists(lines).strip() + "\n")
+            with epcpm.c.emit_file(path=path) as emitter:
+                emitter.lines(lines)
 
 
 @builders(epcpm.sunspecmodel.Model)
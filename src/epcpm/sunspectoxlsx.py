@@ -1,5 +1,7 @@
+import concurrent.futures
 import itertools
-import math
+import json
+import multiprocessing
 
 import attr
 import openpyxl
@@ -8,12 +10,17 @@ import epyqlib.pm.parametermodel
 import epyqlib.utils.general
 
 import epcpm.c
+import epcpm.dispatch
+import epcpm.output
+import epcpm.projectindex
 import epcpm.sunspecmodel
+import epcpm.sunspecscale
 
 
 builders = epyqlib.utils.general.TypeMap()
-enumeration_builders = epyqlib.utils.general.TypeMap()
-enumerator_builders = epyqlib.utils.general.TypeMap()
+handlers = epcpm.dispatch.Dispatcher()
+enumeration_handlers = epcpm.dispatch.Dispatcher()
+enumerator_handlers = epcpm.dispatch.Dispatcher()
 
 
 data_point_fields = attr.fields(epcpm.sunspecmodel.DataPoint)
@@ -102,24 +109,170 @@ enumerator_fields = Fields(
 )
 
 
+register_map_format_version = 1
+
+# register map keys and the row fields they hold
+register_map_fields = {
+    "address": "modbus_address",
+    "offset": "address_offset",
+    "size": "size",
+    "name": "name",
+    "type": "type",
+    "scale_factor": "scale_factor",
+    "get": "get",
+    "set": "set",
+    "item": "item",
+}
+
+register_map_filter = Fields(
+    **{
+        field.name: field.name in register_map_fields.values()
+        for field in attr.fields(Fields)
+        if field.init
+    }
+)
+
+
+@attr.s
+class Context:
+    column_filter = attr.ib()
+    parameter_uuid_finder = attr.ib(default=None)
+    index = attr.ib(default=None)
+    padding_type = attr.ib(default=None)
+    getters = attr.ib(default=None)
+    # scale by epcpm.sunspecscale's table rather than sunspecScale()
+    power_of_ten_scaling = attr.ib(default=False)
+
+    def generates_code(self):
+        """Whether the get and set C snippets are wanted, either as columns or
+        collected as getters."""
+        if self.getters is not None or self.column_filter is None:
+            return True
+
+        return bool(self.column_filter.get or self.column_filter.set)
+
+
+def combined_filter(column_filters):
+    """A column filter keeping every column that any of the filters keeps."""
+    return Fields(
+        **{
+            field.name: any(getattr(f, field.name) for f in column_filters)
+            for field in attr.fields(Fields)
+            if field.init
+        }
+    )
+
+
+@attr.s(frozen=True)
+class Getter:
+    scale_factor_getter = attr.ib()
+    lines = attr.ib()
+
+
 def export(
-    path, sunspec_model, parameters_model, column_filter=None, skip_sunspec=False
+    path,
+    sunspec_model,
+    parameters_model,
+    column_filter=None,
+    skip_sunspec=False,
+    index=None,
+    power_of_ten_scaling=False,
+    register_map=None,
+    jobs=1,
 ):
     if column_filter is None:
         column_filter = attr_fill(Fields, True)
 
+    export_many(
+        destinations=[(path, column_filter)],
+        sunspec_model=sunspec_model,
+        parameters_model=parameters_model,
+        skip_sunspec=skip_sunspec,
+        index=index,
+        power_of_ten_scaling=power_of_ten_scaling,
+        register_map=register_map,
+        jobs=jobs,
+    )
+
+
+def export_many(
+    destinations,
+    sunspec_model,
+    parameters_model,
+    skip_sunspec=False,
+    index=None,
+    power_of_ten_scaling=False,
+    register_map=None,
+    jobs=1,
+):
+    """Write a workbook for each of the destinations, pairs of a path and a
+    column filter, from a single build of the rows.  The register map of the
+    points is also written as JSON to the `register_map` path if given.
+    The SunSpec model need not be loaded when skipping SunSpec."""
+    paths, column_filters = zip(*destinations)
+
+    wrapped, parameter_uuid_finder = epcpm.sunspecmodel.root_or_empty(
+        model=sunspec_model,
+        skip_sunspec=skip_sunspec,
+    )
+
     builder = epcpm.sunspectoxlsx.builders.wrap(
-        wrapped=sunspec_model.root,
-        parameter_uuid_finder=sunspec_model.node_from_uuid,
+        wrapped=wrapped,
+        parameter_uuid_finder=parameter_uuid_finder,
         parameter_model=parameters_model,
         skip_sunspec=skip_sunspec,
-        column_filter=column_filter,
+        column_filter=None,
+        index=index,
+        power_of_ten_scaling=power_of_ten_scaling,
+        write_only=True,
+        jobs=jobs,
+    )
+
+    if register_map is None:
+        models = None
+    else:
+        models = []
+
+    workbooks = builder.gen_workbooks(
+        column_filters=column_filters,
+        register_map=models,
     )
 
-    workbook = builder.gen()
+    for path, workbook in zip(paths, workbooks):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        epcpm.output.write_workbook(path=path, workbook=workbook)
+
+    if register_map is not None:
+        write_register_map(path=register_map, models=models)
 
+
+def register_map_path(path):
+    return path.with_suffix(".registers.json")
+
+
+def register_map_model(model_id, rows):
+    """The model's entry in the register map, holding each of its points
+    with the fields of `register_map_fields`."""
+    return {
+        "id": model_id,
+        "points": [
+            {key: getattr(row, name) for key, name in register_map_fields.items()}
+            for row in rows
+            if row.modbus_address is not None
+        ],
+    }
+
+
+def write_register_map(path, models):
+    """Write the register layout the spreadsheet holds as JSON so that host
+    tools need not read it back out of the workbook."""
+    s = json.dumps(
+        {"version": register_map_format_version, "models": models},
+        indent=4,
+        sort_keys=True,
+    )
     path.parent.mkdir(parents=True, exist_ok=True)
-    workbook.save(path)
+    epcpm.output.write_text(path=path, text=s + "\n")
 
 
 @builders(epcpm.sunspecmodel.Root)
@@ -130,849 +283,919 @@ class Root:
     skip_sunspec = attr.ib(default=False)
     parameter_uuid_finder = attr.ib(default=None)
     parameter_model = attr.ib(default=None)
+    index = attr.ib(default=None)
+    power_of_ten_scaling = attr.ib(default=False)
+    # stream the rows out rather than keeping every cell until saved, the
+    # workbook can then only be saved once and not read back
+    write_only = attr.ib(default=False)
+    # build the models' rows in this many worker processes
+    jobs = attr.ib(default=1)
 
     def gen(self):
-        workbook = openpyxl.Workbook()
-        workbook.remove(workbook.active)
+        (workbook,) = self.gen_workbooks(column_filters=[self.column_filter])
 
-        workbook.create_sheet("License Agreement")
-        workbook.create_sheet("Summary")
-        workbook.create_sheet("Index")
+        return workbook
 
-        if not self.skip_sunspec:
-            children = sorted(
-                self.wrapped.children,
-                key=lambda child: (
-                    0 if isinstance(child, epcpm.sunspecmodel.Model) else 1,
-                    getattr(child, "id", math.inf),
-                ),
+    def gen_workbooks(self, column_filters, register_map=None):
+        """Build a workbook for each of the column filters from one pass over
+        the models.  Columns none of the filters keep are not generated.  The
+        register map entry of each model is appended to `register_map` if
+        it is not None."""
+        index = self.index
+        if index is None:
+            index = epcpm.projectindex.ProjectIndex.build(
+                sunspec_root=self.wrapped,
             )
 
-            model_offset = 2  # account for starting 'SunS'
-            for model in children:
-                if isinstance(model, epcpm.sunspecmodel.Table):
-                    # TODO: for now, implement it soon...
-                    continue
-
-                worksheet = workbook.create_sheet()
-
-                model_offset += builders.wrap(
-                    wrapped=model,
-                    worksheet=worksheet,
-                    padding_type=self.parameter_model.list_selection_roots[
-                        "sunspec types"
-                    ].child_by_name("pad"),
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                    column_filter=self.column_filter,
-                    model_offset=model_offset,
-                ).gen()
-
-        return workbook
+        workbooks = []
+        for _ in column_filters:
+            workbook = openpyxl.Workbook(write_only=self.write_only)
+            if not self.write_only:
+                workbook.remove(workbook.active)
 
+            workbook.create_sheet("License Agreement")
+            workbook.create_sheet("Summary")
+            workbook.create_sheet("Index")
 
-@builders(epcpm.sunspecmodel.Model)
-@attr.s
-class Model:
-    wrapped = attr.ib()
-    worksheet = attr.ib()
-    padding_type = attr.ib()
-    column_filter = attr.ib()
-    model_offset = attr.ib()  # starting Modbus address for the model
-    parameter_uuid_finder = attr.ib(default=None)
+            workbooks.append(workbook)
 
-    def gen(self):
-        self.worksheet.title = str(self.wrapped.id)
-        self.worksheet.append(field_names.as_filtered_tuple(self.column_filter))
+        if not self.skip_sunspec:
+            try:
+                self.add_models(
+                    workbooks=workbooks,
+                    column_filters=column_filters,
+                    index=index,
+                    register_map=register_map,
+                )
+            except Exception:
+                # finish the partly streamed worksheets rather than leaving
+                # them to be finished noisily when collected
+                if self.write_only:
+                    for workbook in workbooks:
+                        for worksheet in workbook.worksheets:
+                            worksheet.close()
+
+                raise
+
+        return workbooks
+
+    def add_models(self, workbooks, column_filters, index, register_map=None):
+        # TODO: tables are left out for now, implement them soon...
+        models = sorted(
+            (
+                child
+                for child in self.wrapped.children
+                if isinstance(child, epcpm.sunspecmodel.Model)
+            ),
+            key=lambda model: model.id,
+        )
 
-        self.wrapped.children[0].check_offsets_and_length()
+        needed_filters = list(column_filters)
+        if register_map is not None:
+            needed_filters.append(register_map_filter)
 
-        overall_length = sum(
-            child.check_offsets_and_length() for child in self.wrapped.children[1:]
+        context = Context(
+            column_filter=combined_filter(needed_filters),
+            parameter_uuid_finder=self.parameter_uuid_finder,
+            index=index,
+            power_of_ten_scaling=self.power_of_ten_scaling,
         )
 
-        add_padding = (overall_length % 2) == 1
-        if add_padding:
-            overall_length += 1
+        if len(models) > 0:
+            context.padding_type = self.parameter_model.list_selection_roots[
+                "sunspec types"
+            ].child_by_name("pad")
 
-        accumulated_length = 0
+        for model, rows in self.model_rows(models, context):
+            if register_map is not None:
+                register_map.append(register_map_model(model_id=model.id, rows=rows))
 
-        rows = []
+            for workbook, column_filter in zip(workbooks, column_filters):
+                worksheet = workbook.create_sheet(str(model.id))
+                worksheet.append(field_names.as_filtered_tuple(column_filter))
 
-        model_types = ["Header", "Fixed Block", "Repeating Block"]
+                for row in rows:
+                    worksheet.append(row.as_filtered_tuple(column_filter))
 
-        zipped = zip(enumerate(self.wrapped.children), model_types)
-        for (i, child), model_type in zipped:
-            builder = builders.wrap(
-                wrapped=child,
-                add_padding=add_padding and i == 1,
-                padding_type=self.padding_type,
-                model_type=model_type,
-                model_id=self.wrapped.id,
-                model_offset=self.model_offset,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-                address_offset=accumulated_length,
-            )
+    def model_rows(self, models, context):
+        """Yield each model with its rows in order.  With more than one job the
+        models are built in forked worker processes since their offsets are
+        known up front."""
+        offsets = model_offsets(models)
 
-            built_rows, block_length = builder.gen()
-            accumulated_length += block_length
-            if len(built_rows) > 0:
-                rows.extend(built_rows)
-                rows.append(Fields())
+        parallel = (
+            self.jobs > 1
+            and len(models) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        )
+        if not parallel:
+            for model, model_offset in zip(models, offsets):
+                rows, length = handlers.gen(
+                    node=model,
+                    context=context,
+                    model_offset=model_offset,
+                )
 
-        for i, row in enumerate(rows):
-            if i == 0:
-                row.value = self.wrapped.id
-            elif i == 1:
-                row.value = overall_length
+                yield model, rows
 
-            self.worksheet.append(row.as_filtered_tuple(self.column_filter))
+            return
 
-        for block in self.wrapped.children:
-            builder = enumeration_builders.wrap(
-                wrapped=block,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            )
-            rows = builder.gen()
+        global _worker_models
+        global _worker_context
 
-            for row in rows:
-                self.worksheet.append(
-                    row.as_filtered_tuple(self.column_filter),
+        _worker_models = models
+        _worker_context = context
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.jobs,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                rows = executor.map(
+                    _build_model_rows,
+                    range(len(models)),
+                    offsets,
                 )
 
-        return overall_length + 2  # add header length
+                yield from zip(models, rows)
+        finally:
+            _worker_models = None
+            _worker_context = None
 
 
-@builders(epcpm.sunspecmodel.Table)
-@attr.s
-class Table:
-    wrapped = attr.ib()
-    worksheet = attr.ib()
-    padding_type = attr.ib()
-    column_filter = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+# Set in the parent before the worker pool is created so that forked workers
+# inherit the models and context rather than having them pickled to them.
+_worker_models = None
+_worker_context = None
 
-    def gen(self):
-        return []
 
+def _build_model_rows(model_index, model_offset):
+    rows, length = handlers.gen(
+        node=_worker_models[model_index],
+        context=_worker_context,
+        model_offset=model_offset,
+    )
 
-@enumeration_builders(epcpm.sunspecmodel.DataPoint)
-@attr.s
-class Enumeration:
-    wrapped = attr.ib()
-    point = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+    return rows
 
-    def gen(self):
-        rows = []
 
-        enumeration_uuid = getattr(self.wrapped, "enumeration_uuid", None)
-        if enumeration_uuid is None:
-            return rows
+def model_length(model):
+    """The length of the model's blocks after its header, padded to an even
+    length, and whether that padding was needed."""
+    model.children[0].check_offsets_and_length()
 
-        enumeration = self.parameter_uuid_finder(enumeration_uuid)
+    overall_length = sum(
+        child.check_offsets_and_length() for child in model.children[1:]
+    )
 
-        enumerators_by_bit = {
-            enumerator.value: enumerator for enumerator in enumeration.children
-        }
+    add_padding = (overall_length % 2) == 1
+    if add_padding:
+        overall_length += 1
 
-        # 16 bits per register
-        total_bit_count = self.wrapped.size * 16
-        decimal_digits = len(str(total_bit_count - 1))
-
-        for bit in range(total_bit_count):
-            enumerator = enumerators_by_bit.get(bit)
-            if enumerator is None:
-                padded_bit_string = f"{bit:0{decimal_digits}}"
-                enumerator = epyqlib.pm.parametermodel.SunSpecEnumerator(
-                    label=f"Reserved - {padded_bit_string}",
-                    name=f"Rsvd{padded_bit_string}",
-                    value=bit,
-                )
+    return overall_length, add_padding
 
-            builder = enumerator_builders.wrap(
-                wrapped=enumerator,
-                point=self.point,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            )
-            rows.append(builder.gen())
 
-        return rows
+def model_offsets(models):
+    offsets = []
 
+    model_offset = 2  # account for starting 'SunS'
+    for model in models:
+        offsets.append(model_offset)
 
-@enumerator_builders(epyqlib.pm.parametermodel.SunSpecEnumerator)
-@attr.s
-class Enumerator:
-    wrapped = attr.ib()
-    point = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+        overall_length, add_padding = model_length(model)
+        model_offset += overall_length + 2  # add header length
 
-    # TODO: CAMPid 07397546759269756456100183066795496952476951653
-    def gen(self):
-        row = Fields()
+    return offsets
 
-        for name, field in attr.asdict(enumerator_fields).items():
-            if field is None:
-                continue
 
-            setattr(row, name, getattr(self.wrapped, field.name))
+@handlers(epcpm.sunspecmodel.Model)
+def model(context, model, model_offset):
+    overall_length, add_padding = model_length(model)
 
-        if row.name is None:
-            row.name = self.wrapped.name
+    accumulated_length = 0
 
-        parameter = self.parameter_uuid_finder(self.point.parameter_uuid)
-        row.applicable_point = parameter.abbreviation
+    rows = []
 
-        field_type_parameter = self.parameter_uuid_finder(self.point.type_uuid)
-        row.field_type = field_type_parameter.name
+    model_types = ["Header", "Fixed Block", "Repeating Block"]
 
-        return row
+    zipped = zip(enumerate(model.children), model_types)
+    for (i, child), model_type in zipped:
+        built_rows, block_length = handlers.gen(
+            node=child,
+            context=context,
+            add_padding=add_padding and i == 1,
+            model_type=model_type,
+            model_id=model.id,
+            model_offset=model_offset,
+            address_offset=accumulated_length,
+        )
+        accumulated_length += block_length
+        if len(built_rows) > 0:
+            rows.extend(built_rows)
+            rows.append(Fields())
 
+    for i, row in enumerate(rows):
+        if i == 0:
+            row.value = model.id
+        elif i == 1:
+            row.value = overall_length
 
-def build_uuid_scale_factor_dict(points, parameter_uuid_finder):
-    scale_factor_from_uuid = {}
-    for point in points:
-        if point.type_uuid is None:
-            continue
+    for block in model.children:
+        rows.extend(enumeration_handlers.gen(node=block, context=context))
 
-        type_node = parameter_uuid_finder(point.type_uuid)
+    return rows, overall_length + 2  # add header length
 
-        if type_node is None:
-            continue
 
-        if type_node.name == "sunssf":
-            scale_factor_from_uuid[point.uuid] = point
+@handlers(epcpm.sunspecmodel.Table)
+def table(context, table, model_offset):
+    return [], 0
 
-    return scale_factor_from_uuid
 
+@enumeration_handlers(epcpm.sunspecmodel.DataPoint)
+def enumeration(context, data_point, point):
+    rows = []
 
-@builders(epcpm.sunspecmodel.TableRepeatingBlock)
-@builders(epcpm.sunspecmodel.HeaderBlock)
-@builders(epcpm.sunspecmodel.FixedBlock)
-@attr.s
-class Block:
-    wrapped = attr.ib()
-    add_padding = attr.ib()
-    padding_type = attr.ib()
-    model_type = attr.ib()
-    model_id = attr.ib()
-    model_offset = attr.ib()
-    address_offset = attr.ib()
-    repeating_block_reference = attr.ib(default=None)
-    parameter_uuid_finder = attr.ib(default=None)
-    is_table = attr.ib(default=False)
+    enumeration_uuid = getattr(data_point, "enumeration_uuid", None)
+    if enumeration_uuid is None:
+        return rows
 
-    def gen(self):
-        # TODO: CAMPid 07548795421667967542697543743987
+    enumeration = context.parameter_uuid_finder(enumeration_uuid)
 
-        scale_factor_from_uuid = build_uuid_scale_factor_dict(
-            points=self.wrapped.children,
-            parameter_uuid_finder=self.parameter_uuid_finder,
+    enumerators_by_bit = {
+        enumerator.value: enumerator for enumerator in enumeration.children
+    }
+
+    # 16 bits per register
+    total_bit_count = data_point.size * 16
+    decimal_digits = len(str(total_bit_count - 1))
+
+    for bit in range(total_bit_count):
+        enumerator = enumerators_by_bit.get(bit)
+        if enumerator is None:
+            padded_bit_string = f"{bit:0{decimal_digits}}"
+            enumerator = epyqlib.pm.parametermodel.SunSpecEnumerator(
+                label=f"Reserved - {padded_bit_string}",
+                name=f"Rsvd{padded_bit_string}",
+                value=bit,
+            )
+
+        rows.append(
+            enumerator_handlers.gen(node=enumerator, context=context, point=point),
         )
 
-        rows = []
+    return rows
 
-        points = list(self.wrapped.children)
 
-        if self.add_padding:
-            point = epcpm.sunspecmodel.DataPoint(
-                type_uuid=self.padding_type.uuid,
-                block_offset=(
-                    self.wrapped.children[-1].block_offset
-                    + self.wrapped.children[-1].size
-                ),
-                size=self.padding_type.value,
-            )
-            # TODO: ack!  just to get the address offset calculated but
-            #       not calling append_child() because i don't want to shove
-            #       this into the model.  :[
-            point.tree_parent = self.wrapped
-            points.append(point)
-
-        summed_increments = 0
-
-        for child in points:
-            builder = builders.wrap(
-                wrapped=child,
-                model_type=self.model_type,
-                scale_factor_from_uuid=scale_factor_from_uuid,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-                model_id=self.model_id,
-                model_offset=self.model_offset,
-                is_table=self.is_table,
-                repeating_block_reference=self.repeating_block_reference,
-                address_offset=self.address_offset + summed_increments,
-            )
-            built_rows, address_offset_increment = builder.gen()
-            summed_increments += address_offset_increment
-            rows.append(built_rows)
+@enumerator_handlers(epyqlib.pm.parametermodel.SunSpecEnumerator)
+def enumerator(context, enumerator, point):
+    row = Fields()
 
-        return rows, summed_increments
+    for name, field in attr.asdict(enumerator_fields).items():
+        if field is None:
+            continue
 
+        setattr(row, name, getattr(enumerator, field.name))
 
-@builders(epcpm.sunspecmodel.DataPointBitfield)
-@attr.s
-class DataPointBitfield:
-    wrapped = attr.ib()
-    model_type = attr.ib()
-    scale_factor_from_uuid = attr.ib()
-    parameter_uuid_finder = attr.ib()
-    model_id = attr.ib()
-    model_offset = attr.ib()
-    is_table = attr.ib()
-    repeating_block_reference = attr.ib()
-    address_offset = attr.ib()
+    if row.name is None:
+        row.name = enumerator.name
 
-    def gen(self):
-        row = Fields()
-        row.address_offset = self.address_offset
-        row.modbus_address = self.model_offset + self.address_offset
-        row.field_type = self.model_type
+    parameter = context.parameter_uuid_finder(point.parameter_uuid)
+    row.applicable_point = parameter.abbreviation
 
-        for name, field in attr.asdict(bitfield_fields).items():
-            if field is None:
-                continue
+    field_type_parameter = context.parameter_uuid_finder(point.type_uuid)
+    row.field_type = field_type_parameter.name
 
-            setattr(row, name, getattr(self.wrapped, field.name))
+    return row
 
-        if row.type is not None:
-            row.type = self.parameter_uuid_finder(row.type).name
 
-        if self.wrapped.parameter_uuid is not None:
-            parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
+@handlers(
+    epcpm.sunspecmodel.TableRepeatingBlock,
+    epcpm.sunspecmodel.HeaderBlock,
+    epcpm.sunspecmodel.FixedBlock,
+)
+def block(
+    context,
+    block,
+    add_padding,
+    model_type,
+    model_id,
+    model_offset,
+    address_offset,
+    repeating_block_reference=None,
+    is_table=False,
+):
+    # TODO: CAMPid 07548795421667967542697543743987
 
-            row.label = parameter.name
-            row.name = parameter.abbreviation
-            row.notes = "" if parameter.notes is None else parameter.notes
-            row.notes = f"{row.notes}  <uuid:{parameter.uuid}>".strip()
+    scale_factor_from_uuid = context.index.block_scale_factors.get(
+        block.uuid,
+        {},
+    )
 
-            if row.units is None:
-                row.units = parameter.units
-            row.description = parameter.comment
-            row.read_write = "R" if parameter.read_only else "RW"
+    rows = []
 
-        uses_interface_item = (
-            isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
-            and parameter.uses_interface_item()
+    points = list(block.children)
+
+    if add_padding:
+        point = epcpm.sunspecmodel.DataPoint(
+            type_uuid=context.padding_type.uuid,
+            block_offset=(block.children[-1].block_offset + block.children[-1].size),
+            size=context.padding_type.value,
+        )
+        # TODO: ack!  just to get the address offset calculated but
+        #       not calling append_child() because i don't want to shove
+        #       this into the model.  :[
+        point.tree_parent = block
+        points.append(point)
+
+    summed_increments = 0
+
+    for child in points:
+        built_rows, address_offset_increment = handlers.gen(
+            node=child,
+            context=context,
+            model_type=model_type,
+            scale_factor_from_uuid=scale_factor_from_uuid,
+            model_id=model_id,
+            model_offset=model_offset,
+            is_table=is_table,
+            repeating_block_reference=repeating_block_reference,
+            address_offset=address_offset + summed_increments,
         )
+        summed_increments += address_offset_increment
+        rows.append(built_rows)
+
+    return rows, summed_increments
+
+
+@handlers(epcpm.sunspecmodel.DataPointBitfield)
+def data_point_bitfield(
+    context,
+    bitfield,
+    scale_factor_from_uuid,
+    model_type,
+    model_id,
+    model_offset,
+    is_table,
+    address_offset,
+    repeating_block_reference,
+):
+    row = Fields()
+    row.address_offset = address_offset
+    row.modbus_address = model_offset + address_offset
+    row.field_type = model_type
+
+    for name, field in attr.asdict(bitfield_fields).items():
+        if field is None:
+            continue
 
-        getter = []
-        setter = []
+        setattr(row, name, getattr(bitfield, field.name))
 
-        # TODO: should we just require that it does and assume etc?
-        if uses_interface_item:
-            # TODO: CAMPid 9685439641536675431653179671436
-            parameter_uuid = str(parameter.uuid).replace("-", "_")
-            item_name = f"interfaceItem_{parameter_uuid}"
+    if row.type is not None:
+        row.type = context.parameter_uuid_finder(row.type).name
 
-            getter.extend(
-                [
-                    f"{item_name}.common.sunspec.getter(",
-                    [
-                        f"(InterfaceItem_void *) &{item_name},",
-                        f"Meta_Value",
-                    ],
-                    f");",
-                ]
-            )
-            setter.extend(
-                [
-                    f"{item_name}.common.sunspec.setter(",
-                    [
-                        f"(InterfaceItem_void *) &{item_name},",
-                        f"true,",
-                        f"Meta_Value",
-                    ],
-                    f");",
-                ]
-            )
+    if bitfield.parameter_uuid is not None:
+        parameter = context.parameter_uuid_finder(bitfield.parameter_uuid)
 
-        if len(getter) > 0:
-            # TODO: what if write-only?
-            row.get = epcpm.c.format_nested_lists(getter)
+        row.label = parameter.name
+        row.name = parameter.abbreviation
+        row.notes = "" if parameter.notes is None else parameter.notes
+        row.notes = f"{row.notes}  <uuid:{parameter.uuid}>".strip()
 
-        if not parameter.read_only:
-            row.set = epcpm.c.format_nested_lists(setter)
-        else:
-            row.set = None
+        if row.units is None:
+            row.units = parameter.units
+        row.description = parameter.comment
+        row.read_write = "R" if parameter.read_only else "RW"
+
+    uses_interface_item = (
+        isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
+        and parameter.uses_interface_item()
+    )
 
+    if not context.generates_code():
         return row, row.size
 
+    getter = []
+    setter = []
 
-@enumeration_builders(epcpm.sunspecmodel.DataPointBitfield)
-@attr.s
-class DataPointBitfield:
-    wrapped = attr.ib()
-    point = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+    # TODO: should we just require that it does and assume etc?
+    if uses_interface_item:
+        # TODO: CAMPid 9685439641536675431653179671436
+        parameter_uuid = str(parameter.uuid).replace("-", "_")
+        item_name = f"interfaceItem_{parameter_uuid}"
 
-    def gen(self):
-        rows = []
+        getter.extend(
+            [
+                f"{item_name}.common.sunspec.getter(",
+                [
+                    f"(InterfaceItem_void *) &{item_name},",
+                    f"Meta_Value",
+                ],
+                f");",
+            ]
+        )
+        setter.extend(
+            [
+                f"{item_name}.common.sunspec.setter(",
+                [
+                    f"(InterfaceItem_void *) &{item_name},",
+                    f"true,",
+                    f"Meta_Value",
+                ],
+                f");",
+            ]
+        )
 
-        # 16 bits per register
-        total_bit_count = self.wrapped.size * 16
-        decimal_digits = len(str(total_bit_count - 1))
+    if len(getter) > 0:
+        # TODO: what if write-only?
+        row.get = epcpm.c.format_nested_lists(getter)
 
-        enumerators_by_bit = {
-            enumerator.bit_offset
-            + i: [enumerator, i if enumerator.bit_length > 1 else None]
-            for enumerator in self.wrapped.children
-            for i in range(enumerator.bit_length)
-        }
+        if context.getters is not None:
+            context.getters.append(Getter(scale_factor_getter=None, lines=getter))
 
-        member_parameter = self.parameter_uuid_finder(
-            self.wrapped.parameter_uuid,
-        )
+    if not parameter.read_only:
+        row.set = epcpm.c.format_nested_lists(setter)
+    else:
+        row.set = None
 
-        for bit in range(total_bit_count):
-            enumerator, index = enumerators_by_bit.get(bit, [None, None])
-
-            if enumerator is None:
-                padded_bit_string = f"{bit:0{decimal_digits}}"
-                row = Fields(
-                    field_type=f"bitfield{total_bit_count}",
-                    value=bit,
-                    applicable_point=member_parameter.abbreviation,
-                    name=f"Rsvd{padded_bit_string}",
-                    label=f"Reserved - {padded_bit_string}",
-                )
-            else:
-                builder = enumerator_builders.wrap(
-                    wrapped=enumerator,
-                    point=self.point,
-                    parameter_uuid_finder=self.parameter_uuid_finder,
-                )
-                row = builder.gen()
+    return row, row.size
 
-                if index is not None:
-                    padded_index_string = f"{index:0{decimal_digits}}"
 
-                    row = attr.evolve(
-                        row,
-                        name=f"{row.name}{padded_index_string}",
-                        label=f"{row.label} - {padded_index_string}",
-                        value=row.value + index,
-                    )
+@enumeration_handlers(epcpm.sunspecmodel.DataPointBitfield)
+def data_point_bitfield_enumeration(context, bitfield, point):
+    rows = []
 
-            rows.append(row)
+    # 16 bits per register
+    total_bit_count = bitfield.size * 16
+    decimal_digits = len(str(total_bit_count - 1))
 
-        return rows
+    enumerators_by_bit = {
+        enumerator.bit_offset
+        + i: [enumerator, i if enumerator.bit_length > 1 else None]
+        for enumerator in bitfield.children
+        for i in range(enumerator.bit_length)
+    }
 
+    member_parameter = context.parameter_uuid_finder(
+        bitfield.parameter_uuid,
+    )
 
-@enumerator_builders(epcpm.sunspecmodel.DataPointBitfieldMember)
-@attr.s
-class DataPointBitfieldMember:
-    wrapped = attr.ib()
-    point = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+    for bit in range(total_bit_count):
+        enumerator, index = enumerators_by_bit.get(bit, [None, None])
+
+        if enumerator is None:
+            padded_bit_string = f"{bit:0{decimal_digits}}"
+            row = Fields(
+                field_type=f"bitfield{total_bit_count}",
+                value=bit,
+                applicable_point=member_parameter.abbreviation,
+                name=f"Rsvd{padded_bit_string}",
+                label=f"Reserved - {padded_bit_string}",
+            )
+        else:
+            row = enumerator_handlers.gen(
+                node=enumerator,
+                context=context,
+                point=point,
+            )
 
-    # TODO: CAMPid 07397546759269756456100183066795496952476951653
-    def gen(self):
-        field_parameter = self.parameter_uuid_finder(self.point.parameter_uuid)
-        member_parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
-
-        length = self.point.size * 16
-
-        row = Fields(
-            field_type=f"bitfield{length}",
-            value=self.wrapped.bit_offset,
-            applicable_point=field_parameter.abbreviation,
-            name=member_parameter.abbreviation,
-            label=member_parameter.name,
-            description=member_parameter.comment,
-            notes=member_parameter.notes,
-        )
+            if index is not None:
+                padded_index_string = f"{index:0{decimal_digits}}"
 
-        return row
+                row = attr.evolve(
+                    row,
+                    name=f"{row.name}{padded_index_string}",
+                    label=f"{row.label} - {padded_index_string}",
+                    value=row.value + index,
+                )
 
+        rows.append(row)
 
-@enumeration_builders(epcpm.sunspecmodel.HeaderBlock)
-@enumeration_builders(epcpm.sunspecmodel.FixedBlock)
-@enumeration_builders(epcpm.sunspecmodel.TableRepeatingBlockReference)
-@attr.s
-class GenericEnumeratorBuilder:
-    wrapped = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+    return rows
 
-    def gen(self):
-        rows = []
 
-        for child in self.wrapped.children:
-            builder = enumeration_builders.wrap(
-                wrapped=child,
-                point=child,
-                parameter_uuid_finder=self.parameter_uuid_finder,
-            )
+@enumerator_handlers(epcpm.sunspecmodel.DataPointBitfieldMember)
+def data_point_bitfield_member(context, member, point):
+    field_parameter = context.parameter_uuid_finder(point.parameter_uuid)
+    member_parameter = context.parameter_uuid_finder(member.parameter_uuid)
 
-            new_rows = builder.gen()
+    length = point.size * 16
 
-            if len(new_rows) > 0:
-                rows.extend(new_rows)
-                rows.append(Fields())
+    row = Fields(
+        field_type=f"bitfield{length}",
+        value=member.bit_offset,
+        applicable_point=field_parameter.abbreviation,
+        name=member_parameter.abbreviation,
+        label=member_parameter.name,
+        description=member_parameter.comment,
+        notes=member_parameter.notes,
+    )
 
-        return rows
+    return row
 
 
-@enumeration_builders(
-    epcpm.sunspecmodel.TableRepeatingBlockReferenceDataPointReference,
+@enumeration_handlers(
+    epcpm.sunspecmodel.HeaderBlock,
+    epcpm.sunspecmodel.FixedBlock,
+    epcpm.sunspecmodel.TableRepeatingBlockReference,
 )
-@attr.s
-class TableRepeatingBlockReferenceDataPointReferenceEnumerationBuilder:
-    wrapped = attr.ib()
-    point = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
+def block_enumerations(context, block):
+    rows = []
 
-    def gen(self):
-        builder = enumeration_builders.wrap(
-            wrapped=self.wrapped.original,
-            point=self.point.original,
-            parameter_uuid_finder=self.parameter_uuid_finder,
-        )
+    for child in block.children:
+        new_rows = enumeration_handlers.gen(node=child, context=context, point=child)
 
-        return builder.gen()
+        if len(new_rows) > 0:
+            rows.extend(new_rows)
+            rows.append(Fields())
 
+    return rows
 
-@builders(epcpm.sunspecmodel.TableRepeatingBlockReference)
-@attr.s
-class TableRepeatingBlockReference:
-    wrapped = attr.ib()
-    add_padding = attr.ib()
-    padding_type = attr.ib()
-    model_type = attr.ib()
-    model_id = attr.ib()
-    model_offset = attr.ib()
-    address_offset = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
 
-    def gen(self):
-        builder = builders.wrap(
-            wrapped=self.wrapped.original,
-            model_type=self.model_type,
-            parameter_uuid_finder=self.parameter_uuid_finder,
-            add_padding=self.add_padding,
-            padding_type=self.padding_type,
-            model_id=self.model_id,
-            model_offset=self.model_offset,
-            is_table=True,
-            repeating_block_reference=self.wrapped,
-            address_offset=self.address_offset,
-        )
+@enumeration_handlers(
+    epcpm.sunspecmodel.TableRepeatingBlockReferenceDataPointReference,
+)
+def table_repeating_block_reference_data_point_reference_enumeration(
+    context,
+    reference,
+    point,
+):
+    return enumeration_handlers.gen(
+        node=reference.original,
+        context=context,
+        point=point.original,
+    )
 
-        return builder.gen()
 
+@handlers(epcpm.sunspecmodel.TableRepeatingBlockReference)
+def table_repeating_block_reference(
+    context,
+    reference,
+    add_padding,
+    model_type,
+    model_id,
+    model_offset,
+    address_offset,
+):
+    return handlers.gen(
+        node=reference.original,
+        context=context,
+        model_type=model_type,
+        add_padding=add_padding,
+        model_id=model_id,
+        model_offset=model_offset,
+        is_table=True,
+        repeating_block_reference=reference,
+        address_offset=address_offset,
+    )
 
-@builders(epcpm.sunspecmodel.DataPoint)
-@attr.s
-class Point:
-    wrapped = attr.ib()
-    scale_factor_from_uuid = attr.ib()
-    model_type = attr.ib()
-    model_id = attr.ib()
-    model_offset = attr.ib()
-    is_table = attr.ib()
-    address_offset = attr.ib()
-    repeating_block_reference = attr.ib()
-    parameter_uuid_finder = attr.ib(default=None)
 
-    # TODO: CAMPid 07397546759269756456100183066795496952476951653
-    def gen(self):
-        row = Fields()
-        row.address_offset = self.address_offset
-        row.modbus_address = self.model_offset + self.address_offset
+@handlers(epcpm.sunspecmodel.DataPoint)
+def point(
+    context,
+    point,
+    scale_factor_from_uuid,
+    model_type,
+    model_id,
+    model_offset,
+    is_table,
+    address_offset,
+    repeating_block_reference,
+):
+    row = Fields()
+    row.address_offset = address_offset
+    row.modbus_address = model_offset + address_offset
+    scale_factor_parameter = None
 
-        for name, field in attr.asdict(point_fields).items():
-            if field is None:
-                continue
+    for name, field in attr.asdict(point_fields).items():
+        if field is None:
+            continue
 
-            setattr(row, name, getattr(self.wrapped, field.name))
+        setattr(row, name, getattr(point, field.name))
 
-        if self.repeating_block_reference is not None:
-            target = self.parameter_uuid_finder(self.wrapped.parameter_uuid).original
-            is_array_element = isinstance(
-                target,
-                epyqlib.pm.parametermodel.ArrayParameterElement,
+    if repeating_block_reference is not None:
+        target = context.parameter_uuid_finder(point.parameter_uuid).original
+        is_array_element = isinstance(
+            target,
+            epyqlib.pm.parametermodel.ArrayParameterElement,
+        )
+        if is_array_element:
+            target = target.tree_parent.children[0]
+
+        references = [
+            child
+            for child in repeating_block_reference.children
+            if target.uuid == child.parameter_uuid
+        ]
+        if len(references) > 0:
+            (reference,) = references
+
+            if reference.factor_uuid is not None:
+                scale_factor_parameter = context.parameter_uuid_finder(
+                    context.parameter_uuid_finder(reference.factor_uuid).parameter_uuid
+                )
+                row.scale_factor = scale_factor_parameter.abbreviation
+    else:
+        if row.scale_factor is not None:
+            scale_factor_parameter = context.parameter_uuid_finder(
+                scale_factor_from_uuid[row.scale_factor].parameter_uuid
             )
-            if is_array_element:
-                target = target.tree_parent.children[0]
+            row.scale_factor = scale_factor_parameter.abbreviation
 
-            references = [
-                child
-                for child in self.repeating_block_reference.children
-                if target.uuid == child.parameter_uuid
-            ]
-            if len(references) > 0:
-                (reference,) = references
+    if row.type is not None:
+        row.type = context.parameter_uuid_finder(row.type).name
+
+    row.mandatory = "M" if point.mandatory else "O"
 
-                if reference.factor_uuid is not None:
-                    row.scale_factor = self.parameter_uuid_finder(
-                        self.parameter_uuid_finder(reference.factor_uuid).parameter_uuid
-                    ).abbreviation
+    if point.parameter_uuid is not None:
+        parameter = context.parameter_uuid_finder(point.parameter_uuid)
+
+        row.label = parameter.name
+        row.name = parameter.abbreviation
+        row.notes = "" if parameter.notes is None else parameter.notes
+        to_tree = list(
+            itertools.takewhile(
+                lambda node: not isinstance(node, epyqlib.pm.parametermodel.Table),
+                parameter.ancestors(),
+            )
+        )
+        tree = to_tree[-1]
+        if isinstance(tree, epyqlib.pm.parametermodel.TableGroupElement):
+            # naturally sorted by traversal...  hopefully
+            all_of_them = tree.nodes_by_filter(
+                filter=lambda node: node.original == parameter.original,
+                collection=[],
+            )
+            uuids_string = " ".join(
+                (f"<uuid:{parameter.uuid}>" for parameter in all_of_them),
+            )
+            row.notes = f"{row.notes}  {uuids_string}".strip()
         else:
-            if row.scale_factor is not None:
-                row.scale_factor = self.parameter_uuid_finder(
-                    self.scale_factor_from_uuid[row.scale_factor].parameter_uuid
-                ).abbreviation
-
-        if row.type is not None:
-            row.type = self.parameter_uuid_finder(row.type).name
-
-        row.mandatory = "M" if self.wrapped.mandatory else "O"
-
-        if self.wrapped.parameter_uuid is not None:
-            parameter = self.parameter_uuid_finder(self.wrapped.parameter_uuid)
-
-            row.label = parameter.name
-            row.name = parameter.abbreviation
-            row.notes = "" if parameter.notes is None else parameter.notes
-            to_tree = list(
-                itertools.takewhile(
-                    lambda node: not isinstance(node, epyqlib.pm.parametermodel.Table),
-                    parameter.ancestors(),
-                )
+            row.notes = f"{row.notes}  <uuid:{parameter.uuid}>".strip()
+
+        if row.units is None:
+            row.units = parameter.units
+        row.description = parameter.comment
+        row.read_write = "R" if parameter.read_only else "RW"
+
+        if context.generates_code():
+            point_code(
+                context=context,
+                point=point,
+                parameter=parameter,
+                row=row,
+                model_id=model_id,
+                is_table=is_table,
+                scale_factor_parameter=scale_factor_parameter,
             )
-            tree = to_tree[-1]
-            if isinstance(tree, epyqlib.pm.parametermodel.TableGroupElement):
-                # naturally sorted by traversal...  hopefully
-                all_of_them = tree.nodes_by_filter(
-                    filter=lambda node: node.original == parameter.original,
-                    collection=[],
-                )
-                uuids_string = " ".join(
-                    (f"<uuid:{parameter.uuid}>" for parameter in all_of_them),
-                )
-                row.notes = f"{row.notes}  {uuids_string}".strip()
-            else:
-                row.notes = f"{row.notes}  <uuid:{parameter.uuid}>".strip()
 
-            if row.units is None:
-                row.units = parameter.units
-            row.description = parameter.comment
-            row.read_write = "R" if parameter.read_only else "RW"
+    row.field_type = model_type
 
-            meta = "[Meta_Value]"
+    if context.parameter_uuid_finder(point.type_uuid).name == "pad":
+        row.name = "Pad"
+        row.description = "Force even alignment"
+        row.read_write = "R"
+        row.mandatory = "O"
 
-            getter = []
-            setter = []
+    return row, row.size
+
+
+def point_code(
+    context,
+    point,
+    parameter,
+    row,
+    model_id,
+    is_table,
+    scale_factor_parameter,
+):
+    """Fill in the get and set C snippets of a point's row."""
+    meta = "[Meta_Value]"
 
-            uses_interface_item = (
-                isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
-                and parameter.uses_interface_item()
+    getter = []
+    setter = []
+    scale_factor_getter = None
+
+    uses_interface_item = (
+        isinstance(parameter, epyqlib.pm.parametermodel.Parameter)
+        and parameter.uses_interface_item()
+    )
+
+    hand_coded_getter_function_name = getter_name(
+        parameter=parameter,
+        model_id=model_id,
+        is_table=is_table,
+    )
+
+    hand_coded_setter_function_name = setter_name(
+        parameter=parameter,
+        model_id=model_id,
+        is_table=is_table,
+    )
+
+    if not uses_interface_item and not point.not_implemented:
+        if row.scale_factor is not None:
+            scale_factor_updater_name = f"getSUNSPEC_MODEL{model_id}_{row.scale_factor}"
+
+            f = f"{scale_factor_updater_name}();"
+            get_scale_factor = f.format(
+                model_id=model_id,
+                abbreviation=row.scale_factor,
+            )
+            scale_factor_getter = scale_factor_updater_name
+            setter.append(get_scale_factor)
+
+        getter.append(f"{hand_coded_getter_function_name}();")
+
+    sunspec_model_variable = f"sunspecInterface.model{model_id}"
+
+    sunspec_variable = f"{sunspec_model_variable}.{parameter.abbreviation}"
+
+    if row.type == "pad":
+        getter.append(f"{sunspec_variable} = 0x8000;")
+    elif point.not_implemented:
+        value = {
+            "int16": "INT16_C(0x8000)",
+            "uint16": "UINT16_C(0xffff)",
+            "acc16": "UINT16_C(0x0000)",
+            "enum16": "UINT16_C(0xffff)",
+            "bitfield16": "UINT16_C(0xffff)",
+            "int32": "sunspecInt32ToSS32_returns(INT32_C(0x80000000))",
+            "uint32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
+            "acc32": "sunspecUint32ToSSU32_returns(UINT32_C(0x00000000))",
+            "enum32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
+            "bitfield32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
+            "ipaddr": "sunspecUint32ToSSU32_returns(UINT32_C(0x00000000))",
+            "int64": "sunspecInt64ToSS64_returns(INT64_C(0x8000000000000000))",
+            # yes, acc64 seems to be an int64, not a uint64
+            "acc64": "sunspecInt64ToSS64_returns(INT64_C(0x0000000000000000))",
+            # 'ipv6addr': 'INT128_C(0x00000000000000000000000000000000)',
+            # 'float32': 'NAN',
+            "sunssf": "INT16_C(0x8000)",
+            "string": "UINT16_C(0x0000)",
+        }[row.type]
+        if row.type == "string":
+            getter.extend(
+                [
+                    f"for (size_t i = 0; i < LENGTHOF({sunspec_variable}); i++) {{",
+                    [f"{sunspec_variable}[i] = {value};"],
+                    "}",
+                ]
             )
+        elif row.type.startswith("bitfield"):
+            getter.append(f"{sunspec_variable}.raw = {value};")
+            # # below because parsesunspec only detects bitfields
+            # # if they have values
+            # if point.enumeration_uuid is not None:
+            #     getter.append(
+            #         f'{sunspec_variable}.raw = {value};'
+            #     )
+            # else:
+            #     getter.append(
+            #         f'*((uint{row.type[-2:]}_t*) &{sunspec_variable})'
+            #         f' = {value};'
+            #     )
+        else:
+            getter.append(f"{sunspec_variable} = {value};")
+
+        setter.append("// point not implemented, do nothing")
+    elif parameter.nv_format is not None:
+        internal_variable = parameter.nv_format.format(meta)
+
+        # TODO: CAMPid 075780541068182645821856068542023499
+        converter = {
+            "uint32": {
+                "get": "sunspecUint32ToSSU32",
+                "set": "sunspecSSU32ToUint32",
+            },
+            "int32": {
+                # TODO: add this to embedded?
+                # 'get': 'sunspecInt32ToSSS32',
+                "set": "sunspecSSS32ToInt32",
+            },
+        }.get(row.type)
+
+        if converter is not None:
+            get_converter = converter["get"]
+            set_converter = converter["set"]
+
+            get_cast = ""
+            set_cast = ""
+            if parameter.nv_cast:
+                set_cast = f"(__typeof__({internal_variable})) "
+                get_type = {
+                    "uint32": "uint32_t",
+                }[row.type]
+                get_cast = f"({get_type})"
 
-            hand_coded_getter_function_name = getter_name(
-                parameter=parameter,
-                model_id=self.model_id,
-                is_table=self.is_table,
+            getter.extend(
+                [
+                    f"{get_converter}(",
+                    [
+                        f"&{sunspec_variable},",
+                        f"{get_cast}{internal_variable}",
+                    ],
+                    ");",
+                ]
+            )
+            setter.extend(
+                [
+                    f"{internal_variable} = {set_cast}{set_converter}(",
+                    [
+                        f"&{sunspec_variable}",
+                    ],
+                    ");",
+                ]
+            )
+        else:
+            getter.append(
+                adjust_assignment(
+                    left_hand_side=sunspec_variable,
+                    right_hand_side=internal_variable,
+                    sunspec_model_variable=sunspec_model_variable,
+                    scale_factor=row.scale_factor,
+                    internal_scale=parameter.internal_scale_factor,
+                    parameter=parameter,
+                    factor_operator="*",
+                    power_of_ten_scaling=context.power_of_ten_scaling,
+                    scale_factor_parameter=scale_factor_parameter,
+                )
             )
 
-            hand_coded_setter_function_name = setter_name(
-                parameter=parameter,
-                model_id=self.model_id,
-                is_table=self.is_table,
+            setter.append(
+                adjust_assignment(
+                    left_hand_side=internal_variable,
+                    right_hand_side=sunspec_variable,
+                    sunspec_model_variable=sunspec_model_variable,
+                    scale_factor=row.scale_factor,
+                    internal_scale=parameter.internal_scale_factor,
+                    parameter=parameter,
+                    factor_operator="/",
+                    power_of_ten_scaling=context.power_of_ten_scaling,
+                    scale_factor_parameter=scale_factor_parameter,
+                )
             )
 
-            if not uses_interface_item and not self.wrapped.not_implemented:
-                if row.scale_factor is not None:
-                    scale_factor_updater_name = (
-                        f"getSUNSPEC_MODEL{self.model_id}_{row.scale_factor}"
-                    )
-
-                    f = f"{scale_factor_updater_name}();"
-                    get_scale_factor = f.format(
-                        model_id=self.model_id,
-                        abbreviation=row.scale_factor,
-                    )
-                    getter.append(get_scale_factor)
-                    setter.append(get_scale_factor)
-
-                getter.append(f"{hand_coded_getter_function_name}();")
-
-            sunspec_model_variable = f"sunspecInterface.model{self.model_id}"
-
-            sunspec_variable = f"{sunspec_model_variable}.{parameter.abbreviation}"
-
-            if row.type == "pad":
-                getter.append(f"{sunspec_variable} = 0x8000;")
-            elif self.wrapped.not_implemented:
-                value = {
-                    "int16": "INT16_C(0x8000)",
-                    "uint16": "UINT16_C(0xffff)",
-                    "acc16": "UINT16_C(0x0000)",
-                    "enum16": "UINT16_C(0xffff)",
-                    "bitfield16": "UINT16_C(0xffff)",
-                    "int32": "sunspecInt32ToSS32_returns(INT32_C(0x80000000))",
-                    "uint32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
-                    "acc32": "sunspecUint32ToSSU32_returns(UINT32_C(0x00000000))",
-                    "enum32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
-                    "bitfield32": "sunspecUint32ToSSU32_returns(UINT32_C(0xffffffff))",
-                    "ipaddr": "sunspecUint32ToSSU32_returns(UINT32_C(0x00000000))",
-                    "int64": "sunspecInt64ToSS64_returns(INT64_C(0x8000000000000000))",
-                    # yes, acc64 seems to be an int64, not a uint64
-                    "acc64": "sunspecInt64ToSS64_returns(INT64_C(0x0000000000000000))",
-                    # 'ipv6addr': 'INT128_C(0x00000000000000000000000000000000)',
-                    # 'float32': 'NAN',
-                    "sunssf": "INT16_C(0x8000)",
-                    "string": "UINT16_C(0x0000)",
-                }[row.type]
-                if row.type == "string":
-                    getter.extend(
-                        [
-                            f"for (size_t i = 0; i < LENGTHOF({sunspec_variable}); i++) {{",
-                            [f"{sunspec_variable}[i] = {value};"],
-                            "}",
-                        ]
-                    )
-                elif row.type.startswith("bitfield"):
-                    getter.append(f"{sunspec_variable}.raw = {value};")
-                    # # below because parsesunspec only detects bitfields
-                    # # if they have values
-                    # if self.wrapped.enumeration_uuid is not None:
-                    #     getter.append(
-                    #         f'{sunspec_variable}.raw = {value};'
-                    #     )
-                    # else:
-                    #     getter.append(
-                    #         f'*((uint{row.type[-2:]}_t*) &{sunspec_variable})'
-                    #         f' = {value};'
-                    #     )
-                else:
-                    getter.append(f"{sunspec_variable} = {value};")
-
-                setter.append("// point not implemented, do nothing")
-            elif parameter.nv_format is not None:
-                internal_variable = parameter.nv_format.format(meta)
-
-                # TODO: CAMPid 075780541068182645821856068542023499
-                converter = {
-                    "uint32": {
-                        "get": "sunspecUint32ToSSU32",
-                        "set": "sunspecSSU32ToUint32",
-                    },
-                    "int32": {
-                        # TODO: add this to embedded?
-                        # 'get': 'sunspecInt32ToSSS32',
-                        "set": "sunspecSSS32ToInt32",
-                    },
-                }.get(row.type)
-
-                if converter is not None:
-                    get_converter = converter["get"]
-                    set_converter = converter["set"]
-
-                    get_cast = ""
-                    set_cast = ""
-                    if parameter.nv_cast:
-                        set_cast = f"(__typeof__({internal_variable})) "
-                        get_type = {
-                            "uint32": "uint32_t",
-                        }[row.type]
-                        get_cast = f"({get_type})"
-
-                    getter.extend(
-                        [
-                            f"{get_converter}(",
-                            [
-                                f"&{sunspec_variable},",
-                                f"{get_cast}{internal_variable}",
-                            ],
-                            ");",
-                        ]
-                    )
-                    setter.extend(
-                        [
-                            f"{internal_variable} = {set_cast}{set_converter}(",
-                            [
-                                f"&{sunspec_variable}",
-                            ],
-                            ");",
-                        ]
-                    )
-                else:
-                    getter.append(
-                        adjust_assignment(
-                            left_hand_side=sunspec_variable,
-                            right_hand_side=internal_variable,
-                            sunspec_model_variable=sunspec_model_variable,
-                            scale_factor=row.scale_factor,
-                            internal_scale=parameter.internal_scale_factor,
-                            parameter=parameter,
-                            factor_operator="*",
-                        )
-                    )
-
-                    setter.append(
-                        adjust_assignment(
-                            left_hand_side=internal_variable,
-                            right_hand_side=sunspec_variable,
-                            sunspec_model_variable=sunspec_model_variable,
-                            scale_factor=row.scale_factor,
-                            internal_scale=parameter.internal_scale_factor,
-                            parameter=parameter,
-                            factor_operator="/",
-                        )
-                    )
-
-                # minimum_variable = parameter.nv_format.format('[Meta_Min]')
-                # maximum_variable = parameter.nv_format.format('[Meta_Max]')
-            elif uses_interface_item:
-                # TODO: CAMPid 9685439641536675431653179671436
-                parameter_uuid = str(parameter.uuid).replace("-", "_")
-                item_name = f"interfaceItem_{parameter_uuid}"
-
-                getter.extend(
-                    [
-                        f"{item_name}.common.sunspec.getter(",
-                        [
-                            f"(InterfaceItem_void *) &{item_name},",
-                            f"Meta_Value",
-                        ],
-                        f");",
-                    ]
+        # minimum_variable = parameter.nv_format.format('[Meta_Min]')
+        # maximum_variable = parameter.nv_format.format('[Meta_Max]')
+    elif uses_interface_item:
+        # TODO: CAMPid 9685439641536675431653179671436
+        parameter_uuid = str(parameter.uuid).replace("-", "_")
+        item_name = f"interfaceItem_{parameter_uuid}"
+
+        getter.extend(
+            [
+                f"{item_name}.common.sunspec.getter(",
+                [
+                    f"(InterfaceItem_void *) &{item_name},",
+                    f"Meta_Value",
+                ],
+                f");",
+            ]
+        )
+        setter.extend(
+            [
+                f"{item_name}.common.sunspec.setter(",
+                [
+                    f"(InterfaceItem_void *) &{item_name},",
+                    f"true,",
+                    f"Meta_Value",
+                ],
+                f");",
+            ]
+        )
+    else:
+        if getattr(parameter, "sunspec_getter", None) is not None:
+            getter.append(
+                parameter.sunspec_getter.format(
+                    interface=sunspec_variable,
                 )
-                setter.extend(
-                    [
-                        f"{item_name}.common.sunspec.setter(",
-                        [
-                            f"(InterfaceItem_void *) &{item_name},",
-                            f"true,",
-                            f"Meta_Value",
-                        ],
-                        f");",
-                    ]
+            )
+
+        if getattr(parameter, "sunspec_setter", None) is not None:
+            setter.append(
+                parameter.sunspec_setter.format(
+                    interface=sunspec_variable,
                 )
-            else:
-                if getattr(parameter, "sunspec_getter", None) is not None:
-                    getter.append(
-                        parameter.sunspec_getter.format(
-                            interface=sunspec_variable,
-                        )
-                    )
-
-                if getattr(parameter, "sunspec_setter", None) is not None:
-                    setter.append(
-                        parameter.sunspec_setter.format(
-                            interface=sunspec_variable,
-                        )
-                    )
-
-            row.get = epcpm.c.format_nested_lists(getter)
-
-            if not uses_interface_item and not self.wrapped.not_implemented:
-                setter.append(f"{hand_coded_setter_function_name}();")
-
-            if not parameter.read_only:
-                row.set = epcpm.c.format_nested_lists(setter)
-            else:
-                row.set = None
-
-        row.field_type = self.model_type
-
-        if self.parameter_uuid_finder(self.wrapped.type_uuid).name == "pad":
-            row.name = "Pad"
-            row.description = "Force even alignment"
-            row.read_write = "R"
-            row.mandatory = "O"
+            )
 
-        return row, row.size
+    if scale_factor_getter is None:
+        row.get = epcpm.c.format_nested_lists(getter)
+    else:
+        row.get = epcpm.c.format_nested_lists(
+            [f"{scale_factor_getter}();", *getter],
+        )
+
+    if context.getters is not None:
+        context.getters.append(
+            Getter(scale_factor_getter=scale_factor_getter, lines=getter),
+        )
+
+    if not uses_interface_item and not point.not_implemented:
+        setter.append(f"{hand_coded_setter_function_name}();")
+
+    if not parameter.read_only:
+        row.set = epcpm.c.format_nested_lists(setter)
+    else:
+        row.set = None
 
 
 def adjust_assignment(
@@ -983,8 +1206,31 @@ def adjust_assignment(
     internal_scale,
     parameter,
     factor_operator,
+    power_of_ten_scaling=False,
+    scale_factor_parameter=None,
 ):
-    if scale_factor is not None:
+    if scale_factor is not None and power_of_ten_scaling:
+        constant = None
+        if scale_factor_parameter is not None:
+            constant = epcpm.sunspecscale.constant_scale_factor(
+                scale_factor_parameter,
+            )
+
+        if constant is None:
+            right_hand_side = epcpm.sunspecscale.scaled(
+                value=right_hand_side,
+                scale_factor_variable=f"{sunspec_model_variable}.{scale_factor}",
+                internal_scale=internal_scale,
+                factor_operator=factor_operator,
+            )
+        else:
+            right_hand_side = epcpm.sunspecscale.constant_scaled(
+                value=right_hand_side,
+                scale_factor=constant,
+                internal_scale=internal_scale,
+                factor_operator=factor_operator,
+            )
+    elif scale_factor is not None:
         scale_factor_variable = f"{sunspec_model_variable}.{scale_factor}"
         # TODO: what about positive scalings?
         # factor = f'(P99_IPOW(-{scale_factor_variable}, 10))'
@@ -0,0 +1,17 @@
+import epcpm.benchmarks.suite
+import epcpm.benchmarks.synthetic
+
+
+def test_synthetic_project_round_trips(tmp_path):
+    sizes = epcpm.benchmarks.synthetic.Sizes(
+        parameters=20,
+        messages=2,
+        sunspec_models=2,
+        table_axis_length=2,
+        table_array_length=2,
+    )
+
+    result = epcpm.benchmarks.suite.run_one(directory=tmp_path, sizes=sizes)
+
+    assert result["nodes"]["parameters"] > sizes.parameters
+    assert all(timing >= 0 for timing in result["timings"].values())
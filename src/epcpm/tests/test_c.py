@@ -1,3 +1,4 @@
+import os
 import textwrap
 
 import epcpm.c
@@ -33,3 +34,80 @@ def test_format_nested_lists():
     }
     """
     )
+
+
+padded_example = [
+    "",
+    "int a;",
+    ["int b;", "", ["int c;"]],
+    "",
+    "int d;",
+    "",
+    "",
+]
+
+
+def test_emitter_matches_format_nested_lists():
+    emitter = epcpm.c.Emitter()
+    emitter.lines(padded_example)
+
+    assert emitter.getvalue() == epcpm.c.format_nested_lists(it=padded_example)
+
+
+def test_stripped_emitter():
+    emitter = epcpm.c.Emitter(strip=True)
+    emitter.lines(padded_example)
+
+    expected = epcpm.c.format_nested_lists(it=padded_example).strip()
+    assert emitter.getvalue() == expected
+
+    emitter.end()
+    assert emitter.getvalue() == expected + "\n"
+
+
+def test_render_strips_trailing_whitespace(tmp_path):
+    source = tmp_path / "file.c_pm"
+    source.write_text("{{ a }}\n{% for b in bs %}{{ b }}\n\n{% endfor %}  \n")
+    destination = tmp_path / "file.c"
+
+    epcpm.c.render(
+        source=source,
+        destination=destination,
+        context={"a": "first", "bs": ["x", "y"]},
+    )
+
+    assert destination.read_text() == "first\nx\n\ny\n"
+
+
+def test_render_reuses_environment_and_reloads_changed_templates(tmp_path):
+    source = tmp_path / "file.c_pm"
+    destination = tmp_path / "file.c"
+
+    source.write_text("{{ a }}\n")
+    epcpm.c.render(source=source, destination=destination, context={"a": 1})
+    environment = epcpm.c.environment(directory=tmp_path)
+
+    source.write_text("changed {{ a }}\n")
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    epcpm.c.render(source=source, destination=destination, context={"a": 2})
+
+    assert epcpm.c.environment(directory=tmp_path) is environment
+    assert destination.read_text() == "changed 2\n"
+
+
+def test_render_caches_bytecode_and_times(tmp_path):
+    source = tmp_path / "file.c_pm"
+    source.write_text("{{ a }}\n")
+    cache = tmp_path / "cache"
+
+    with epcpm.c.bytecode_cache(cache):
+        with epcpm.c.collect_render_times() as render_times:
+            epcpm.c.render(
+                source=source,
+                destination=tmp_path / "file.c",
+                context={"a": 1},
+            )
+
+    assert len(list(cache.iterdir())) == 1
+    assert list(render_times) == [source]
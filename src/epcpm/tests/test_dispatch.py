@@ -0,0 +1,69 @@
+import pytest
+
+import epcpm.dispatch
+
+
+class Base:
+    pass
+
+
+class Derived(Base):
+    pass
+
+
+class Other:
+    pass
+
+
+def test_dispatches_to_registered_type():
+    handlers = epcpm.dispatch.Dispatcher()
+
+    @handlers(Base, Other)
+    def handler(context, node, extra=None):
+        return context, node, extra
+
+    node = Other()
+
+    assert handlers.gen(node=node, context="context", extra=3) == (
+        "context",
+        node,
+        3,
+    )
+
+
+def test_falls_back_to_nearest_base():
+    handlers = epcpm.dispatch.Dispatcher()
+
+    @handlers(object)
+    def fallback(context, node):
+        return "object"
+
+    @handlers(Base)
+    def base(context, node):
+        return "base"
+
+    assert handlers.gen(node=Derived(), context=None) == "base"
+    assert handlers.gen(node=Other(), context=None) == "object"
+
+
+def test_registering_clears_resolved():
+    handlers = epcpm.dispatch.Dispatcher()
+
+    @handlers(Base)
+    def base(context, node):
+        return "base"
+
+    assert handlers[Derived] is base
+
+    @handlers(Derived)
+    def derived(context, node):
+        return "derived"
+
+    assert handlers[Derived] is derived
+
+
+def test_unregistered_type_raises():
+    handlers = epcpm.dispatch.Dispatcher()
+
+    with pytest.raises(KeyError):
+        handlers.gen(node=Other(), context=None)
@@ -0,0 +1,268 @@
+import os
+import pathlib
+import shutil
+
+import attr
+import pytest
+
+import epcpm.importexport
+import epcpm.importexportdialog
+import epcpm.itemids
+
+
+here = pathlib.Path(__file__).parent
+
+
+def write_name(project, index, paths, options):
+    (paths / project.name).write_text(f"{index} {options}")
+
+
+def no_outputs(paths, options):
+    return ()
+
+
+def fail(project, index, paths, options):
+    raise Exception("this generator always fails")
+
+
+class FakeProject:
+    name = "written"
+    filename = None
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_run_generators(tmp_path, jobs):
+    generators = [
+        epcpm.importexport.Generator(
+            name="write",
+            export=write_name,
+            models=(),
+            outputs=no_outputs,
+        ),
+    ]
+
+    epcpm.importexport.run_generators(
+        generators=generators,
+        project=FakeProject(),
+        paths=tmp_path,
+        options="abc",
+        jobs=jobs,
+        index="index",
+    )
+
+    assert (tmp_path / "written").read_text() == "index abc"
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_run_generators_reports_failed_name(tmp_path, jobs):
+    generators = [
+        epcpm.importexport.Generator(
+            name="failing_generator",
+            export=fail,
+            models=(),
+            outputs=no_outputs,
+        ),
+    ]
+
+    with pytest.raises(
+        epcpm.importexport.GeneratorError,
+        match="failing_generator",
+    ):
+        epcpm.importexport.run_generators(
+            generators=generators,
+            project=FakeProject(),
+            paths=tmp_path,
+            options="abc",
+            jobs=jobs,
+            index="index",
+        )
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_run_generators_reports_every_failure(tmp_path, jobs):
+    generators = [
+        epcpm.importexport.Generator(
+            name=name,
+            export=export,
+            models=(),
+            outputs=no_outputs,
+        )
+        for name, export in (
+            ("first_failing", fail),
+            ("write", write_name),
+            ("second_failing", fail),
+        )
+    ]
+
+    with pytest.raises(epcpm.importexport.GeneratorError) as excinfo:
+        epcpm.importexport.run_generators(
+            generators=generators,
+            project=FakeProject(),
+            paths=tmp_path,
+            options="abc",
+            jobs=jobs,
+            index="index",
+        )
+
+    assert "first_failing, second_failing" in str(excinfo.value)
+    assert (tmp_path / "written").read_text() == "index abc"
+
+
+def create_built_target(tmp_path, options=epcpm.importexport.ExportOptions()):
+    project_directory = tmp_path / "project"
+    shutil.copytree(here / "project", project_directory)
+    project_path = project_directory / "project.pmp"
+
+    target = tmp_path / "target"
+    paths = epcpm.importexportdialog.paths_from_directory(target)
+
+    for generator in epcpm.importexport.generators:
+        for output in generator.outputs(paths=paths, options=options):
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(generator.name)
+
+    epcpm.importexport.update_manifest(
+        project_path=project_path,
+        paths=paths,
+        target_directory=target,
+        options=options,
+        generators=epcpm.importexport.generators,
+    )
+
+    return project_path, paths, target, options
+
+
+def stale_names(project_path, paths, target, options):
+    return {
+        generator.name
+        for generator in epcpm.importexport.stale_generators(
+            project_path=project_path,
+            paths=paths,
+            target_directory=target,
+            options=options,
+        )
+    }
+
+
+def test_nothing_stale_after_manifest_update(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    assert stale_names(project_path, paths, target, options) == set()
+
+
+def test_sunspec_edit_leaves_can_outputs_alone(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    sunspec_path = project_path.parent / "sunspec.json"
+    sunspec_path.write_text(sunspec_path.read_text() + "\n")
+
+    assert stale_names(project_path, paths, target, options) == {
+        "interface",
+        "spreadsheet",
+        "sunspec_tables",
+        "sunspec_bitfields",
+    }
+
+
+def test_touch_without_change_is_not_stale(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    os.utime(project_path.parent / "parameters.json")
+
+    assert stale_names(project_path, paths, target, options) == set()
+
+
+def test_modified_output_is_stale(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    paths.sil_c.write_text("edited by hand")
+
+    assert stale_names(project_path, paths, target, options) == {"sil"}
+
+
+def test_deleted_sidecar_is_stale(tmp_path):
+    project_path, paths, target, options = create_built_target(
+        tmp_path,
+        options=epcpm.importexport.ExportOptions(compact_item_ids=True),
+    )
+
+    epcpm.itemids.sidecar_path(paths.sil_c).unlink()
+
+    assert stale_names(project_path, paths, target, options) == {"sil"}
+
+
+def test_changed_options_are_stale(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    options = attr.evolve(options, include_uuid_in_item=True)
+
+    assert stale_names(project_path, paths, target, options) == {
+        "interface",
+        "sunspec_bitfields",
+    }
+
+
+def test_sunspec_option_leaves_other_outputs_alone(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    options = attr.evolve(options, sunspec_power_of_ten_scaling=True)
+
+    assert stale_names(project_path, paths, target, options) == {
+        "spreadsheet",
+        "sunspec_tables",
+    }
+
+
+def test_generator_options_are_export_options():
+    names = set(attr.fields_dict(epcpm.importexport.ExportOptions))
+
+    for generator in epcpm.importexport.generators:
+        assert set(generator.options) <= names
+
+
+def test_spreadsheet_jobs_are_not_stale(tmp_path):
+    project_path, paths, target, options = create_built_target(tmp_path)
+
+    options = attr.evolve(options, sunspec_spreadsheet_jobs=4)
+
+    assert stale_names(project_path, paths, target, options) == set()
+
+
+def test_required_models_skip_sunspec():
+    generators = [
+        generator
+        for generator in epcpm.importexport.generators
+        if generator.name in {"sym", "interface"}
+    ]
+
+    assert (
+        epcpm.importexport.required_models(
+            generators=generators,
+            options=epcpm.importexport.ExportOptions(),
+        )
+        == {"parameters", "can", "sunspec"}
+    )
+    assert (
+        epcpm.importexport.required_models(
+            generators=generators,
+            options=epcpm.importexport.ExportOptions(skip_sunspec=True),
+        )
+        == {"parameters", "can"}
+    )
+
+
+def test_required_models_skip_sunspec_all_generators():
+    assert (
+        epcpm.importexport.required_models(
+            generators=epcpm.importexport.generators,
+            options=epcpm.importexport.ExportOptions(),
+        )
+        == {"parameters", "can", "sunspec"}
+    )
+    assert (
+        epcpm.importexport.required_models(
+            generators=epcpm.importexport.generators,
+            options=epcpm.importexport.ExportOptions(skip_sunspec=True),
+        )
+        == {"parameters", "can"}
+    )
@@ -0,0 +1,71 @@
+import json
+import uuid
+
+import epcpm.itemids
+import epcpm.output
+import epcpm.parameterstosil
+
+
+uuids = [
+    uuid.UUID("a2d0dbd0-0bd7-4c6b-8a3b-0a4f3d2f6f6e"),
+    uuid.UUID("06b4ce0d-d4a4-4a1c-8b7c-0a8c3c1e4e2d"),
+]
+
+
+def test_ids_are_stable():
+    first = epcpm.itemids.ItemIds()
+    second = epcpm.itemids.ItemIds()
+
+    assert [first.get(uuid_) for uuid_ in uuids] == [
+        second.get(uuid_) for uuid_ in reversed(uuids)
+    ][::-1]
+    assert first.get(uuids[0]) == first.get(uuids[0])
+    assert first.collisions == 0
+
+
+def test_colliding_ids_are_salted(monkeypatch):
+    monkeypatch.setattr(epcpm.itemids, "item_id", lambda uuid_, salt=0: salt)
+
+    item_ids = epcpm.itemids.ItemIds()
+
+    assert [item_ids.get(uuid_) for uuid_ in uuids] == [0, 1]
+    assert item_ids.collisions == 1
+
+
+def test_sidecar_maps_uuids_to_ids(tmp_path):
+    c_path = tmp_path / "items.c"
+    item_ids = epcpm.itemids.ItemIds()
+    item_ids.get(uuids[0])
+
+    with epcpm.output.collect() as statistics:
+        epcpm.itemids.update_sidecar(c_path=c_path, item_ids=item_ids, flash_saved=12)
+
+    sidecar = json.loads(epcpm.itemids.sidecar_path(c_path).read_text())
+
+    assert sidecar["ids"] == {
+        str(uuids[0]): epcpm.itemids.literal(item_ids.get(uuids[0])),
+    }
+    assert statistics.flash_saved == 12
+    assert epcpm.itemids.sidecar_outputs(c_path, compact_item_ids=True) == [
+        epcpm.itemids.sidecar_path(c_path),
+    ]
+
+    epcpm.itemids.update_sidecar(c_path=c_path, item_ids=None, flash_saved=0)
+
+    assert not epcpm.itemids.sidecar_path(c_path).exists()
+    assert epcpm.itemids.sidecar_outputs(c_path, compact_item_ids=False) == []
+
+
+def test_sil_item_uses_id():
+    item = epcpm.parameterstosil.Item(
+        uuid=uuids[0],
+        variable="&variable",
+        type="int16_t",
+        on_write="NULL",
+        internal_scale=0,
+        item_id=0x1234ABCD,
+    )
+
+    (identifier, *_) = item.create_subinitializers()
+
+    assert identifier == ".id = 0x1234abcdu,"
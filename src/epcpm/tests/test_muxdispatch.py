@@ -0,0 +1,154 @@
+import uuid
+
+import pytest
+
+import epcpm.canmodel
+import epcpm.muxdispatch
+
+
+def item_name(uuid_):
+    return f"item_{uuid_.hex}"
+
+
+def lines_after(c, line):
+    (lines,) = [lines for before, lines in zip(c, c[1:]) if before == line]
+
+    return lines
+
+
+def create_message(identifier, multiplexers):
+    message = epcpm.canmodel.MultiplexedMessage(identifier=identifier)
+    message.append_child(epcpm.canmodel.Signal(name="MultiplexerSignal"))
+
+    signals = {}
+
+    for multiplexer_identifier, count in multiplexers:
+        multiplexer = epcpm.canmodel.Multiplexer(identifier=multiplexer_identifier)
+        message.append_child(multiplexer)
+
+        for _ in range(count):
+            signal = epcpm.canmodel.Signal(parameter_uuid=uuid.uuid4())
+            multiplexer.append_child(signal)
+            signals[signal.parameter_uuid] = signal
+
+    return message, signals
+
+
+def test_multiplexers_index_their_items():
+    root = epcpm.canmodel.Root()
+    message, signals = create_message(
+        identifier=0x1ABEFACE,
+        multiplexers=[(3, 2), (0, 1), (5, 1)],
+    )
+    root.append_child(message)
+    clone = epcpm.canmodel.MultiplexedMessageClone(
+        identifier=0x1ABEFAC0,
+        original=message,
+    )
+    root.append_child(clone)
+
+    # signals without an interface item are left out
+    without_item = [*message.children[3].children][0].parameter_uuid
+    item_uuids = [uuid_ for uuid_ in signals if uuid_ != without_item]
+
+    c, h = epcpm.muxdispatch.dispatch_code(
+        can_root=root,
+        parameter_uuid_to_can_node=signals,
+        item_uuids=item_uuids,
+        item_name=item_name,
+    )
+
+    table = lines_after(
+        c=c,
+        line="static InterfaceMuxItems const interfaceMux_1ABEFACE[] = {",
+    )
+    assert table == [
+        "{interfaceMux_1ABEFACE_0, 1},",
+        "{NULL, 0},",
+        "{NULL, 0},",
+        "{interfaceMux_1ABEFACE_3, 2},",
+    ]
+
+    messages = lines_after(
+        c=c,
+        line=(
+            "InterfaceMuxMessage const"
+            " interfaceMuxMessages[INTERFACE_MUX_MESSAGE_COUNT] = {"
+        ),
+    )
+    assert messages == [
+        "{0x1ABEFAC0, interfaceMux_1ABEFACE, 4},",
+        "{0x1ABEFACE, interfaceMux_1ABEFACE, 4},",
+    ]
+    assert "#define INTERFACE_MUX_MESSAGE_COUNT (2)" in h
+
+
+def test_duplicate_multiplexer_identifiers_are_rejected():
+    message, signals = create_message(
+        identifier=0x1ABEFACE,
+        multiplexers=[(1, 1), (1, 1)],
+    )
+
+    with pytest.raises(epcpm.muxdispatch.DuplicateMultiplexerError):
+        epcpm.muxdispatch.multiplexer_items(
+            message=message,
+            parameter_uuid_to_can_node=signals,
+            item_uuids=set(signals),
+        )
+
+
+def test_table_multiplexers_index_their_items():
+    root = epcpm.canmodel.Root()
+    message, signals = create_message(
+        identifier=0x1ABEFACE,
+        multiplexers=[(0, 1)],
+    )
+    root.append_child(message)
+
+    table = epcpm.canmodel.CanTable()
+    message.append_child(table)
+    multiplexer = epcpm.canmodel.Multiplexer(identifier=2)
+    table.append_child(multiplexer)
+    signal = epcpm.canmodel.Signal(parameter_uuid=uuid.uuid4())
+    multiplexer.append_child(signal)
+    signals[signal.parameter_uuid] = signal
+
+    c, h = epcpm.muxdispatch.dispatch_code(
+        can_root=root,
+        parameter_uuid_to_can_node=signals,
+        item_uuids=list(signals),
+        item_name=item_name,
+    )
+
+    assert lines_after(
+        c=c,
+        line="static InterfaceMuxItems const interfaceMux_1ABEFACE[] = {",
+    ) == [
+        "{interfaceMux_1ABEFACE_0, 1},",
+        "{NULL, 0},",
+        "{interfaceMux_1ABEFACE_2, 1},",
+    ]
+    assert (
+        lines_after(
+            c=c,
+            line="static void const * const interfaceMux_1ABEFACE_2[] = {",
+        )
+        == [f"&{item_name(signal.parameter_uuid)},"]
+    )
+
+
+def test_duplicate_table_multiplexer_identifiers_are_rejected():
+    message, signals = create_message(
+        identifier=0x1ABEFACE,
+        multiplexers=[(1, 1)],
+    )
+    table = epcpm.canmodel.CanTable()
+    message.append_child(table)
+    table.append_child(epcpm.canmodel.Multiplexer(identifier=1))
+
+    with pytest.raises(epcpm.muxdispatch.DuplicateMultiplexerError):
+        epcpm.muxdispatch.multiplexer_items(
+            message=message,
+            parameter_uuid_to_can_node=signals,
+            item_uuids=set(signals),
+        )
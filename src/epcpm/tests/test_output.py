@@ -0,0 +1,44 @@
+import openpyxl
+
+import epcpm.output
+
+
+def test_write_bytes_skips_unchanged(tmp_path):
+    path = tmp_path / "file.c"
+
+    with epcpm.output.collect() as statistics:
+        assert epcpm.output.write_bytes(path=path, content=b"abc")
+        assert not epcpm.output.write_bytes(path=path, content=b"abc")
+        assert epcpm.output.write_bytes(path=path, content=b"abcd")
+
+    assert path.read_bytes() == b"abcd"
+    assert statistics == epcpm.output.Statistics(written=2, skipped=1)
+
+
+def test_open_text_skips_unchanged(tmp_path):
+    path = tmp_path / "file.c"
+
+    with epcpm.output.collect() as statistics:
+        for text in ["abc", "abc", "abcd"]:
+            with epcpm.output.open_text(path=path) as f:
+                f.write(text)
+
+    assert path.read_text() == "abcd"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.c"]
+    assert statistics == epcpm.output.Statistics(written=2, skipped=1)
+
+
+def test_write_workbook_ignores_save_time(tmp_path):
+    path = tmp_path / "workbook.xlsx"
+
+    def create(value):
+        workbook = openpyxl.Workbook()
+        workbook.active.append([value])
+        return workbook
+
+    with epcpm.output.collect() as statistics:
+        epcpm.output.write_workbook(path=path, workbook=create(1))
+        epcpm.output.write_workbook(path=path, workbook=create(1))
+        epcpm.output.write_workbook(path=path, workbook=create(2))
+
+    assert statistics == epcpm.output.Statistics(written=2, skipped=1)
@@ -0,0 +1,118 @@
+import epcpm.benchmarks.suite
+import epcpm.benchmarks.synthetic
+import epcpm.importexport
+import epcpm.itemids
+import epcpm.parameterstointerface
+import epcpm.project
+
+
+def create_exporter(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=2,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path)
+    paths = epcpm.benchmarks.suite.create_target(tmp_path / "target")
+
+    def export(**kwargs):
+        epcpm.parameterstointerface.export(
+            c_path=paths.interface_c,
+            h_path=paths.interface_c.with_suffix(".h"),
+            parameters_model=project.models.parameters,
+            can_model=project.models.can,
+            sunspec_model=project.models.sunspec,
+            **kwargs,
+        )
+
+    return export, paths
+
+
+def test_shards_hold_the_unsharded_items(tmp_path):
+    export, paths = create_exporter(tmp_path)
+    h_path = paths.interface_c.with_suffix(".h")
+
+    export()
+    unsharded_c = paths.interface_c.read_text()
+    unsharded_h = h_path.read_text()
+
+    export(shard_items=3, shard_groups=True)
+    shards = epcpm.parameterstointerface.read_shard_manifest(paths.interface_c)
+
+    assert len(shards) > 1
+    assert shards[0] == paths.interface_c
+    assert "\n\n".join(shard.read_text().rstrip() for shard in shards) == (
+        unsharded_c.rstrip()
+    )
+    assert h_path.read_text() == unsharded_h
+    options = epcpm.importexport.ExportOptions(
+        interface_shard_items=3,
+        interface_shard_groups=True,
+    )
+    assert set(epcpm.importexport.interface_outputs(paths, options)) == {
+        *shards,
+        h_path,
+        epcpm.parameterstointerface.shard_manifest_path(paths.interface_c),
+    }
+
+
+def test_unsharded_export_removes_shards(tmp_path):
+    export, paths = create_exporter(tmp_path)
+
+    export(shard_items=3)
+    shards = epcpm.parameterstointerface.read_shard_manifest(paths.interface_c)
+
+    export()
+
+    assert paths.interface_c.exists()
+    assert not any(shard.exists() for shard in shards[1:])
+    assert epcpm.parameterstointerface.read_shard_manifest(paths.interface_c) == []
+    options = epcpm.importexport.ExportOptions()
+    assert epcpm.importexport.interface_outputs(paths, options) == (
+        paths.interface_c,
+        paths.interface_c.with_suffix(".h"),
+    )
+
+
+def test_uuid_lookup_lists_every_item(tmp_path):
+    export, paths = create_exporter(tmp_path)
+
+    export(uuid_lookup="sorted")
+    c = paths.interface_c.read_text()
+
+    items = c.count("#pragma DATA_SECTION(interfaceItem_")
+    entries = c.count("}, &interfaceItem_")
+
+    assert items > 0
+    assert entries == items
+    assert f"#define INTERFACE_ITEM_UUID_COUNT ({items})" in (
+        paths.interface_c.with_suffix(".h").read_text()
+    )
+
+
+def test_compact_item_ids_replace_uuids(tmp_path):
+    export, paths = create_exporter(tmp_path)
+
+    export(include_uuid_in_item=True)
+    uuids = paths.interface_c.read_text().count(".uuid = ")
+
+    export(include_uuid_in_item=True, compact_item_ids=True)
+    c = paths.interface_c.read_text()
+
+    assert uuids > 0
+    assert ".uuid = " not in c
+    assert c.count(".id = 0x") == uuids
+    options = epcpm.importexport.ExportOptions(
+        include_uuid_in_item=True,
+        compact_item_ids=True,
+    )
+    assert epcpm.importexport.interface_outputs(paths, options) == (
+        paths.interface_c,
+        paths.interface_c.with_suffix(".h"),
+        epcpm.itemids.sidecar_path(paths.interface_c),
+    )
@@ -0,0 +1,80 @@
+import attr
+import pytest
+
+import epyqlib.pm.parametermodel
+
+import epcpm.parametervisitor
+
+
+@attr.s
+class Recorder(epcpm.parametervisitor.Target):
+    events = attr.ib(factory=list)
+    skipped = attr.ib(default=None)
+    failing = attr.ib(default=None)
+
+    def enter(self, node):
+        if node.name == self.failing:
+            raise Exception(f"failed at {node.name}")
+
+        self.events.append(("enter", node.name))
+
+        if node.name == self.skipped:
+            return epcpm.parametervisitor.skip
+
+    def leave(self, node):
+        self.events.append(("leave", node.name))
+
+
+def create_tree():
+    root = epyqlib.pm.parametermodel.Root()
+
+    group = epyqlib.pm.parametermodel.Group(name="Group")
+    root.append_child(group)
+
+    for name in ["First", "Second"]:
+        group.append_child(epyqlib.pm.parametermodel.Parameter(name=name))
+
+    root.append_child(epyqlib.pm.parametermodel.Parameter(name="Third"))
+
+    return root
+
+
+def test_walk_visits_every_target_once_per_node():
+    targets = [Recorder(), Recorder(skipped="Group")]
+
+    epcpm.parametervisitor.walk(root=create_tree(), targets=targets)
+
+    assert targets[0].events == [
+        ("enter", "Parameters"),
+        ("enter", "Group"),
+        ("enter", "First"),
+        ("leave", "First"),
+        ("enter", "Second"),
+        ("leave", "Second"),
+        ("leave", "Group"),
+        ("enter", "Third"),
+        ("leave", "Third"),
+        ("leave", "Parameters"),
+    ]
+    assert targets[1].events == [
+        ("enter", "Parameters"),
+        ("enter", "Group"),
+        ("leave", "Group"),
+        ("enter", "Third"),
+        ("leave", "Third"),
+        ("leave", "Parameters"),
+    ]
+
+
+def test_isolated_failure_does_not_stop_other_targets():
+    failing = epcpm.parametervisitor.Isolated(target=Recorder(failing="Second"))
+    working = epcpm.parametervisitor.Isolated(target=Recorder())
+
+    epcpm.parametervisitor.walk(root=create_tree(), targets=[failing, working])
+
+    assert failing.target.events[-1] == ("leave", "First")
+    assert len(working.target.events) == 10
+
+    working.finish()
+    with pytest.raises(Exception, match="failed at Second"):
+        failing.finish()
@@ -1,8 +1,11 @@
+import pickle
+import shutil
 import textwrap
 
 import graham
 
 import epcpm.project
+import epcpm.projectcache
 
 import pathlib
 
@@ -92,3 +95,140 @@ def test_model_proper_selection_roots():
     expected = epyqlib.pm.parametermodel.types.list_selection_roots()
 
     assert set(project.models.parameters.list_selection_roots.keys()) == expected
+
+
+def dump_models(project):
+    return [
+        graham.dumps(model.root, indent=4).data for model in project.models.values()
+    ]
+
+
+def test_cached_load_matches(tmp_path):
+    project_directory = tmp_path / "project"
+    shutil.copytree(pathlib.Path(__file__).with_name("project"), project_directory)
+    project_path = project_directory / "project.pmp"
+
+    uncached = epcpm.project.loadp(project_path)
+    cold = epcpm.project.loadp(project_path, cache=True)
+    warm = epcpm.project.loadp(project_path, cache=True)
+
+    project = epcpm.project.loadp(project_path, post_load=False)
+
+    for name, path in project.paths.items():
+        cached_root = epcpm.projectcache.load_root(
+            project_path=project_path,
+            name=name,
+            content=(project_directory / path).read_bytes(),
+        )
+        assert cached_root is not None
+    assert dump_models(cold) == dump_models(uncached)
+    assert dump_models(warm) == dump_models(uncached)
+
+
+def test_cache_ignored_when_model_changes(tmp_path):
+    project_directory = tmp_path / "project"
+    shutil.copytree(pathlib.Path(__file__).with_name("project"), project_directory)
+    project_path = project_directory / "project.pmp"
+
+    epcpm.project.loadp(project_path, cache=True)
+
+    can_path = project_directory / "can.json"
+    can_path.write_text(can_path.read_text().replace("First Table", "Renamed Table"))
+
+    uncached = epcpm.project.loadp(project_path)
+    cached = epcpm.project.loadp(project_path, cache=True)
+
+    assert dump_models(cached) == dump_models(uncached)
+
+
+def test_load_times_collected():
+    project_path = pathlib.Path(__file__).with_name("project") / "project.pmp"
+
+    with epcpm.project.collect_load_times() as load_times:
+        epcpm.project.loadp(project_path)
+
+    assert sorted(path.name for path in load_times) == [
+        "can.json",
+        "parameters.json",
+        "sunspec.json",
+    ]
+    assert all(times.deserialize > 0 for times in load_times.values())
+
+
+def test_save_writes_only_changed_models(tmp_path):
+    project_directory = tmp_path / "project"
+    shutil.copytree(pathlib.Path(__file__).with_name("project"), project_directory)
+    project_path = project_directory / "project.pmp"
+
+    project = epcpm.project.loadp(project_path)
+    assert project.dirty_models() == set()
+
+    # markers survive only if the files are left alone
+    for path in [
+        project_path,
+        *(project_directory / p for p in project.paths.values()),
+    ]:
+        path.write_text("untouched\n")
+
+    (table,) = project.models.can.root.nodes_by_filter(
+        filter=lambda node: getattr(node, "name", None) == "First Table",
+    )
+    index = project.models.can.index_from_node(table)
+    project.models.can.model.setData(index, "Renamed Table")
+    assert project.dirty_models() == {"can"}
+
+    project.save()
+
+    assert project.dirty_models() == set()
+    assert project_path.read_text() == "untouched\n"
+    assert (project_directory / "parameters.json").read_text() == "untouched\n"
+    assert (project_directory / "sunspec.json").read_text() == "untouched\n"
+    assert table.name == "Renamed Table"
+    assert "Renamed Table" in (project_directory / "can.json").read_text()
+
+
+def test_save_rewrites_project_when_paths_change(tmp_path):
+    project_directory = tmp_path / "project"
+    shutil.copytree(pathlib.Path(__file__).with_name("project"), project_directory)
+    project_path = project_directory / "project.pmp"
+
+    project = epcpm.project.loadp(project_path)
+    project.paths.can = "renamed_can.json"
+    project.save()
+
+    reloaded = epcpm.project.loadp(project_path)
+
+    assert reloaded.paths.can == "renamed_can.json"
+    assert dump_models(reloaded) == dump_models(project)
+
+
+def test_load_requested_models_only():
+    project_path = pathlib.Path(__file__).with_name("project") / "project.pmp"
+
+    project = epcpm.project.loadp(project_path, models=("can",))
+
+    assert project.models.parameters is not None
+    assert project.models.can is not None
+    assert project.models.sunspec is None
+
+    project.load_models("sunspec")
+
+    assert dump_models(project) == dump_models(epcpm.project.loadp(project_path))
+    assert project.dirty_models() == set()
+
+
+def test_failed_cache_write_still_loads(tmp_path, monkeypatch):
+    project_directory = tmp_path / "project"
+    shutil.copytree(pathlib.Path(__file__).with_name("project"), project_directory)
+    project_path = project_directory / "project.pmp"
+
+    def fail(self, obj):
+        raise pickle.PicklingError("unpicklable")
+
+    monkeypatch.setattr(epcpm.projectcache.Pickler, "dump", fail)
+
+    uncached = epcpm.project.loadp(project_path)
+    cached = epcpm.project.loadp(project_path, cache=True)
+
+    assert dump_models(cached) == dump_models(uncached)
+    assert list(epcpm.projectcache.cache_directory(project_path).glob("*.pickle")) == []
@@ -0,0 +1,73 @@
+import epyqlib.pm.parametermodel
+import pytest
+
+import epcpm.canmodel
+import epcpm.projectindex
+
+
+def create_roots():
+    parameter_root = epyqlib.pm.parametermodel.Root()
+
+    parameter = epyqlib.pm.parametermodel.Parameter(
+        name="Parameter A",
+        uuid="253233ea-3b00-47ec-9b91-623bb5c3dca4",
+    )
+    parameter_root.append_child(parameter)
+
+    can_root = epcpm.canmodel.Root()
+
+    multiplexed_message = epcpm.canmodel.MultiplexedMessage(
+        name="ParameterQuery",
+        uuid="3bb49d82-e7fb-4cc1-af8d-f8701fe8b371",
+    )
+    can_root.append_child(multiplexed_message)
+
+    multiplexer = epcpm.canmodel.Multiplexer(
+        name="Multiplexer_A",
+        uuid="78ce435e-1ba8-424f-aec4-212bbba0c612",
+    )
+    multiplexed_message.append_child(multiplexer)
+
+    signal = epcpm.canmodel.Signal(
+        name="Signal_PA",
+        parameter_uuid=parameter.uuid,
+        uuid="3c25a151-2ae0-4a8d-bc77-704123aa6547",
+    )
+    multiplexer.append_child(signal)
+
+    return parameter_root, can_root, parameter, signal
+
+
+def test_maps_parameters_to_signals():
+    parameter_root, can_root, parameter, signal = create_roots()
+
+    index = epcpm.projectindex.ProjectIndex.build(
+        parameters_root=parameter_root,
+        can_root=can_root,
+    )
+
+    assert index.parameter_to_can_signal[parameter.uuid] is signal
+    assert index.parameter_to_query_signal[parameter.uuid] is signal
+
+    with pytest.raises(TypeError):
+        index.parameter_to_can_signal[parameter.uuid] = None
+
+
+def test_duplicate_signals_reported():
+    parameter_root, can_root, parameter, signal = create_roots()
+
+    duplicate = epcpm.canmodel.Signal(
+        name="Signal_PA_Again",
+        parameter_uuid=parameter.uuid,
+        uuid="84d3eb7a-212c-4634-b46f-92e51b6147fd",
+    )
+    signal.tree_parent.append_child(duplicate)
+
+    with pytest.raises(
+        epcpm.projectindex.DuplicateMappingError,
+        match="ParameterQuery > Multiplexer_A > Signal_PA_Again",
+    ):
+        epcpm.projectindex.ProjectIndex.build(
+            parameters_root=parameter_root,
+            can_root=can_root,
+        )
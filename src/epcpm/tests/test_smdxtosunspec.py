@@ -1,6 +1,7 @@
 # import collections
 import pathlib
 
+import openpyxl
 import pytest
 import sunspec.core.client
 
@@ -42,3 +43,44 @@ def test_load():
     )
 
     assert [model.id for model in models] == requested_models
+
+
+def write_get_set_workbook(path, header):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    workbook.create_sheet("Summary").append(["not", "a", "model"])
+
+    for model in (1, 2):
+        sheet = workbook.create_sheet(str(model))
+        sheet.append(header)
+        sheet.append(["A", f"getA{model}();", f"setA{model}();"])
+        sheet.append(["B", f"getB{model}();", None])
+        sheet.append([])
+
+    workbook.save(path)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_import_get_set(tmp_path, jobs):
+    path = tmp_path / "sunspec.xlsx"
+    write_get_set_workbook(path=path, header=["Name", "get", "set"])
+
+    get_set = epcpm.smdxtosunspec.import_get_set(path, jobs=jobs)
+
+    assert get_set == {
+        epcpm.smdxtosunspec.GetSetKey(
+            model=model,
+            name=name,
+            get_set=direction,
+        ): f"{direction}{name}{model}();"
+        for model in (1, 2)
+        for name, direction in (("A", "get"), ("A", "set"), ("B", "get"))
+    }
+
+
+def test_import_get_set_missing_columns(tmp_path):
+    path = tmp_path / "sunspec.xlsx"
+    write_get_set_workbook(path=path, header=["Name", "get", "other"])
+
+    with pytest.raises(epcpm.smdxtosunspec.GetSetColumnsError, match="'set'"):
+        epcpm.smdxtosunspec.import_get_set(path)
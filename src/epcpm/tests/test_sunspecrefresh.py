@@ -0,0 +1,69 @@
+import pathlib
+
+import epcpm.c
+import epcpm.project
+import epcpm.projectindex
+import epcpm.smdxtosunspec
+import epcpm.sunspecmodel
+import epcpm.sunspecrefresh
+
+
+this = pathlib.Path(__file__).resolve()
+here = this.parent
+
+
+smdx_path = here / "sunspec"
+
+
+def function_bodies(c):
+    bodies = {}
+
+    for signature, brace, body in zip(c, c[1:], c[2:]):
+        if brace == "{" and signature.endswith("(void)"):
+            name = signature.split()[-1][: -len("(void)")]
+            bodies[name] = epcpm.c.format_nested_lists(body)
+
+    return bodies
+
+
+def test_scale_factors_are_updated_once_per_refresh():
+    project = epcpm.project.loadp(here / "project" / "project.pmp")
+
+    sunspec_model = project.models.sunspec
+    parameter_model = project.models.parameters
+
+    enumerations = parameter_model.list_selection_roots["enumerations"]
+    sunspec_types = epcpm.sunspecmodel.build_sunspec_types_enumeration()
+    enumerations.append_child(sunspec_types)
+    parameter_model.list_selection_roots["sunspec types"] = sunspec_types
+
+    for model in epcpm.smdxtosunspec.import_models(
+        103,
+        parameter_model=parameter_model,
+        paths=[smdx_path],
+    ):
+        sunspec_model.root.append_child(model)
+
+    c, h = epcpm.sunspecrefresh.refresh_code(
+        sunspec_root=sunspec_model.root,
+        parameter_uuid_finder=sunspec_model.node_from_uuid,
+        index=epcpm.projectindex.ProjectIndex.build(
+            sunspec_root=sunspec_model.root,
+        ),
+    )
+    bodies = function_bodies(c)
+
+    assert h == [
+        "void refreshSunspecModel103_Header(void);",
+        "void refreshSunspecModel103_Fixed(void);",
+        "void refreshSunspecModel103(void);",
+    ]
+    scale_factor_calls = [
+        line
+        for line in bodies["refreshSunspecModel103"].splitlines()
+        if line.startswith("getSUNSPEC_MODEL103_")
+    ]
+
+    assert len(scale_factor_calls) > 1
+    assert len(set(scale_factor_calls)) == len(scale_factor_calls)
+    assert "getSUNSPEC_MODEL" not in bodies["fillSunspecModel103_Fixed"]
@@ -0,0 +1,104 @@
+import epyqlib.pm.parametermodel
+import pytest
+
+import epcpm.sunspecscale
+import epcpm.sunspectoxlsx
+
+
+def assignment(factor_operator, internal_scale, scale_factor_parameter):
+    return epcpm.sunspectoxlsx.adjust_assignment(
+        left_hand_side="left",
+        right_hand_side="right",
+        sunspec_model_variable="model",
+        scale_factor="SF",
+        internal_scale=internal_scale,
+        parameter=epyqlib.pm.parametermodel.Parameter(),
+        factor_operator=factor_operator,
+        power_of_ten_scaling=True,
+        scale_factor_parameter=scale_factor_parameter,
+    )
+
+
+@pytest.mark.parametrize(
+    "factor_operator, internal_scale, expected",
+    [
+        ("*", 0, "left = ((right) * SUNSPEC_POWER_OF_TEN(model.SF));"),
+        ("*", -2, "left = ((right) * SUNSPEC_POWER_OF_TEN(model.SF - 2));"),
+        ("/", 0, "left = ((right) * SUNSPEC_POWER_OF_TEN(-model.SF));"),
+        ("/", 1, "left = ((right) * SUNSPEC_POWER_OF_TEN(-1 - model.SF));"),
+    ],
+)
+def test_variable_scale_factor_is_looked_up(factor_operator, internal_scale, expected):
+    scale_factor_parameter = epyqlib.pm.parametermodel.Parameter(
+        minimum=-3,
+        maximum=3,
+    )
+
+    assert (
+        assignment(
+            factor_operator=factor_operator,
+            internal_scale=internal_scale,
+            scale_factor_parameter=scale_factor_parameter,
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "factor_operator, internal_scale, expected",
+    [
+        ("*", 0, "left = ((right) * 1e-2f);"),
+        ("*", 2, "left = (right);"),
+        ("/", 0, "left = ((right) * 1e2f);"),
+    ],
+)
+def test_constant_scale_factor_is_folded(factor_operator, internal_scale, expected):
+    scale_factor_parameter = epyqlib.pm.parametermodel.Parameter(
+        minimum=-2,
+        maximum=-2,
+    )
+
+    assert (
+        assignment(
+            factor_operator=factor_operator,
+            internal_scale=internal_scale,
+            scale_factor_parameter=scale_factor_parameter,
+        )
+        == expected
+    )
+
+
+def test_table_covers_the_exponents():
+    c, h = epcpm.sunspecscale.power_of_ten_code()
+    table = c.index("float const sunspecPowersOfTen[SUNSPEC_POWERS_OF_TEN_COUNT] = {")
+    entries = c[table + 1]
+
+    count = epcpm.sunspecscale.maximum_exponent - epcpm.sunspecscale.minimum_exponent
+    assert len(entries) == count + 1
+    assert entries[-epcpm.sunspecscale.minimum_exponent] == "1e0f,"
+
+
+@pytest.mark.parametrize(
+    "exponent",
+    [
+        epcpm.sunspecscale.minimum_exponent - 1,
+        epcpm.sunspecscale.maximum_exponent + 1,
+    ],
+)
+def test_constant_exponent_outside_table_is_an_error(exponent):
+    with pytest.raises(epcpm.sunspecscale.ExponentRangeError):
+        epcpm.sunspecscale.constant_scaled(
+            value="right",
+            scale_factor=exponent,
+            internal_scale=0,
+            factor_operator="*",
+        )
+
+
+def test_lookup_checks_the_table_bounds():
+    c, h = epcpm.sunspecscale.power_of_ten_code()
+
+    lookup = h[h.index("static inline float sunspecPowerOfTen(int32_t exponent)") + 2]
+    assert "if (index < 0 || index >= SUNSPEC_POWERS_OF_TEN_COUNT)" in lookup
+    assert ["return sunspecPowerOfTenComputed(exponent);"] in lookup
+    assert "float sunspecPowerOfTenComputed(int32_t exponent)" in c
@@ -1,7 +1,13 @@
 import csv
+import json
 import pathlib
 
+import attr
+import openpyxl
+
+import epcpm.benchmarks.synthetic
 import epcpm.project
+import epcpm.projectindex
 import epcpm.smdxtosunspec
 import epcpm.sunspectoxlsx
 
@@ -90,3 +96,233 @@ def test_x():
         for sheet in workbook.worksheets:
             for row in sheet.rows:
                 writer.writerow(cell.value for cell in row)
+
+
+def workbook_rows(workbook):
+    return {
+        worksheet.title: [[cell.value for cell in row] for row in worksheet.iter_rows()]
+        for worksheet in workbook.worksheets
+    }
+
+
+def test_streamed_export_matches_in_memory_workbook(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=2,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path)
+    path = tmp_path / "sunspec.xlsx"
+    register_map_path = epcpm.sunspectoxlsx.register_map_path(path)
+
+    epcpm.sunspectoxlsx.export(
+        path=path,
+        sunspec_model=project.models.sunspec,
+        parameters_model=project.models.parameters,
+        register_map=register_map_path,
+    )
+
+    builder = epcpm.sunspectoxlsx.builders.wrap(
+        wrapped=project.models.sunspec.root,
+        parameter_uuid_finder=project.models.sunspec.node_from_uuid,
+        parameter_model=project.models.parameters,
+        column_filter=epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True),
+    )
+    in_memory = builder.gen()
+
+    # compare saved workbooks since saving drops empty strings
+    in_memory_path = tmp_path / "in_memory.xlsx"
+    in_memory.save(in_memory_path)
+
+    saved = openpyxl.load_workbook(in_memory_path)
+    streamed = openpyxl.load_workbook(path)
+
+    assert streamed.sheetnames == saved.sheetnames
+    assert workbook_rows(streamed) == workbook_rows(saved)
+    assert (
+        len(
+            workbook_rows(streamed)[
+                str(epcpm.benchmarks.synthetic.first_sunspec_model_id)
+            ]
+        )
+        > 1
+    )
+
+    register_map = json.loads(register_map_path.read_text())
+    columns = [
+        getattr(epcpm.sunspectoxlsx.field_names, name)
+        for name in epcpm.sunspectoxlsx.register_map_fields.values()
+    ]
+
+    from_workbook = []
+    for title, rows in workbook_rows(in_memory).items():
+        if not title.isdigit():
+            continue
+
+        header, *rows = rows
+        indexes = [header.index(column) for column in columns]
+        address_index = header.index("Modbus Address")
+        from_workbook.append(
+            {
+                "id": int(title),
+                "points": [
+                    dict(
+                        zip(
+                            epcpm.sunspectoxlsx.register_map_fields.keys(),
+                            (row[index] for index in indexes),
+                        )
+                    )
+                    for row in rows
+                    if row[address_index] is not None
+                ],
+            }
+        )
+
+    assert register_map["models"] == from_workbook
+
+
+def test_export_many_matches_separate_exports(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=2,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path)
+
+    all_columns = epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True)
+    column_filters = {
+        "full": all_columns,
+        "user": attr.evolve(all_columns, get=False, set=False, item=False),
+    }
+
+    epcpm.sunspectoxlsx.export_many(
+        destinations=[
+            (tmp_path / f"many_{name}.xlsx", column_filter)
+            for name, column_filter in column_filters.items()
+        ],
+        sunspec_model=project.models.sunspec,
+        parameters_model=project.models.parameters,
+    )
+
+    for name, column_filter in column_filters.items():
+        epcpm.sunspectoxlsx.export(
+            path=tmp_path / f"single_{name}.xlsx",
+            sunspec_model=project.models.sunspec,
+            parameters_model=project.models.parameters,
+            column_filter=column_filter,
+        )
+
+        many = openpyxl.load_workbook(tmp_path / f"many_{name}.xlsx")
+        single = openpyxl.load_workbook(tmp_path / f"single_{name}.xlsx")
+
+        assert workbook_rows(many) == workbook_rows(single)
+
+
+def test_skip_sunspec_without_sunspec_model(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=2,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path, models=("parameters",))
+    assert project.models.sunspec is None
+
+    path = tmp_path / "skipped.xlsx"
+    epcpm.sunspectoxlsx.export(
+        path=path,
+        sunspec_model=project.models.sunspec,
+        parameters_model=project.models.parameters,
+        skip_sunspec=True,
+    )
+
+    workbook = openpyxl.load_workbook(path)
+
+    assert workbook.sheetnames == ["License Agreement", "Summary", "Index"]
+
+
+def test_code_columns_not_generated_when_filtered_out(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=2,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path)
+
+    context = epcpm.sunspectoxlsx.Context(
+        column_filter=attr.evolve(
+            epcpm.sunspectoxlsx.attr_fill(epcpm.sunspectoxlsx.Fields, True),
+            get=False,
+            set=False,
+            item=False,
+        ),
+        parameter_uuid_finder=project.models.sunspec.node_from_uuid,
+        index=epcpm.projectindex.ProjectIndex.from_models(models=project.models),
+        padding_type=project.models.parameters.list_selection_roots[
+            "sunspec types"
+        ].child_by_name("pad"),
+    )
+    (model,) = [
+        child
+        for child in project.models.sunspec.root.children
+        if getattr(child, "id", None)
+        == epcpm.benchmarks.synthetic.first_sunspec_model_id
+    ]
+
+    rows, length = epcpm.sunspectoxlsx.handlers.gen(
+        node=model,
+        context=context,
+        model_offset=2,
+    )
+
+    assert len(rows) > 0
+    assert all(row.get is None and row.set is None for row in rows)
+
+
+def test_parallel_models_match_serial(tmp_path):
+    project_path = epcpm.benchmarks.synthetic.create_project(
+        directory=tmp_path / "project",
+        sizes=epcpm.benchmarks.synthetic.Sizes(
+            parameters=20,
+            messages=2,
+            sunspec_models=3,
+            table_axis_length=2,
+            table_array_length=2,
+        ),
+    )
+    project = epcpm.project.loadp(project_path)
+
+    workbooks = {}
+    for jobs in (1, 2):
+        builder = epcpm.sunspectoxlsx.builders.wrap(
+            wrapped=project.models.sunspec.root,
+            parameter_uuid_finder=project.models.sunspec.node_from_uuid,
+            parameter_model=project.models.parameters,
+            column_filter=epcpm.sunspectoxlsx.attr_fill(
+                epcpm.sunspectoxlsx.Fields, True
+            ),
+            jobs=jobs,
+        )
+        workbooks[jobs] = builder.gen()
+
+    assert workbooks[2].sheetnames == workbooks[1].sheetnames
+    assert workbook_rows(workbooks[2]) == workbook_rows(workbooks[1])
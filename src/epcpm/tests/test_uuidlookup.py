@@ -0,0 +1,66 @@
+import random
+import uuid
+
+import pytest
+
+import epcpm.uuidlookup
+
+
+def random_uuids(count, seed=0):
+    generator = random.Random(seed)
+
+    return [uuid.UUID(int=generator.getrandbits(128)) for _ in range(count)]
+
+
+def item_name(uuid_):
+    return f"item_{uuid_.hex}"
+
+
+@pytest.mark.parametrize("count", [1, 2, 50, 1000])
+def test_perfect_hash_finds_every_key(count):
+    keys = [epcpm.uuidlookup.words(uuid_) for uuid_ in random_uuids(count)]
+
+    displacements, slots = epcpm.uuidlookup.perfect_hash(keys=keys)
+
+    assert sorted(slots) == sorted(keys)
+
+    for key in keys:
+        displacement = displacements[
+            epcpm.uuidlookup.hash_words(seed=0, words=key) % count
+        ]
+
+        if displacement < 0:
+            slot = -(displacement + 1)
+        else:
+            slot = epcpm.uuidlookup.hash_words(seed=displacement, words=key) % count
+
+        assert slots[slot] == key
+
+
+def test_sorted_table_is_in_word_order():
+    uuids = random_uuids(20)
+
+    c, h = epcpm.uuidlookup.lookup_code(
+        uuids=uuids,
+        item_name=item_name,
+        kind="sorted",
+    )
+
+    (entries,) = [line for line in c if isinstance(line, list) and len(line) == 20]
+    ordered = sorted(uuids, key=epcpm.uuidlookup.words)
+
+    assert [entry.split("&")[1] for entry in entries] == [
+        f"{item_name(uuid_)}}}," for uuid_ in ordered
+    ]
+    assert "#define INTERFACE_ITEM_UUID_COUNT (20)" in h
+
+
+def test_duplicate_uuids_are_rejected():
+    uuids = random_uuids(3)
+
+    with pytest.raises(epcpm.uuidlookup.DuplicateUuidError, match=str(uuids[1])):
+        epcpm.uuidlookup.lookup_code(
+            uuids=[*uuids, uuids[1]],
+            item_name=item_name,
+            kind="hash",
+        )
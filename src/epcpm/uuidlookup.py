@@ -0,0 +1,277 @@
+import toolz
+
+
+kinds = ("sorted", "hash")
+
+# the firmware compares uuids as they are stored in the items, as eight
+# 16 bit words each holding two bytes with the first in the low half
+words_per_uuid = 8
+
+fnv_offset_basis = 2166136261
+fnv_prime = 16777619
+maximum_seed = 2 ** 31 - 1
+
+
+class DuplicateUuidError(Exception):
+    @classmethod
+    def build(cls, uuid_):
+        return cls(f"Interface item UUID appears more than once: {uuid_}")
+
+
+class PerfectHashError(Exception):
+    @classmethod
+    def build(cls, count, attempts):
+        return cls(
+            f"No perfect hash found for {count} interface item UUIDs"
+            f" within {attempts} seeds per bucket",
+        )
+
+
+def words(uuid_):
+    return tuple(high << 8 | low for low, high in toolz.partition_all(2, uuid_.bytes))
+
+
+def word_initializer(words):
+    return "{{{}}}".format(", ".join(f"0x{word:04x}" for word in words))
+
+
+def hash_words(seed, words):
+    # FNV-1a over the 16 bit words, matching interfaceItemUuidHash()
+    hash = (fnv_offset_basis ^ seed) & 0xFFFFFFFF
+
+    for word in words:
+        hash = ((hash ^ word) * fnv_prime) & 0xFFFFFFFF
+
+    return hash ^ (hash >> 16)
+
+
+def perfect_hash(keys, attempts=100000):
+    """Hash and displace: the keys are bucketed by their seed 0 hash and
+    the buckets are placed largest first.  A bucket of several keys gets the
+    first seed which hashes them all to distinct free slots and a bucket of
+    one key takes a free slot directly, recorded as -(slot + 1).  Returns
+    the per bucket displacements and the key in each slot."""
+    size = len(keys)
+    buckets = [[] for _ in range(size)]
+
+    for key in keys:
+        buckets[hash_words(seed=0, words=key) % size].append(key)
+
+    displacements = [0] * size
+    slots = [None] * size
+
+    by_size = sorted(range(size), key=lambda index: len(buckets[index]), reverse=True)
+
+    for index in by_size:
+        bucket = buckets[index]
+
+        if len(bucket) <= 1:
+            break
+
+        for seed in range(1, min(attempts, maximum_seed) + 1):
+            candidates = [hash_words(seed=seed, words=key) % size for key in bucket]
+
+            if len(set(candidates)) == len(candidates) and all(
+                slots[candidate] is None for candidate in candidates
+            ):
+                break
+        else:
+            raise PerfectHashError.build(count=size, attempts=attempts)
+
+        displacements[index] = seed
+        for candidate, key in zip(candidates, bucket):
+            slots[candidate] = key
+
+    free = (slot for slot, key in enumerate(slots) if key is None)
+
+    for index in by_size:
+        bucket = buckets[index]
+
+        if len(bucket) == 0:
+            break
+
+        if len(bucket) == 1:
+            slot = next(free)
+            displacements[index] = -(slot + 1)
+            slots[slot] = bucket[0]
+
+    return displacements, slots
+
+
+def lookup_code(uuids, item_name, kind):
+    """C definitions and declarations of a table of the interface items keyed
+    by UUID and of interfaceItemFromUuid() to find an item in it.  The sorted
+    table is binary searched while the hashed one is indexed through a
+    generated minimal perfect hash."""
+    keys = {}
+
+    for uuid_ in uuids:
+        key = words(uuid_)
+
+        if key in keys:
+            raise DuplicateUuidError.build(uuid_=uuid_)
+
+        keys[key] = uuid_
+
+    if len(keys) == 0:
+        return [], []
+
+    if kind == "sorted":
+        ordered = sorted(keys)
+        displacements = None
+    else:
+        displacements, ordered = perfect_hash(keys=list(keys))
+
+    entries = [
+        f"{{{word_initializer(key)}, &{item_name(keys[key])}}}," for key in ordered
+    ]
+
+    h = [
+        "",
+        "typedef struct",
+        "{",
+        [
+            f"uint16_t uuid[{words_per_uuid}];",
+            "void const * item;",
+        ],
+        "} InterfaceItemUuid;",
+        "",
+        f"#define INTERFACE_ITEM_UUID_COUNT ({len(entries)})",
+        "extern InterfaceItemUuid const interfaceItemUuids[INTERFACE_ITEM_UUID_COUNT];",
+        "",
+        f"void const * interfaceItemFromUuid(uint16_t const uuid[{words_per_uuid}]);",
+    ]
+
+    c = [
+        "",
+        '#pragma DATA_SECTION(interfaceItemUuids, "Interface")',
+        "InterfaceItemUuid const interfaceItemUuids[INTERFACE_ITEM_UUID_COUNT] = {",
+        entries,
+        "};",
+        "",
+        "static int interfaceItemUuidCompare(",
+        [
+            f"uint16_t const left[{words_per_uuid}],",
+            f"uint16_t const right[{words_per_uuid}]",
+        ],
+        ")",
+        "{",
+        [
+            "size_t i;",
+            "",
+            f"for (i = 0; i < {words_per_uuid}; i++)",
+            "{",
+            [
+                "if (left[i] != right[i])",
+                "{",
+                ["return (left[i] < right[i]) ? -1 : 1;"],
+                "}",
+            ],
+            "}",
+            "",
+            "return 0;",
+        ],
+        "}",
+        "",
+    ]
+
+    if displacements is None:
+        c.extend(
+            [
+                "void const * interfaceItemFromUuid("
+                f"uint16_t const uuid[{words_per_uuid}])",
+                "{",
+                [
+                    "size_t low = 0;",
+                    "size_t high = INTERFACE_ITEM_UUID_COUNT;",
+                    "",
+                    "while (low < high)",
+                    "{",
+                    [
+                        "size_t const middle = low + (high - low) / 2;",
+                        "int const comparison = interfaceItemUuidCompare(",
+                        ["interfaceItemUuids[middle].uuid,", "uuid"],
+                        ");",
+                        "",
+                        "if (comparison == 0)",
+                        "{",
+                        ["return interfaceItemUuids[middle].item;"],
+                        "}",
+                        "",
+                        "if (comparison < 0)",
+                        "{",
+                        ["low = middle + 1;"],
+                        "}",
+                        "else",
+                        "{",
+                        ["high = middle;"],
+                        "}",
+                    ],
+                    "}",
+                    "",
+                    "return NULL;",
+                ],
+                "}",
+            ]
+        )
+    else:
+        c.extend(
+            [
+                "static int32_t const"
+                " interfaceItemUuidDisplacements[INTERFACE_ITEM_UUID_COUNT] = {",
+                [
+                    ", ".join(str(displacement) for displacement in chunk) + ","
+                    for chunk in toolz.partition_all(16, displacements)
+                ],
+                "};",
+                "",
+                "static uint32_t interfaceItemUuidHash(",
+                ["uint32_t seed,", f"uint16_t const uuid[{words_per_uuid}]"],
+                ")",
+                "{",
+                [
+                    f"uint32_t hash = {fnv_offset_basis}u ^ seed;",
+                    "size_t i;",
+                    "",
+                    f"for (i = 0; i < {words_per_uuid}; i++)",
+                    "{",
+                    ["hash ^= uuid[i];", f"hash *= {fnv_prime}u;"],
+                    "}",
+                    "",
+                    "return hash ^ (hash >> 16);",
+                ],
+                "}",
+                "",
+                "void const * interfaceItemFromUuid("
+                f"uint16_t const uuid[{words_per_uuid}])",
+                "{",
+                [
+                    "int32_t const displacement = interfaceItemUuidDisplacements[",
+                    ["interfaceItemUuidHash(0, uuid) % INTERFACE_ITEM_UUID_COUNT"],
+                    "];",
+                    "size_t slot;",
+                    "",
+                    "if (displacement < 0)",
+                    "{",
+                    ["slot = (size_t) (-(displacement + 1));"],
+                    "}",
+                    "else",
+                    "{",
+                    [
+                        "slot = interfaceItemUuidHash((uint32_t) displacement, uuid)",
+                        ["% INTERFACE_ITEM_UUID_COUNT;"],
+                    ],
+                    "}",
+                    "",
+                    "if (interfaceItemUuidCompare(interfaceItemUuids[slot].uuid, uuid) != 0)",
+                    "{",
+                    ["return NULL;"],
+                    "}",
+                    "",
+                    "return interfaceItemUuids[slot].item;",
+                ],
+                "}",
+            ]
+        )
+
+    return c, h